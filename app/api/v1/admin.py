@@ -0,0 +1,161 @@
+import os
+import secrets
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.query_log import query_log
+from app.services import snapshots
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(default=None)):
+    """
+    Guard for the admin endpoints, which expose captured SQL or replace
+    data: they don't exist unless ADMIN_API_KEY is set, and always need the
+    matching X-Admin-Key header.
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not found (set ADMIN_API_KEY to enable admin endpoints)")
+    if x_admin_key is None or not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"], dependencies=[Depends(require_admin_key)])
+
+
+def _get_query_log():
+    if query_log is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Query log is disabled (set DB_QUERY_LOG_ENABLED=True)"
+        )
+    return query_log
+
+
+@router.get("/slow-queries", response_model=List[Dict[str, Any]])
+def list_slow_queries(limit: int = Query(100, ge=1, le=settings.DB_QUERY_LOG_BUFFER_SIZE)):
+    """
+    Most recent statements slower than DB_SLOW_QUERY_MS, newest first.
+    """
+    return _get_query_log().recent_slow_queries(limit)
+
+
+@router.get("/n-plus-one", response_model=List[Dict[str, Any]])
+def list_n_plus_one(limit: int = Query(100, ge=1, le=settings.DB_QUERY_LOG_BUFFER_SIZE)):
+    """
+    Most recent requests that repeated a statement more than
+    DB_N_PLUS_ONE_THRESHOLD times, newest first.
+    """
+    return _get_query_log().recent_n_plus_one(limit)
+
+
+@router.delete("/query-log", status_code=status.HTTP_204_NO_CONTENT)
+def clear_query_log():
+    """
+    Clear the slow-query and N+1 ring buffers.
+    """
+    _get_query_log().clear()
+    return None
+
+
+def _snapshot_path(name: str) -> str:
+    try:
+        path = snapshots.snapshot_path(settings.SNAPSHOT_DIR, name)
+    except snapshots.SnapshotError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not os.path.isfile(os.path.join(path, "manifest.json")):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return path
+
+
+@router.get("/snapshots", response_model=List[Dict[str, Any]])
+def list_snapshots():
+    """
+    Manifests of the snapshots in SNAPSHOT_DIR, newest first.
+    """
+    return snapshots.list_snapshots(settings.SNAPSHOT_DIR)
+
+
+@router.post(
+    "/snapshots",
+    response_model=Dict[str, Any],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_snapshot(
+    name: Optional[str] = None,
+    snapshot_format: Optional[str] = Query(default=None, alias="format")
+):
+    """
+    Export the primary tables to a new snapshot in SNAPSHOT_DIR and return
+    its manifest. Runs to completion before responding; for large databases
+    use `python -m app.cli export-snapshot` instead.
+    """
+    snapshot_format = snapshot_format or settings.SNAPSHOT_FORMAT
+    if snapshot_format is not None and snapshot_format not in snapshots.available_formats():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unavailable format; use one of {snapshots.available_formats()}"
+        )
+    name = name or datetime.utcnow().strftime("snapshot-%Y%m%d-%H%M%S")
+    try:
+        path = snapshots.snapshot_path(settings.SNAPSHOT_DIR, name)
+    except snapshots.SnapshotError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        manifest = snapshots.export_snapshot(
+            engine,
+            path,
+            snapshot_format,
+            part_rows=settings.SNAPSHOT_PART_ROWS,
+            batch_size=settings.SNAPSHOT_BATCH_SIZE,
+            workers=settings.SNAPSHOT_WORKERS,
+        )
+    except snapshots.SnapshotError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"name": name, **manifest}
+
+
+@router.get("/snapshots/{name}", response_model=Dict[str, Any])
+def get_snapshot(name: str):
+    """
+    A snapshot's manifest: format, schema revision and, per table, its
+    columns, row count and part files.
+    """
+    return {"name": name, **snapshots.read_manifest(_snapshot_path(name))}
+
+
+@router.get("/snapshots/{name}/{table}/{part}")
+def download_snapshot_part(name: str, table: str, part: str):
+    """
+    Download one part file, e.g. to copy a snapshot to another environment
+    (fetch the manifest, then every part it lists).
+    """
+    path = _snapshot_path(name)
+    manifest = snapshots.read_manifest(path)
+    if part not in manifest["tables"].get(table, {}).get("parts", []):
+        raise HTTPException(status_code=404, detail="Snapshot part not found")
+    return FileResponse(os.path.join(path, table, part), media_type="application/octet-stream", filename=part)
+
+
+@router.post("/snapshots/{name}/restore", response_model=Dict[str, Any])
+def restore_snapshot(name: str, replace: bool = False):
+    """
+    Load a snapshot into this database, then rebuild team_members and
+    project_summaries. The tables must be empty unless `replace` is true,
+    which deletes every project, todo, task, status report and community
+    entry first.
+    """
+    try:
+        return snapshots.restore_snapshot(
+            engine,
+            _snapshot_path(name),
+            replace=replace,
+            batch_size=settings.SNAPSHOT_BATCH_SIZE,
+            workers=settings.SNAPSHOT_WORKERS,
+        )
+    except snapshots.SnapshotError as e:
+        raise HTTPException(status_code=409, detail=str(e))
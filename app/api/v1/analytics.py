@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from datetime import datetime, timedelta
+
+from app.core.database import get_db
+from app.models.models import Project
+from app.schemas.analytics import BurndownRead, CycleTimeRead, ThroughputRead
+from app.services.status_events import CYCLE_STATUSES, TODO, burndown, cycle_time, throughput
+
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+Entity = Literal["todo", "status_report"]
+
+
+@router.get("/cycle-time", response_model=CycleTimeRead)
+def get_cycle_time(
+    entity: Entity = TODO,
+    project_id: Optional[int] = None,
+    start_status: Optional[str] = None,
+    end_status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Cycle time statistics (hours) from `status_events`: from an entity's
+    first move into `start_status` to its first move into `end_status`
+    after that, for cycles that ended between `since` and `until`.
+    Defaults: todos in_progress -> done, status reports draft -> approved.
+    """
+    default_start, default_end = CYCLE_STATUSES[entity]
+    start_status = start_status or default_start
+    end_status = end_status or default_end
+    stats = cycle_time(db, entity, start_status, end_status, project_id, since, until)
+    
+    return CycleTimeRead(entity=entity, start_status=start_status, end_status=end_status, **stats)
+
+
+@router.get("/throughput", response_model=ThroughputRead)
+def get_throughput(
+    entity: Entity = TODO,
+    project_id: Optional[int] = None,
+    end_status: Optional[str] = Query(default=None, alias="status"),
+    weeks: int = Query(default=12, ge=1, le=104),
+    db: Session = Depends(get_db)
+):
+    """
+    Todos (or status reports) that reached `status` for the first time, per
+    week (Monday to Sunday) over the last `weeks` weeks, with a running
+    total. Defaults: done for todos, approved for status reports. Weeks
+    without any are omitted.
+    """
+    end_status = end_status or CYCLE_STATUSES[entity][1]
+    since = datetime.utcnow() - timedelta(weeks=weeks)
+    
+    return ThroughputRead(
+        entity=entity,
+        status=end_status,
+        weeks=throughput(db, entity, end_status, since, project_id)
+    )
+
+
+@router.get("/projects/{project_id}/burndown", response_model=BurndownRead)
+def get_burndown(
+    project_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Open todos of a project (status not done, closed or cancelled) at the
+    end of every day on which a todo was opened or closed, between `since`
+    and `until`. Days without changes are omitted: the count carries over.
+    """
+    project = db.query(Project.id).filter(Project.id == project_id, Project.deleted_at.is_(None)).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return BurndownRead(project_id=project_id, days=burndown(db, project_id, since, until))
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
-import json
 
 from app.core.database import get_db
 from app.models.models import Community
 from app.schemas.community import CommunityCreate, CommunityUpdate, CommunityRead
+from app.services.project_summaries import refresh_project_summaries
+from app.services.team_members import sync_team_members
 
 router = APIRouter(prefix="/api/v1/community", tags=["community"])
 
@@ -18,17 +19,20 @@ def create_community(community: CommunityCreate, db: Session = Depends(get_db)):
     """
     db_community = Community(
         project_id=community.project_id,
-        team=json.dumps(community.team),
+        team=community.team,
         role=community.role
     )
     db.add(db_community)
+    db.flush()
+    sync_team_members(db, db_community)
+    refresh_project_summaries(db, [db_community.project_id])
     db.commit()
     db.refresh(db_community)
     
     return CommunityRead(
         id=db_community.id,
         project_id=db_community.project_id,
-        team=json.loads(db_community.team),
+        team=db_community.team,
         role=db_community.role,
         created_at=db_community.created_at,
         updated_at=db_community.updated_at,
@@ -47,7 +51,7 @@ def list_community(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
         CommunityRead(
             id=c.id,
             project_id=c.project_id,
-            team=json.loads(c.team),
+            team=c.team,
             role=c.role,
             created_at=c.created_at,
             updated_at=c.updated_at,
@@ -69,7 +73,7 @@ def get_community(id: int, db: Session = Depends(get_db)):
     return CommunityRead(
         id=community.id,
         project_id=community.project_id,
-        team=json.loads(community.team),
+        team=community.team,
         role=community.role,
         created_at=community.created_at,
         updated_at=community.updated_at,
@@ -90,18 +94,21 @@ def update_community(id: int, community_update: CommunityUpdate, db: Session = D
         raise HTTPException(status_code=404, detail="Community entry not found")
     
     if community_update.team is not None:
-        community.team = json.dumps(community_update.team)
+        community.team = community_update.team
     if community_update.role is not None:
         community.role = community_update.role
     
     community.updated_at = datetime.utcnow()
+    if community_update.team is not None or community_update.role is not None:
+        sync_team_members(db, community)
+        refresh_project_summaries(db, [community.project_id])
     db.commit()
     db.refresh(community)
     
     return CommunityRead(
         id=community.id,
         project_id=community.project_id,
-        team=json.loads(community.team),
+        team=community.team,
         role=community.role,
         created_at=community.created_at,
         updated_at=community.updated_at,
@@ -119,5 +126,7 @@ def delete_community(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Community entry not found")
     
     community.deleted_at = datetime.utcnow()
+    sync_team_members(db, community)
+    refresh_project_summaries(db, [community.project_id])
     db.commit()
     return None
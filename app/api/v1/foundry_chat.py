@@ -1,7 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, Dict, Any, Literal
+from datetime import datetime
+from app.core.database import get_db
+from app.models.models import Project
+from app.schemas.foundry_usage import FoundryUsageRead
 from app.services.foundry_chat_service import chat_with_foundry_agent
+from app.services.foundry_usage import period_start, usage_recorder, usage_summary
 
 router = APIRouter(prefix="/api/v1/foundry", tags=["foundry"])
 
@@ -9,6 +16,7 @@ router = APIRouter(prefix="/api/v1/foundry", tags=["foundry"])
 class ChatRequest(BaseModel):
     message: str
     context: Optional[Dict[str, Any]] = None
+    project_id: int  # Charged against this project's token budget
 
 
 class ChatResponse(BaseModel):
@@ -16,19 +24,60 @@ class ChatResponse(BaseModel):
 
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_agent(request: ChatRequest):
+async def chat_with_agent(request: ChatRequest, db: Session = Depends(get_db)):
     """
     Send a message to the Foundry Agent and receive a response.
     
     Args:
-        request: ChatRequest containing message and optional context
+        request: ChatRequest containing message, the project the call is
+            made for and optional context
         
     Returns:
         ChatResponse containing the agent's response
+    
+    Raises 404 for an unknown or deleted project, and 429 once the project
+    has used its token budget.
     """
+    project = await run_in_threadpool(
+        lambda: db.query(Project.id).filter(Project.id == request.project_id, Project.deleted_at.is_(None)).first()
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
     response = await chat_with_foundry_agent(
         message=request.message,
-        context=request.context
+        context=request.context,
+        project_id=request.project_id
     )
     
     return ChatResponse(response=response)
+
+
+@router.get("/usage", response_model=FoundryUsageRead)
+def get_foundry_usage(
+    group_by: Literal["project", "source", "day"] = "project",
+    project_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Foundry calls, errors, budget refusals, bytes, tokens and latency from
+    `foundry_usage`, per project, source (chat, job) or day. `since`
+    defaults to the start of the current budget period. Calls made in the
+    last few seconds may not be written yet.
+    """
+    since = since or period_start(usage_recorder.budget_period, datetime.utcnow())
+    groups = usage_summary(db, group_by, since, until, project_id)
+    if group_by == "project":
+        for group in groups:
+            if group["project_id"] is not None:
+                group["budget_tokens"] = usage_recorder.budget_for(group["project_id"]) or None
+                group["period_used_tokens"] = usage_recorder.used_tokens(group["project_id"])
+    return {
+        "group_by": group_by,
+        "since": since,
+        "until": until,
+        "budget_period": usage_recorder.budget_period,
+        "groups": groups,
+    }
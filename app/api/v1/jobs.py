@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.models import Job, Project
+from app.schemas.job import JobRead, StatusReportJobCreate
+from app.services.jobs import STATUS_REPORTS, enqueue_job, job_worker
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@router.post("/status-reports", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_status_report_job(request: StatusReportJobCreate, response: Response, db: Session = Depends(get_db)):
+    """
+    Queue a job that asks the Foundry agent to draft status reports for a
+    project's todos. Poll the job (see the Location header) for the ids of
+    the created reports.
+    """
+    project = db.query(Project).filter(Project.id == request.project_id, Project.deleted_at.is_(None)).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    job = enqueue_job(db, STATUS_REPORTS, request.model_dump(exclude_none=True), settings.JOB_MAX_ATTEMPTS)
+    job_worker.notify()
+    response.headers["Location"] = f"{router.prefix}/{job.id}"
+    return job
+
+
+@router.get("/{id}", response_model=JobRead)
+def get_job(id: int, db: Session = Depends(get_db)):
+    """
+    Get a job's status, and its result once it has succeeded.
+    """
+    job = db.query(Job).filter(Job.id == id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.core.database import get_db
+from app.models.models import TeamMember
+from app.schemas.member import MemberProjectRead
+from app.services.team_members import normalize_email
+
+router = APIRouter(prefix="/api/v1/members", tags=["members"])
+
+
+@router.get("/{email}/projects", response_model=List[MemberProjectRead])
+def get_member_projects(email: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    """
+    Get the projects a person is a team member of (matched by email,
+    case-insensitively), one entry per community team they appear in.
+    """
+    members = db.query(
+        TeamMember.project_id,
+        TeamMember.community_id,
+        TeamMember.email,
+        TeamMember.name,
+        TeamMember.role
+    ).filter(
+        TeamMember.email == normalize_email(email)
+    ).order_by(TeamMember.project_id, TeamMember.community_id).offset(skip).limit(limit).all()
+    
+    return [
+        MemberProjectRead(
+            project_id=m.project_id,
+            community_id=m.community_id,
+            email=m.email,
+            name=m.name,
+            role=m.role
+        )
+        for m in members
+    ]
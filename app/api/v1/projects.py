@@ -1,35 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Literal, Optional, Union
 from datetime import datetime
-import json
 
-from app.core.database import get_db
-from app.models.models import Project, Todo, Community
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectRead
+from app.core.database import UnitOfWork, get_db, get_uow
+from app.models.models import Project, ProjectSummary, Task, TeamMember, Todo, Community
+from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectRead, ProjectScope, ProjectSummaryRead, ProjectSummaryPage
 from app.schemas.todo import TodoRead
 from app.schemas.community import CommunityRead
+from app.schemas.compose import ProjectCompose, ProjectComposeRead
+from app.services.project_summaries import SUMMARY_SORTS, apply_cursor, encode_cursor, refresh_project_summaries
+from app.services.soft_delete import soft_delete_project
+from app.services.tasks import load_tasks, split_tasks, task_values, todo_scope
+from app.services.team_members import member_rows
+from app.services.scope_patch import patch_scope, parse_etag, make_etag, resolve_patch_format
 
 router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
 
 
 @router.post("", response_model=ProjectRead, status_code=status.HTTP_201_CREATED)
-def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
+def create_project(project: ProjectCreate, response: Response, db: Session = Depends(get_db)):
     """
     Create a new project.
     """
     db_project = Project(
-        scope=json.dumps(project.scope),
+        scope=project.scope,
         status=project.status
     )
     db.add(db_project)
+    db.flush()
+    refresh_project_summaries(db, [db_project.id])
     db.commit()
     db.refresh(db_project)
+    response.headers["ETag"] = make_etag(db_project.updated_at)
     
     # Parse JSON back to dict for response
     return ProjectRead(
         id=db_project.id,
-        scope=json.loads(db_project.scope),
+        scope=db_project.scope,
         status=db_project.status,
         created_at=db_project.created_at,
         updated_at=db_project.updated_at,
@@ -37,6 +46,86 @@ def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/compose", response_model=ProjectComposeRead, status_code=status.HTTP_201_CREATED)
+def compose_project(graph: ProjectCompose, uow: UnitOfWork = Depends(get_uow)):
+    """
+    Create a project together with its community entries and todos (tasks
+    in `scope.tasks` included) in one transaction: either the whole graph is
+    created or nothing is.
+    
+    The round trips don't grow with the graph: one multi-row INSERT per
+    table (row by row on SQLite, which can't return generated ids in
+    order), the project summary refresh and a single commit, all on one
+    connection.
+    """
+    now = datetime.utcnow()
+    with uow.transaction() as db:
+        db_project = Project(scope=graph.scope, status=graph.status, created_at=now, updated_at=now)
+        db_project.community = [
+            Community(team=c.team, role=c.role, created_at=now, updated_at=now)
+            for c in graph.community
+        ]
+        todo_tasks = []
+        for item in graph.todos:
+            scope, tasks = split_tasks(item.scope)
+            todo_tasks.append(tasks or [])
+            db_project.todos.append(Todo(scope=scope, status=item.status, created_at=now, updated_at=now))
+        db.add(db_project)
+        db.flush()
+        
+        members = [
+            row
+            for c in db_project.community
+            for row in member_rows(c.id, db_project.id, c.team, c.role)
+        ]
+        if members:
+            db.execute(insert(TeamMember), members)
+        task_rows = [
+            {"todo_id": t.id, "created_at": now, "updated_at": now, **task_values(task, position)}
+            for t, tasks in zip(db_project.todos, todo_tasks)
+            for position, task in enumerate(tasks)
+        ]
+        if task_rows:
+            db.execute(insert(Task), task_rows)
+        refresh_project_summaries(db, [db_project.id], now)
+        tasks = load_tasks(db, [t.id for t in db_project.todos]) if task_rows else {}
+    
+    return ProjectComposeRead(
+        project=ProjectRead(
+            id=db_project.id,
+            scope=db_project.scope,
+            status=db_project.status,
+            created_at=db_project.created_at,
+            updated_at=db_project.updated_at,
+            deleted_at=db_project.deleted_at
+        ),
+        community=[
+            CommunityRead(
+                id=c.id,
+                project_id=c.project_id,
+                team=c.team,
+                role=c.role,
+                created_at=c.created_at,
+                updated_at=c.updated_at,
+                deleted_at=c.deleted_at
+            )
+            for c in db_project.community
+        ],
+        todos=[
+            TodoRead(
+                id=t.id,
+                project_id=t.project_id,
+                scope=todo_scope(t, tasks),
+                status=t.status,
+                created_at=t.created_at,
+                updated_at=t.updated_at,
+                deleted_at=t.deleted_at
+            )
+            for t in db_project.todos
+        ]
+    )
+
+
 @router.get("", response_model=List[ProjectRead])
 def list_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
@@ -48,7 +137,7 @@ def list_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
     return [
         ProjectRead(
             id=p.id,
-            scope=json.loads(p.scope),
+            scope=p.scope,
             status=p.status,
             created_at=p.created_at,
             updated_at=p.updated_at,
@@ -58,18 +147,59 @@ def list_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
     ]
 
 
+@router.get("/summaries", response_model=ProjectSummaryPage)
+def list_project_summaries(
+    project_status: Optional[str] = Query(default=None, alias="status"),
+    latest_report_status: Optional[str] = None,
+    has_open_todos: Optional[bool] = None,
+    sort: Literal["id", "-open_todos"] = "id",
+    cursor: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    List project summaries (title, status, todo/open-todo counts, member
+    count, latest status report) from the `project_summaries` read model.
+    
+    Keyset pagination: pass the `next_cursor` of a page as `cursor` to get
+    the next one (with the same filters and sort); it is null on the last
+    page. Sort by `id` or by `-open_todos` (most open todos first).
+    """
+    query = select(ProjectSummary)
+    if project_status is not None:
+        query = query.where(ProjectSummary.status == project_status)
+    if latest_report_status is not None:
+        query = query.where(ProjectSummary.latest_report_status == latest_report_status)
+    if has_open_todos is not None:
+        query = query.where(ProjectSummary.open_todo_count > 0 if has_open_todos else ProjectSummary.open_todo_count == 0)
+    if cursor is not None:
+        try:
+            query = apply_cursor(query, sort, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    summaries = db.scalars(query.order_by(*SUMMARY_SORTS[sort]).limit(limit + 1)).all()
+    next_cursor = encode_cursor(sort, summaries[limit - 1]) if len(summaries) > limit else None
+    
+    return ProjectSummaryPage(
+        items=[ProjectSummaryRead.model_validate(s) for s in summaries[:limit]],
+        next_cursor=next_cursor
+    )
+
+
 @router.get("/{id}", response_model=ProjectRead)
-def get_project(id: int, db: Session = Depends(get_db)):
+def get_project(id: int, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific project by ID.
     """
     project = db.query(Project).filter(Project.id == id, Project.deleted_at.is_(None)).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    response.headers["ETag"] = make_etag(project.updated_at)
     
     return ProjectRead(
         id=project.id,
-        scope=json.loads(project.scope),
+        scope=project.scope,
         status=project.status,
         created_at=project.created_at,
         updated_at=project.updated_at,
@@ -78,7 +208,7 @@ def get_project(id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{id}", response_model=ProjectRead)
-def update_project(id: int, project_update: ProjectUpdate, db: Session = Depends(get_db)):
+def update_project(id: int, project_update: ProjectUpdate, response: Response, db: Session = Depends(get_db)):
     """
     Update a project.
     """
@@ -87,17 +217,59 @@ def update_project(id: int, project_update: ProjectUpdate, db: Session = Depends
         raise HTTPException(status_code=404, detail="Project not found")
     
     if project_update.scope is not None:
-        project.scope = json.dumps(project_update.scope)
+        project.scope = project_update.scope
     if project_update.status is not None:
         project.status = project_update.status
     
     project.updated_at = datetime.utcnow()
+    refresh_project_summaries(db, [project.id])
     db.commit()
     db.refresh(project)
+    response.headers["ETag"] = make_etag(project.updated_at)
     
     return ProjectRead(
         id=project.id,
-        scope=json.loads(project.scope),
+        scope=project.scope,
+        status=project.status,
+        created_at=project.created_at,
+        updated_at=project.updated_at,
+        deleted_at=project.deleted_at
+    )
+
+
+@router.patch("/{id}/scope", response_model=ProjectRead)
+def patch_project_scope(
+    id: int,
+    response: Response,
+    patch: Union[Dict[str, Any], List[Dict[str, Any]]] = Body(...),
+    content_type: Optional[str] = Header(default=None),
+    if_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db)
+):
+    """
+    Partially update a project's scope.
+    
+    Accepts a JSON Merge Patch (application/merge-patch+json, RFC 7396) or a
+    JSON Patch (application/json-patch+json, RFC 6902). Send the ETag from a
+    previous response in If-Match to fail with 412 instead of overwriting a
+    concurrent change.
+    """
+    project = patch_scope(
+        db,
+        Project,
+        id,
+        patch,
+        resolve_patch_format(content_type),
+        expected_updated_at=parse_etag(if_match),
+        not_found_detail="Project not found",
+        scope_type=ProjectScope,
+        on_write=lambda: refresh_project_summaries(db, [id])
+    )
+    response.headers["ETag"] = make_etag(project.updated_at)
+    
+    return ProjectRead(
+        id=project.id,
+        scope=project.scope,
         status=project.status,
         created_at=project.created_at,
         updated_at=project.updated_at,
@@ -108,13 +280,11 @@ def update_project(id: int, project_update: ProjectUpdate, db: Session = Depends
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_project(id: int, db: Session = Depends(get_db)):
     """
-    Soft delete a project.
+    Soft delete a project along with its todos, status reports and community entries.
     """
-    project = db.query(Project).filter(Project.id == id, Project.deleted_at.is_(None)).first()
-    if not project:
+    if not soft_delete_project(db, id):
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project.deleted_at = datetime.utcnow()
     db.commit()
     return None
 
@@ -128,12 +298,13 @@ def get_project_todos(project_id: int, skip: int = 0, limit: int = 100, db: Sess
         Todo.project_id == project_id,
         Todo.deleted_at.is_(None)
     ).order_by(Todo.id).offset(skip).limit(limit).all()
+    tasks = load_tasks(db, [t.id for t in todos])
     
     return [
         TodoRead(
             id=t.id,
             project_id=t.project_id,
-            scope=json.loads(t.scope),
+            scope=todo_scope(t, tasks),
             status=t.status,
             created_at=t.created_at,
             updated_at=t.updated_at,
@@ -157,7 +328,7 @@ def get_project_community(project_id: int, skip: int = 0, limit: int = 100, db:
         CommunityRead(
             id=c.id,
             project_id=c.project_id,
-            team=json.loads(c.team),
+            team=c.team,
             role=c.role,
             created_at=c.created_at,
             updated_at=c.updated_at,
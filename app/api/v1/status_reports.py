@@ -1,34 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
-import json
 
 from app.core.database import get_db
 from app.models.models import StatusReport
-from app.schemas.status_report import StatusReportCreate, StatusReportUpdate, StatusReportRead
+from app.schemas.status_report import StatusReportCreate, StatusReportUpdate, StatusReportRead, StatusReportScope
+from app.services.project_summaries import refresh_todo_project_summaries
+from app.services.scope_patch import patch_scope, parse_etag, make_etag, resolve_patch_format
 
 router = APIRouter(prefix="/api/v1/status-reports", tags=["status-reports"])
 
 
 @router.post("", response_model=StatusReportRead, status_code=status.HTTP_201_CREATED)
-def create_status_report(status_report: StatusReportCreate, db: Session = Depends(get_db)):
+def create_status_report(status_report: StatusReportCreate, response: Response, db: Session = Depends(get_db)):
     """
     Create a new status report.
     """
     db_status_report = StatusReport(
         todo_id=status_report.todo_id,
-        scope=json.dumps(status_report.scope),
+        scope=status_report.scope,
         status=status_report.status
     )
     db.add(db_status_report)
+    db.flush()
+    refresh_todo_project_summaries(db, [db_status_report.todo_id])
     db.commit()
     db.refresh(db_status_report)
+    response.headers["ETag"] = make_etag(db_status_report.updated_at)
     
     return StatusReportRead(
         id=db_status_report.id,
         todo_id=db_status_report.todo_id,
-        scope=json.loads(db_status_report.scope),
+        scope=db_status_report.scope,
         status=db_status_report.status,
         created_at=db_status_report.created_at,
         updated_at=db_status_report.updated_at,
@@ -47,7 +51,7 @@ def list_status_reports(skip: int = 0, limit: int = 100, db: Session = Depends(g
         StatusReportRead(
             id=sr.id,
             todo_id=sr.todo_id,
-            scope=json.loads(sr.scope),
+            scope=sr.scope,
             status=sr.status,
             created_at=sr.created_at,
             updated_at=sr.updated_at,
@@ -58,18 +62,19 @@ def list_status_reports(skip: int = 0, limit: int = 100, db: Session = Depends(g
 
 
 @router.get("/{id}", response_model=StatusReportRead)
-def get_status_report(id: int, db: Session = Depends(get_db)):
+def get_status_report(id: int, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific status report by ID.
     """
     status_report = db.query(StatusReport).filter(StatusReport.id == id, StatusReport.deleted_at.is_(None)).first()
     if not status_report:
         raise HTTPException(status_code=404, detail="Status report not found")
+    response.headers["ETag"] = make_etag(status_report.updated_at)
     
     return StatusReportRead(
         id=status_report.id,
         todo_id=status_report.todo_id,
-        scope=json.loads(status_report.scope),
+        scope=status_report.scope,
         status=status_report.status,
         created_at=status_report.created_at,
         updated_at=status_report.updated_at,
@@ -81,7 +86,7 @@ def get_status_report(id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{id}", response_model=StatusReportRead)
-def update_status_report(id: int, status_report_update: StatusReportUpdate, db: Session = Depends(get_db)):
+def update_status_report(id: int, status_report_update: StatusReportUpdate, response: Response, db: Session = Depends(get_db)):
     """
     Update a status report.
     """
@@ -90,18 +95,60 @@ def update_status_report(id: int, status_report_update: StatusReportUpdate, db:
         raise HTTPException(status_code=404, detail="Status report not found")
     
     if status_report_update.scope is not None:
-        status_report.scope = json.dumps(status_report_update.scope)
+        status_report.scope = status_report_update.scope
     if status_report_update.status is not None:
         status_report.status = status_report_update.status
+        refresh_todo_project_summaries(db, [status_report.todo_id])
     
     status_report.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(status_report)
+    response.headers["ETag"] = make_etag(status_report.updated_at)
     
     return StatusReportRead(
         id=status_report.id,
         todo_id=status_report.todo_id,
-        scope=json.loads(status_report.scope),
+        scope=status_report.scope,
+        status=status_report.status,
+        created_at=status_report.created_at,
+        updated_at=status_report.updated_at,
+        deleted_at=status_report.deleted_at
+    )
+
+
+@router.patch("/{id}/scope", response_model=StatusReportRead)
+def patch_status_report_scope(
+    id: int,
+    response: Response,
+    patch: Union[Dict[str, Any], List[Dict[str, Any]]] = Body(...),
+    content_type: Optional[str] = Header(default=None),
+    if_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db)
+):
+    """
+    Partially update a status report's scope.
+    
+    Accepts a JSON Merge Patch (application/merge-patch+json, RFC 7396) or a
+    JSON Patch (application/json-patch+json, RFC 6902). Send the ETag from a
+    previous response in If-Match to fail with 412 instead of overwriting a
+    concurrent change.
+    """
+    status_report = patch_scope(
+        db,
+        StatusReport,
+        id,
+        patch,
+        resolve_patch_format(content_type),
+        expected_updated_at=parse_etag(if_match),
+        not_found_detail="Status report not found",
+        scope_type=StatusReportScope
+    )
+    response.headers["ETag"] = make_etag(status_report.updated_at)
+    
+    return StatusReportRead(
+        id=status_report.id,
+        todo_id=status_report.todo_id,
+        scope=status_report.scope,
         status=status_report.status,
         created_at=status_report.created_at,
         updated_at=status_report.updated_at,
@@ -119,5 +166,6 @@ def delete_status_report(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Status report not found")
     
     status_report.deleted_at = datetime.utcnow()
+    refresh_todo_project_summaries(db, [status_report.todo_id])
     db.commit()
     return None
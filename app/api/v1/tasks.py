@@ -0,0 +1,159 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+
+from app.core.database import get_db
+from app.models.models import Task, Todo
+from app.schemas.task import TaskCreate, TaskUpdate, TaskRead, TaskCount
+from app.services.tasks import task_counts, touch_todo
+
+router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
+
+
+def task_read(task: Task) -> TaskRead:
+    return TaskRead(
+        id=task.id,
+        todo_id=task.todo_id,
+        position=task.position,
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        assignee=task.assignee,
+        attributes=task.attributes,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        deleted_at=task.deleted_at
+    )
+
+
+@router.post("", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
+def create_task(task: TaskCreate, db: Session = Depends(get_db)):
+    """
+    Add a task to a todo (appended unless a position is given).
+    """
+    todo = db.query(Todo.id).filter(Todo.id == task.todo_id, Todo.deleted_at.is_(None)).first()
+    if not todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+
+    position = task.position
+    if position is None:
+        last = db.query(func.max(Task.position)).filter(
+            Task.todo_id == task.todo_id,
+            Task.deleted_at.is_(None)
+        ).scalar()
+        position = 0 if last is None else last + 1
+
+    db_task = Task(
+        todo_id=task.todo_id,
+        position=position,
+        title=task.title,
+        description=task.description,
+        status=task.status,
+        priority=task.priority,
+        assignee=task.assignee,
+        attributes=task.attributes or None
+    )
+    db.add(db_task)
+    touch_todo(db, task.todo_id)
+    db.commit()
+    db.refresh(db_task)
+
+    return task_read(db_task)
+
+
+@router.get("", response_model=List[TaskRead])
+def list_tasks(
+    todo_id: Optional[int] = None,
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    assignee: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    List tasks, optionally filtered by todo, project, status and assignee
+    (e.g. all open tasks assigned to someone).
+    """
+    query = db.query(Task).filter(Task.deleted_at.is_(None))
+    if project_id is not None:
+        query = query.join(Todo, Todo.id == Task.todo_id).filter(
+            Todo.project_id == project_id,
+            Todo.deleted_at.is_(None)
+        )
+    if todo_id is not None:
+        query = query.filter(Task.todo_id == todo_id)
+    if status is not None:
+        query = query.filter(Task.status == status)
+    if assignee is not None:
+        query = query.filter(Task.assignee == assignee)
+
+    tasks = query.order_by(Task.id).offset(skip).limit(limit).all()
+    return [task_read(t) for t in tasks]
+
+
+@router.get("/counts", response_model=List[TaskCount])
+def get_task_counts(project_id: Optional[int] = None, assignee: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Task counts per project and status.
+    """
+    return [
+        TaskCount(project_id=row.project_id, status=row.status, count=row.count)
+        for row in task_counts(db, project_id=project_id, assignee=assignee)
+    ]
+
+
+@router.get("/{id}", response_model=TaskRead)
+def get_task(id: int, db: Session = Depends(get_db)):
+    """
+    Get a specific task by ID.
+    """
+    task = db.query(Task).filter(Task.id == id, Task.deleted_at.is_(None)).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return task_read(task)
+
+
+@router.put("/{id}", response_model=TaskRead)
+def update_task(id: int, task_update: TaskUpdate, db: Session = Depends(get_db)):
+    """
+    Update a task.
+    """
+    task = db.query(Task).filter(Task.id == id, Task.deleted_at.is_(None)).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    for field in ("title", "description", "status", "priority", "assignee", "position"):
+        value = getattr(task_update, field)
+        if value is not None:
+            setattr(task, field, value)
+    if task_update.attributes is not None:
+        task.attributes = task_update.attributes or None
+
+    now = datetime.utcnow()
+    task.updated_at = now
+    touch_todo(db, task.todo_id, now)
+    db.commit()
+    db.refresh(task)
+
+    return task_read(task)
+
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_task(id: int, db: Session = Depends(get_db)):
+    """
+    Soft delete a task.
+    """
+    task = db.query(Task).filter(Task.id == id, Task.deleted_at.is_(None)).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    now = datetime.utcnow()
+    task.deleted_at = now
+    touch_todo(db, task.todo_id, now)
+    db.commit()
+    return None
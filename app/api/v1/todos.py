@@ -1,35 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
-import json
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.models.models import Todo, StatusReport
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoRead
+from app.models.models import Todo, StatusReport, Task
+from app.schemas.todo import TodoCreate, TodoUpdate, TodoRead, TodoScope, TodoStatusUpdate, TodoStatusRead
 from app.schemas.status_report import StatusReportRead
+from app.schemas.task import TaskRead
+from app.api.v1.tasks import task_read
+from app.services.project_summaries import refresh_project_summaries, refresh_todo_project_summaries
+from app.services.soft_delete import soft_delete_todo
+from app.services.status_events import record_todo_statuses
+from app.services.tasks import load_tasks, split_tasks, sync_tasks, task_scope_view, todo_scope
+from app.services.scope_patch import patch_scope, parse_etag, make_etag, resolve_patch_format
+from app.services.write_behind import todo_status_buffer
 
 router = APIRouter(prefix="/api/v1/todos", tags=["todos"])
 
 
 @router.post("", response_model=TodoRead, status_code=status.HTTP_201_CREATED)
-def create_todo(todo: TodoCreate, db: Session = Depends(get_db)):
+def create_todo(todo: TodoCreate, response: Response, db: Session = Depends(get_db)):
     """
-    Create a new todo.
+    Create a new todo. Tasks in `scope.tasks` are stored in the tasks table.
     """
+    scope, tasks = split_tasks(todo.scope)
     db_todo = Todo(
         project_id=todo.project_id,
-        scope=json.dumps(todo.scope),
+        scope=scope,
         status=todo.status
     )
     db.add(db_todo)
+    db.flush()
+    if tasks:
+        sync_tasks(db, db_todo.id, tasks)
+    refresh_project_summaries(db, [db_todo.project_id])
     db.commit()
     db.refresh(db_todo)
+    response.headers["ETag"] = make_etag(db_todo.updated_at)
     
     return TodoRead(
         id=db_todo.id,
         project_id=db_todo.project_id,
-        scope=json.loads(db_todo.scope),
+        scope=todo_scope(db_todo, load_tasks(db, [db_todo.id])),
         status=db_todo.status,
         created_at=db_todo.created_at,
         updated_at=db_todo.updated_at,
@@ -43,12 +58,13 @@ def list_todos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     List all todos (excluding soft-deleted ones).
     """
     todos = db.query(Todo).filter(Todo.deleted_at.is_(None)).order_by(Todo.id).offset(skip).limit(limit).all()
+    tasks = load_tasks(db, [t.id for t in todos])
     
     return [
         TodoRead(
             id=t.id,
             project_id=t.project_id,
-            scope=json.loads(t.scope),
+            scope=todo_scope(t, tasks),
             status=t.status,
             created_at=t.created_at,
             updated_at=t.updated_at,
@@ -59,18 +75,19 @@ def list_todos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
 
 
 @router.get("/{id}", response_model=TodoRead)
-def get_todo(id: int, db: Session = Depends(get_db)):
+def get_todo(id: int, response: Response, db: Session = Depends(get_db)):
     """
     Get a specific todo by ID.
     """
     todo = db.query(Todo).filter(Todo.id == id, Todo.deleted_at.is_(None)).first()
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
+    response.headers["ETag"] = make_etag(todo.updated_at)
     
     return TodoRead(
         id=todo.id,
         project_id=todo.project_id,
-        scope=json.loads(todo.scope),
+        scope=todo_scope(todo, load_tasks(db, [todo.id])),
         status=todo.status,
         created_at=todo.created_at,
         updated_at=todo.updated_at,
@@ -82,7 +99,7 @@ def get_todo(id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{id}", response_model=TodoRead)
-def update_todo(id: int, todo_update: TodoUpdate, db: Session = Depends(get_db)):
+def update_todo(id: int, todo_update: TodoUpdate, response: Response, db: Session = Depends(get_db)):
     """
     Update a todo.
     """
@@ -91,18 +108,96 @@ def update_todo(id: int, todo_update: TodoUpdate, db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail="Todo not found")
     
     if todo_update.scope is not None:
-        todo.scope = json.dumps(todo_update.scope)
+        scope, tasks = split_tasks(todo_update.scope)
+        todo.scope = scope
+        sync_tasks(db, todo.id, tasks or [])
     if todo_update.status is not None:
         todo.status = todo_update.status
+        refresh_project_summaries(db, [todo.project_id])
     
     todo.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(todo)
+    response.headers["ETag"] = make_etag(todo.updated_at)
     
     return TodoRead(
         id=todo.id,
         project_id=todo.project_id,
-        scope=json.loads(todo.scope),
+        scope=todo_scope(todo, load_tasks(db, [todo.id])),
+        status=todo.status,
+        created_at=todo.created_at,
+        updated_at=todo.updated_at,
+        deleted_at=todo.deleted_at
+    )
+
+
+@router.put("/{id}/status", response_model=TodoStatusRead)
+def update_todo_status(id: int, status_update: TodoStatusUpdate, response: Response, db: Session = Depends(get_db)):
+    """
+    Set a todo's status with a single UPDATE (no read back), recording the
+    change in `status_events` in the same transaction.
+    
+    With TODO_STATUS_WRITE_BEHIND_ENABLED the update is buffered instead and
+    written with others in the next batched flush: the response is 202, the
+    new status is not visible to reads until the flush, updates to unknown
+    or deleted todos are dropped then, and buffered updates are lost if the
+    process crashes before the flush.
+    """
+    if settings.TODO_STATUS_WRITE_BEHIND_ENABLED:
+        todo_status_buffer.put(id, status_update.status)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return TodoStatusRead(id=id, status=status_update.status, buffered=True)
+    
+    now = datetime.utcnow()
+    record_todo_statuses(db, {id: (status_update.status, now)})
+    result = db.execute(
+        update(Todo)
+        .where(Todo.id == id, Todo.deleted_at.is_(None))
+        .values(status=status_update.status, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    refresh_todo_project_summaries(db, [id])
+    db.commit()
+    
+    return TodoStatusRead(id=id, status=status_update.status, buffered=False)
+
+
+@router.patch("/{id}/scope", response_model=TodoRead)
+def patch_todo_scope(
+    id: int,
+    response: Response,
+    patch: Union[Dict[str, Any], List[Dict[str, Any]]] = Body(...),
+    content_type: Optional[str] = Header(default=None),
+    if_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db)
+):
+    """
+    Partially update a todo's scope.
+    
+    Accepts a JSON Merge Patch (application/merge-patch+json, RFC 7396) or a
+    JSON Patch (application/json-patch+json, RFC 6902). Send the ETag from a
+    previous response in If-Match to fail with 412 instead of overwriting a
+    concurrent change.
+    """
+    todo = patch_scope(
+        db,
+        Todo,
+        id,
+        patch,
+        resolve_patch_format(content_type),
+        expected_updated_at=parse_etag(if_match),
+        not_found_detail="Todo not found",
+        view=task_scope_view,
+        scope_type=TodoScope
+    )
+    response.headers["ETag"] = make_etag(todo.updated_at)
+    
+    return TodoRead(
+        id=todo.id,
+        project_id=todo.project_id,
+        scope=todo_scope(todo, load_tasks(db, [todo.id])),
         status=todo.status,
         created_at=todo.created_at,
         updated_at=todo.updated_at,
@@ -113,17 +208,28 @@ def update_todo(id: int, todo_update: TodoUpdate, db: Session = Depends(get_db))
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_todo(id: int, db: Session = Depends(get_db)):
     """
-    Soft delete a todo.
+    Soft delete a todo along with its status reports.
     """
-    todo = db.query(Todo).filter(Todo.id == id, Todo.deleted_at.is_(None)).first()
-    if not todo:
+    if not soft_delete_todo(db, id):
         raise HTTPException(status_code=404, detail="Todo not found")
     
-    todo.deleted_at = datetime.utcnow()
     db.commit()
     return None
 
 
+@router.get("/{todo_id}/tasks", response_model=List[TaskRead])
+def get_todo_tasks(todo_id: int, db: Session = Depends(get_db)):
+    """
+    Get the tasks of a specific todo, in list order.
+    """
+    tasks = db.query(Task).filter(
+        Task.todo_id == todo_id,
+        Task.deleted_at.is_(None)
+    ).order_by(Task.position, Task.id).all()
+    
+    return [task_read(t) for t in tasks]
+
+
 @router.get("/{todo_id}/status-reports", response_model=List[StatusReportRead])
 def get_todo_status_reports(todo_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
@@ -138,7 +244,7 @@ def get_todo_status_reports(todo_id: int, skip: int = 0, limit: int = 100, db: S
         StatusReportRead(
             id=sr.id,
             todo_id=sr.todo_id,
-            scope=json.loads(sr.scope),
+            scope=sr.scope,
             status=sr.status,
             created_at=sr.created_at,
             updated_at=sr.updated_at,
@@ -0,0 +1,188 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli purge-deleted [--retention-days N] [--batch-size N]
+    python -m app.cli backfill-tasks [--batch-size N]
+    python -m app.cli backfill-members [--batch-size N]
+    python -m app.cli rebuild-project-summaries [--batch-size N]
+    python -m app.cli purge-idempotency-keys [--batch-size N]
+    python -m app.cli run-jobs [--concurrency N]
+    python -m app.cli export-snapshot [--name NAME] [--format FORMAT] [--workers N]
+    python -m app.cli restore-snapshot PATH [--replace] [--workers N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+
+def purge_deleted(args) -> None:
+    from app.services.soft_delete import purge_soft_deleted
+
+    db = SessionLocal()
+    try:
+        purged = purge_soft_deleted(db, args.retention_days, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps({"purged": purged}))
+
+
+def backfill_tasks(args) -> None:
+    from app.services.tasks import backfill_tasks as backfill
+
+    db = SessionLocal()
+    try:
+        counts = backfill(db, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(counts))
+
+
+def backfill_members(args) -> None:
+    from app.services.team_members import backfill_team_members
+
+    db = SessionLocal()
+    try:
+        counts = backfill_team_members(db, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(counts))
+
+
+def rebuild_summaries(args) -> None:
+    from app.services.project_summaries import rebuild_project_summaries
+
+    db = SessionLocal()
+    try:
+        counts = rebuild_project_summaries(db, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(counts))
+
+
+def purge_idempotency_keys(args) -> None:
+    from app.services.idempotency import purge_expired_keys
+
+    db = SessionLocal()
+    try:
+        purged = purge_expired_keys(db, args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps({"purged": purged}))
+
+
+def export_snapshot(args) -> None:
+    from datetime import datetime
+
+    from app.core.database import engine
+    from app.services.snapshots import SnapshotError, export_snapshot as export, snapshot_path
+
+    name = args.name or datetime.utcnow().strftime("snapshot-%Y%m%d-%H%M%S")
+    try:
+        path = snapshot_path(args.directory, name)
+        manifest = export(
+            engine,
+            path,
+            args.format,
+            part_rows=args.part_rows,
+            batch_size=args.batch_size,
+            workers=args.workers,
+        )
+    except SnapshotError as e:
+        sys.exit(str(e))
+    print(json.dumps({"path": path, **manifest}))
+
+
+def restore_snapshot(args) -> None:
+    from app.core.database import engine
+    from app.services.snapshots import SnapshotError, restore_snapshot as restore
+
+    try:
+        counts = restore(engine, args.path, replace=args.replace, batch_size=args.batch_size, workers=args.workers)
+    except SnapshotError as e:
+        sys.exit(str(e))
+    print(json.dumps(counts))
+
+
+def run_jobs(args) -> None:
+    from app.services.foundry_usage import usage_recorder
+    from app.services.jobs import job_worker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    job_worker.concurrency = args.concurrency
+
+    async def run():
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+        usage_recorder.start()
+        job_worker.start()
+        await stop.wait()
+        # Running jobs get the graceful timeout, then go back to the queue
+        await job_worker.stop(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS)
+        await usage_recorder.stop()
+
+    asyncio.run(run())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="FlowPilot maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    purge = commands.add_parser("purge-deleted", help="Hard-delete tombstones older than the retention window")
+    purge.add_argument("--retention-days", type=int, default=settings.SOFT_DELETE_RETENTION_DAYS)
+    purge.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    purge.set_defaults(handler=purge_deleted)
+
+    tasks = commands.add_parser("backfill-tasks", help="Move tasks embedded in todo scopes into the tasks table")
+    tasks.add_argument("--batch-size", type=int, default=500)
+    tasks.set_defaults(handler=backfill_tasks)
+
+    members = commands.add_parser("backfill-members", help="Rebuild team_members from community team JSON")
+    members.add_argument("--batch-size", type=int, default=500)
+    members.set_defaults(handler=backfill_members)
+
+    summaries = commands.add_parser("rebuild-project-summaries", help="Regenerate the project_summaries read model")
+    summaries.add_argument("--batch-size", type=int, default=500)
+    summaries.set_defaults(handler=rebuild_summaries)
+
+    idempotency = commands.add_parser("purge-idempotency-keys", help="Delete expired Idempotency-Key responses")
+    idempotency.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    idempotency.set_defaults(handler=purge_idempotency_keys)
+
+    worker = commands.add_parser("run-jobs", help="Run a background job worker until interrupted")
+    worker.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    worker.set_defaults(handler=run_jobs)
+
+    export = commands.add_parser("export-snapshot", help="Dump the primary tables to a compressed snapshot directory")
+    export.add_argument("--name", help="Snapshot directory name (default: snapshot-<UTC timestamp>)")
+    export.add_argument("--directory", default=settings.SNAPSHOT_DIR)
+    export.add_argument("--format", default=settings.SNAPSHOT_FORMAT, help="parquet, jsonl.zst or jsonl.gz")
+    export.add_argument("--part-rows", type=int, default=settings.SNAPSHOT_PART_ROWS)
+    export.add_argument("--batch-size", type=int, default=settings.SNAPSHOT_BATCH_SIZE)
+    export.add_argument("--workers", type=int, default=settings.SNAPSHOT_WORKERS)
+    export.set_defaults(handler=export_snapshot)
+
+    restore = commands.add_parser("restore-snapshot", help="Load a snapshot into empty tables (or --replace)")
+    restore.add_argument("path", help="Snapshot directory")
+    restore.add_argument("--replace", action="store_true", help="Delete the existing rows first")
+    restore.add_argument("--batch-size", type=int, default=settings.SNAPSHOT_BATCH_SIZE)
+    restore.add_argument("--workers", type=int, default=settings.SNAPSHOT_WORKERS)
+    restore.set_defaults(handler=restore_snapshot)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
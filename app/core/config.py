@@ -1,5 +1,7 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
-from typing import Optional
+from sqlalchemy.engine import URL, make_url
+from typing import Dict, Optional, List
 import urllib
 
 
@@ -7,12 +9,55 @@ class Settings(BaseSettings):
     """
     Application settings loaded from environment variables.
     """
-    # SQL Server Configuration (Windows Authentication)
-    DB_SERVER: str = "localhost\\SQLEXPRESS"
+    # Database backend: "mssql", "postgresql" or "sqlite".
+    # DATABASE_URL, when set, overrides everything below.
+    DB_BACKEND: str = "mssql"
+    DATABASE_URL: Optional[str] = None
     DB_NAME: str = "flowpilot_db"
+    DB_USER: Optional[str] = None
+    DB_PASSWORD: Optional[str] = None
+    
+    # SQL Server (Windows Authentication unless DB_USER is set)
+    DB_SERVER: str = "localhost\\SQLEXPRESS"
+    DB_ODBC_DRIVER: str = "ODBC Driver 17 for SQL Server"
     DB_ENCRYPT: str = "no"
     DB_TRUST_CERT: str = "yes"
     
+    # PostgreSQL
+    DB_HOST: str = "localhost"
+    DB_PORT: Optional[int] = None
+    
+    # SQLite
+    SQLITE_PATH: str = "flowpilot.db"
+    
+    # Connection pool, per process (replicas get the same sizes). The launcher
+    # (python -m app.server) shrinks them to fit DB_MAX_CONNECTIONS.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_MAX_CONNECTIONS: Optional[int] = None
+    
+    # Startup warm-up (connections opened per pool, statement cache)
+    STARTUP_WARMUP_ENABLED: bool = True
+    DB_POOL_WARM_CONNECTIONS: int = 2
+    
+    # Read replicas (JSON list of URLs); GET requests read from them
+    DB_READ_REPLICA_URLS: List[str] = []
+    DB_REPLICA_STRATEGY: str = "round_robin"  # or "least_connections"
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_REPLICA_HEALTH_INTERVAL_SECONDS: float = 10.0
+    DB_REPLICA_HEALTH_TIMEOUT_SECONDS: float = 2.0
+    
+    # Server (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: Optional[int] = None  # default: one per CPU core
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    
     # Foundry Configuration
     FOUNDRY_BASE_URL: str = "https://your-foundry-instance.com"
     FOUNDRY_API_KEY: str = "your_foundry_api_key"
@@ -23,21 +68,188 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     
+    # Response Compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json",
+        "application/problem+json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+        "text/*",
+    ]
+    
+    # Observability
+    METRICS_ENABLED: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    
+    # Slow-query log / N+1 detection
+    DB_QUERY_LOG_ENABLED: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
+    DB_QUERY_LOG_BUFFER_SIZE: int = 500
+    DB_QUERY_LOG_PARAMETERS: bool = False  # bound values include scopes and emails
+    
+    # Readiness probes
+    HEALTH_CACHE_TTL_SECONDS: float = 5.0
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_FOUNDRY_TIMEOUT_SECONDS: float = 2.0
+    HEALTH_POOL_SATURATION_THRESHOLD: float = 0.9
+    HEALTH_FOUNDRY_REQUIRED: bool = False  # False: a Foundry outage only degrades
+    
+    # Soft-delete retention (purged by `python -m app.cli purge-deleted`)
+    SOFT_DELETE_RETENTION_DAYS: int = 30
+    PURGE_BATCH_SIZE: int = 1000
+    
+    # Admin endpoints (X-Admin-Key header): query log and snapshots. They are
+    # disabled (404) while it is empty.
+    ADMIN_API_KEY: Optional[str] = None
+    
+    # Idempotency-Key handling for POSTs: how long responses are kept, and
+    # how long a duplicate waits for the original before getting a 409.
+    # Keys are per client: the IDEMPOTENCY_CLIENT_HEADER value (set by a
+    # trusted gateway) or the client IP.
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_HOURS: float = 24.0
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: float = 30.0
+    IDEMPOTENCY_CLIENT_HEADER: Optional[str] = None
+    
+    # Background jobs. Off by default, since JOBS_ENABLED makes every API
+    # process poll the jobs table; run workers separately
+    # (python -m app.cli run-jobs), or enable it for single-process setups.
+    JOBS_ENABLED: bool = False
+    JOB_WORKER_CONCURRENCY: int = 4  # Also caps concurrent Foundry calls per process
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0  # Doubles after each failed attempt
+    JOB_LOCK_TIMEOUT_SECONDS: float = 300.0  # Running jobs older than this are retried
+    
+    # Request size limits: bodies over REQUEST_MAX_BODY_BYTES get a 413 before
+    # they are read in full; scopes over SCOPE_MAX_BYTES (as JSON) a 422
+    REQUEST_MAX_BODY_BYTES: int = 1048576  # 1 MiB
+    SCOPE_MAX_BYTES: int = 262144  # 256 KiB
+    
+    # Write-behind for PUT /api/v1/todos/{id}/status: updates are buffered in
+    # memory and flushed in batches; buffered updates are lost on a crash.
+    TODO_STATUS_WRITE_BEHIND_ENABLED: bool = False
+    TODO_STATUS_FLUSH_INTERVAL_SECONDS: float = 0.5
+    TODO_STATUS_MAX_PENDING: int = 10000
+    
+    # Foundry usage accounting: one foundry_usage row per agent call, buffered
+    # in memory and written in batches (lost on a crash). Token budgets are per
+    # project and FOUNDRY_BUDGET_PERIOD (day or month, UTC); 0 = no budget.
+    # FOUNDRY_BUDGET_OVERRIDES maps project ids to their own budget.
+    FOUNDRY_USAGE_ENABLED: bool = True
+    FOUNDRY_USAGE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    FOUNDRY_USAGE_MAX_PENDING: int = 10000
+    FOUNDRY_BUDGET_TOKENS: int = 0
+    FOUNDRY_BUDGET_OVERRIDES: Dict[int, int] = {}
+    FOUNDRY_BUDGET_PERIOD: str = "month"
+    FOUNDRY_BUDGET_SYNC_SECONDS: float = 30.0
+    
+    # Snapshots (python -m app.cli export-snapshot / restore-snapshot and the
+    # admin endpoints). SNAPSHOT_FORMAT: parquet, jsonl.zst or jsonl.gz;
+    # empty picks the best available.
+    SNAPSHOT_DIR: str = "snapshots"
+    SNAPSHOT_FORMAT: Optional[str] = None
+    SNAPSHOT_PART_ROWS: int = 100000
+    SNAPSHOT_BATCH_SIZE: int = 5000
+    SNAPSHOT_WORKERS: int = 4
+    
+    # Rate limiting: token buckets per client (IP, or RATE_LIMIT_KEY_HEADER)
+    # and route group. Backends: "memory" (per worker) or "redis" (shared).
+    # Off by default: behind a proxy, keying by IP needs
+    # SERVER_FORWARDED_ALLOW_IPS set, and RATE_LIMIT_KEY_HEADER must be a
+    # header only a trusted gateway sets.
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_KEY_HEADER: Optional[str] = None
+    RATE_LIMIT_CRUD_PER_SECOND: float = 20.0
+    RATE_LIMIT_CRUD_BURST: int = 100
+    RATE_LIMIT_FOUNDRY_PER_SECOND: float = 0.5
+    RATE_LIMIT_FOUNDRY_BURST: int = 10
+    RATE_LIMIT_CLIENT_MULTIPLIERS: Dict[str, float] = {}
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    
+    @field_validator("RATE_LIMIT_CRUD_PER_SECOND", "RATE_LIMIT_FOUNDRY_PER_SECOND")
+    @classmethod
+    def _positive_rate(cls, value: float) -> float:
+        # Token refill and Retry-After divide by the rate; turn limiting off
+        # with RATE_LIMIT_ENABLED=False instead of a zero rate.
+        if value <= 0:
+            raise ValueError("must be greater than 0")
+        return value
+    
+    @field_validator("RATE_LIMIT_CRUD_BURST", "RATE_LIMIT_FOUNDRY_BURST")
+    @classmethod
+    def _positive_burst(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("must be at least 1")
+        return value
+    
+    @field_validator("RATE_LIMIT_CLIENT_MULTIPLIERS")
+    @classmethod
+    def _positive_multipliers(cls, value: Dict[str, float]) -> Dict[str, float]:
+        invalid = sorted(client for client, multiplier in value.items() if multiplier <= 0)
+        if invalid:
+            raise ValueError(f"multipliers must be greater than 0 (got {', '.join(invalid)})")
+        return value
+    
     @property
     def database_url(self) -> str:
         """
-        Construct SQL Server connection string for SQLAlchemy with Windows Authentication.
+        SQLAlchemy URL for the configured backend.
+        """
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
+        backend = self.DB_BACKEND.lower()
+        if backend == "sqlite":
+            return f"sqlite:///{self.SQLITE_PATH}"
+        if backend == "postgresql":
+            return URL.create(
+                "postgresql+psycopg",
+                username=self.DB_USER,
+                password=self.DB_PASSWORD,
+                host=self.DB_HOST,
+                port=self.DB_PORT,
+                database=self.DB_NAME,
+            ).render_as_string(hide_password=False)
+        if backend == "mssql":
+            return self.mssql_url()
+        raise ValueError(f"Unsupported DB_BACKEND {self.DB_BACKEND!r} (use mssql, postgresql or sqlite)")
+    
+    def mssql_url(self) -> str:
+        """
+        Construct SQL Server connection string for SQLAlchemy.
         Format: mssql+pyodbc:///?odbc_connect=...
+        Uses Windows Authentication unless DB_USER is set.
         """
+        if self.DB_USER:
+            password = (self.DB_PASSWORD or "").replace("}", "}}")
+            auth = f"UID={self.DB_USER};PWD={{{password}}};"
+        else:
+            auth = "Trusted_Connection=yes;"
         params = urllib.parse.quote_plus(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"DRIVER={{{self.DB_ODBC_DRIVER}}};"
             f"SERVER={self.DB_SERVER};"
             f"DATABASE={self.DB_NAME};"
-            f"Trusted_Connection=yes;"
+            f"{auth}"
+            f"Encrypt={self.DB_ENCRYPT};"
             f"TrustServerCertificate={self.DB_TRUST_CERT};"
         )
         return f"mssql+pyodbc:///?odbc_connect={params}"
     
+    @property
+    def database_backend(self) -> str:
+        """
+        Backend name of database_url: "mssql", "postgresql", "sqlite", ...
+        """
+        return make_url(self.database_url).get_backend_name()
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
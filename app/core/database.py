@@ -1,15 +1,88 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core import metrics
+from app.core.query_log import query_log
+from app.core.replicas import READ_METHODS, Replica, ReplicaRouter
+from app.core.request_context import get_request_context
+
+# Applied to every SQLite connection: WAL lets readers run alongside the
+# writer, NORMAL sync is durable at checkpoints (safe with WAL), and the
+# cache/mmap sizes keep hot pages out of the syscall path.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": "5000",
+    "cache_size": "-65536",  # KiB, i.e. 64 MiB
+    "temp_store": "MEMORY",
+    "mmap_size": "268435456",
+}
+
+
+# Not accepted by StaticPool (in-memory SQLite)
+POOL_SIZING_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def create_database_engine(url: str, **kwargs) -> Engine:
+    """
+    Create an engine with the options that suit its backend.
+
+    - SQLite: WAL and tuned pragmas; connections may be shared across the
+      threadpool; in-memory databases use a single static connection.
+    - PostgreSQL / SQL Server: pooled connections checked before use and
+      recycled hourly; fast_executemany for bulk inserts on SQL Server.
+
+    Extra keyword arguments are passed through to create_engine.
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        database = make_url(url).database
+        if not database or database == ":memory:":
+            options["poolclass"] = StaticPool
+            kwargs = {k: v for k, v in kwargs.items() if k not in POOL_SIZING_OPTIONS}
+        options.update(kwargs)
+        target = create_engine(url, **options)
+        event.listen(target, "connect", _set_sqlite_pragmas)
+        return target
+
+    options = {"pool_pre_ping": True, "pool_recycle": 3600}
+    if backend == "mssql":
+        options["fast_executemany"] = True
+    options.update(kwargs)
+    return create_engine(url, **options)
+
+
+def pool_options() -> dict:
+    """
+    Pool sizing from settings, for engines serving requests.
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+engine = create_database_engine(settings.database_url, echo=settings.DEBUG, **pool_options())
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -18,13 +91,130 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    metrics.DB_QUERY_DURATION.observe(elapsed)
+    request = get_request_context()
+    if request is not None:
+        request.db_queries += 1
+        request.db_time += elapsed
+    if query_log is not None:
+        query_log.record(statement, parameters, elapsed, request)
+
+
+def instrument_engine(target: Engine) -> Engine:
+    """
+    Attach query count/duration listeners (and the slow-query log, when
+    enabled) to an engine.
+    Statements executed while serving a request are attributed to it.
+    """
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    return target
+
+
+# Read replicas for GET requests (see app.core.replicas)
+read_replicas = ReplicaRouter(
+    [
+        Replica(f"replica-{index}", create_database_engine(url, echo=settings.DEBUG, **pool_options()))
+        for index, url in enumerate(settings.DB_READ_REPLICA_URLS)
+    ],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
+
+if settings.METRICS_ENABLED or settings.DB_QUERY_LOG_ENABLED:
+    instrument_engine(engine)
+    for replica in read_replicas.replicas:
+        instrument_engine(replica.engine)
+
+
+def get_db(request: Request):
     """
     Dependency function to get database session.
+    GET/HEAD requests get a read-replica session when replicas are configured,
+    unless the client wrote recently; everything else uses the primary.
     Yields a database session and ensures it's closed after use.
     """
-    db = SessionLocal()
+    replica = None
+    if (
+        read_replicas.enabled
+        and request.method in READ_METHODS
+        and not read_replicas.is_sticky(request.cookies)
+    ):
+        replica = read_replicas.pick()
+    metrics.DB_SESSIONS.inc((replica.name if replica else "primary",))
+
+    db = replica.session_factory() if replica else SessionLocal()
     try:
         yield db
+    except OperationalError as e:
+        # Connection failures, timeouts: skip the replica until its next health check
+        if replica is not None:
+            read_replicas.mark_failed(replica, type(e.orig).__name__)
+        raise
     finally:
         db.close()
+        if replica is not None:
+            read_replicas.release(replica)
+
+
+class UnitOfWork:
+    """
+    The database work of one request: a session pinned to a single
+    connection checkout, with explicit transaction boundaries.
+
+    `with uow.transaction() as db:` commits when the block exits and rolls
+    back if it raises. Transactions don't nest: opening one inside another
+    is a RuntimeError rather than an early commit of the outer one.
+
+    Objects are not expired on commit: everything is flushed before the
+    commit, so building the response does not reload it.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._active = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[Session]:
+        if self._active:
+            raise RuntimeError("A unit of work transaction is already open")
+        self._active = True
+        try:
+            yield self.session
+            self.session.commit()
+        except BaseException:
+            self.session.rollback()
+            raise
+        finally:
+            self._active = False
+
+
+@contextmanager
+def open_unit_of_work(bind: Optional[Engine] = None) -> Iterator[UnitOfWork]:
+    """
+    A UnitOfWork on one connection of `bind` (default: the primary engine),
+    returned to the pool on exit with anything uncommitted rolled back.
+    """
+    with (bind or engine).connect() as connection:
+        db = SessionLocal(bind=connection, expire_on_commit=False)
+        try:
+            yield UnitOfWork(db)
+        finally:
+            db.close()
+
+
+def get_uow():
+    """
+    Dependency yielding a UnitOfWork on the primary database: the request
+    checks out one connection for all of its transactions.
+    """
+    metrics.DB_SESSIONS.inc(("primary",))
+    with open_unit_of_work() as uow:
+        yield uow
@@ -0,0 +1,239 @@
+"""
+Minimal in-process metrics registry rendered in Prometheus text format.
+
+Kept dependency-free on purpose: each update is a dict lookup plus a few
+additions under a lock, which keeps the per-request cost in microseconds.
+"""
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="%s"' % le)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric and renders them for the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP metrics
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "Total HTTP requests", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency in seconds", ("method", "route")
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",)
+)
+HTTP_RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size in bytes", ("method", "route"), SIZE_BUCKETS
+)
+
+# Database metrics
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Database statement execution time in seconds"
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request", ("route",), COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_time_per_request_seconds", "Total database time per HTTP request in seconds", ("route",)
+)
+DB_SESSIONS = registry.counter(
+    "db_sessions_total", "Database sessions opened by request handlers", ("target",)
+)
+
+# Rate limiting
+RATE_LIMITED = registry.counter(
+    "rate_limited_requests_total", "Requests rejected by the rate limiter", ("group",)
+)
+
+# Request size limits
+REQUESTS_TOO_LARGE = registry.counter(
+    "http_requests_too_large_total", "Requests rejected because their body is over REQUEST_MAX_BODY_BYTES"
+)
+
+# Write-behind todo status updates
+TODO_STATUS_WRITES = registry.counter(
+    "todo_status_writes_total", "Todo status updates accepted into the write-behind buffer"
+)
+TODO_STATUS_FLUSHED_ROWS = registry.counter(
+    "todo_status_flushed_rows_total", "Todo rows updated by write-behind flushes"
+)
+TODO_STATUS_COALESCING_RATIO = registry.gauge(
+    "todo_status_coalescing_ratio", "Share of buffered todo status updates overwritten before their flush"
+)
+TODO_STATUS_PENDING = registry.gauge(
+    "todo_status_pending", "Todo status updates waiting for the next flush"
+)
+TODO_STATUS_FLUSH_DURATION = registry.histogram(
+    "todo_status_flush_duration_seconds", "Duration of write-behind flushes in seconds"
+)
+TODO_STATUS_FLUSH_ERRORS = registry.counter(
+    "todo_status_flush_errors_total", "Write-behind flushes that failed and were retried"
+)
+
+# Foundry usage accounting
+FOUNDRY_CALLS = registry.counter(
+    "foundry_calls_total", "Foundry agent calls by source and outcome", ("source", "outcome")
+)
+FOUNDRY_CALL_DURATION = registry.histogram(
+    "foundry_call_duration_seconds", "Foundry agent call latency in seconds", ("source",)
+)
+FOUNDRY_TOKENS = registry.counter(
+    "foundry_tokens_total", "Tokens reported by Foundry agent responses", ("kind",)
+)
+FOUNDRY_USAGE_PENDING = registry.gauge(
+    "foundry_usage_pending", "Foundry usage records waiting for the next flush"
+)
+FOUNDRY_USAGE_DROPPED = registry.counter(
+    "foundry_usage_dropped_total", "Foundry usage records dropped because the buffer was full"
+)
@@ -0,0 +1,179 @@
+"""
+Helpers for Alembic revisions that touch large, live tables.
+
+- create_index_online / drop_index_online build indexes without blocking
+  writes where the database can: `WITH (ONLINE = ON)` on SQL Server editions
+  that support it, `CONCURRENTLY` on PostgreSQL, and a plain CREATE INDEX
+  elsewhere (SQLite, SQL Server Standard/Express).
+- batched_update rewrites a table in primary-key ranges, committing after
+  each range, so locks and log growth stay bounded by `batch_size` rows.
+- add_column_with_backfill adds a column as nullable, backfills it in
+  batches and only then applies NOT NULL.
+
+Use them from revision files only (they call `alembic.op`).
+"""
+import logging
+import time
+from typing import Any, Dict, Optional, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.sql.elements import ClauseElement
+
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# SERVERPROPERTY('EngineEdition'): Enterprise/Developer, Azure SQL Database,
+# Azure SQL Managed Instance.
+_MSSQL_ONLINE_EDITIONS = {3, 5, 8}
+
+
+def supports_online_index(bind) -> bool:
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        return True
+    if dialect != "mssql" or op.get_context().as_sql:
+        return False
+    edition = bind.execute(sa.text("SELECT CAST(SERVERPROPERTY('EngineEdition') AS INT)")).scalar()
+    return edition in _MSSQL_ONLINE_EDITIONS
+
+
+def create_index_online(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    include: Optional[Sequence[str]] = None,
+    where: Optional[str] = None,
+) -> None:
+    """
+    Create an index without taking a long blocking lock where supported.
+
+    `include` adds non-key columns on SQL Server / PostgreSQL; `where` makes
+    a filtered / partial index (a SQL predicate string).
+    """
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect == "mssql" and supports_online_index(bind):
+        quote = bind.dialect.identifier_preparer.quote
+        statement = "CREATE {unique}INDEX {name} ON {table} ({columns})".format(
+            unique="UNIQUE " if unique else "",
+            name=quote(index_name),
+            table=quote(table_name),
+            columns=", ".join(quote(column) for column in columns),
+        )
+        if include:
+            statement += " INCLUDE ({})".format(", ".join(quote(column) for column in include))
+        if where:
+            statement += f" WHERE {where}"
+        op.execute(statement + " WITH (ONLINE = ON)")
+        return
+
+    if dialect == "mssql":
+        logger.warning("Online index builds are not available on this SQL Server edition; "
+                       "creating %s offline", index_name)
+
+    kwargs: Dict[str, Any] = {"unique": unique}
+    if include and dialect in ("mssql", "postgresql"):
+        kwargs[f"{dialect}_include"] = list(include)
+    if where and dialect in ("mssql", "postgresql", "sqlite"):
+        kwargs[f"{dialect}_where"] = sa.text(where)
+
+    if dialect == "postgresql":
+        # CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, list(columns), postgresql_concurrently=True, **kwargs)
+        return
+    op.create_index(index_name, table_name, list(columns), **kwargs)
+
+
+def drop_index_online(index_name: str, table_name: str) -> None:
+    """
+    Drop an index; uses DROP INDEX CONCURRENTLY on PostgreSQL.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        return
+    op.drop_index(index_name, table_name=table_name)
+
+
+def batched_update(
+    table_name: str,
+    values: Dict[str, Any],
+    where: Union[str, ClauseElement, None] = None,
+    batch_size: int = 5000,
+    key: str = "id",
+    pause_seconds: float = 0.0,
+) -> int:
+    """
+    UPDATE `table_name` SET `values` in ranges of `batch_size` primary keys,
+    committing after every range. Returns the number of rows updated.
+
+    `values` maps column names to literals or SQL expressions (plain strings
+    are treated as SQL, e.g. {"priority": "'medium'"}). `where` restricts
+    the rows. Because ranges commit independently, the statement must be
+    idempotent: a rerun after a failure simply continues. `pause_seconds`
+    between ranges leaves room for concurrent traffic.
+    """
+    table = sa.table(table_name, sa.column(key), *(sa.column(name) for name in values))
+    assignments = {
+        name: sa.text(value) if isinstance(value, str) else value
+        for name, value in values.items()
+    }
+    condition = sa.text(where) if isinstance(where, str) else where
+
+    statement = sa.update(table).values(assignments)
+    if condition is not None:
+        statement = statement.where(condition)
+
+    context = op.get_context()
+    if context.as_sql:
+        # Offline (--sql) mode cannot look at the data; emit one statement.
+        op.execute(statement)
+        return 0
+
+    updated = 0
+    with context.autocommit_block():
+        bind = op.get_bind()
+        bounds = bind.execute(sa.select(sa.func.min(table.c[key]), sa.func.max(table.c[key]))).first()
+        if bounds is None or bounds[0] is None:
+            return 0
+        low, high = bounds
+        while low <= high:
+            result = bind.execute(
+                statement.where(table.c[key] >= low, table.c[key] < low + batch_size)
+            )
+            updated += max(result.rowcount, 0)
+            low += batch_size
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    logger.info("Updated %d rows of %s in batches of %d", updated, table_name, batch_size)
+    return updated
+
+
+def add_column_with_backfill(
+    table_name: str,
+    column: sa.Column,
+    backfill: Union[str, ClauseElement],
+    batch_size: int = 5000,
+) -> None:
+    """
+    Add `column` to a populated table without a long lock: add it as
+    nullable (a metadata-only change), fill existing rows with `backfill`
+    in batches, then apply NOT NULL if the column asked for it.
+    """
+    nullable = column.nullable
+    column.nullable = True
+    op.add_column(table_name, column)
+    column.nullable = nullable
+    batched_update(
+        table_name,
+        {column.name: backfill},
+        where=sa.column(column.name).is_(None),
+        batch_size=batch_size,
+    )
+    if not nullable:
+        with op.batch_alter_table(table_name) as batch:
+            batch.alter_column(column.name, existing_type=column.type, nullable=False)
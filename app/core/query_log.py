@@ -0,0 +1,176 @@
+"""
+Slow-query log and N+1 detector fed by SQLAlchemy cursor events.
+
+Statements slower than the configured threshold, and statements that a
+single request runs more than `n_plus_one_threshold` times (same
+fingerprint), are written to the `flowpilot.sql` logger as JSON and kept in
+bounded in-memory ring buffers for the admin endpoints.
+"""
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+
+from app.core.config import settings
+from app.core.request_context import RequestContext
+
+
+logger = logging.getLogger("flowpilot.sql")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP_DIRS = (
+    os.path.join(_APP_DIR, "core") + os.sep,
+    os.path.join(_APP_DIR, "middleware") + os.sep,
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_MAX_STATEMENT_CHARS = 2000
+_MAX_PARAMS_CHARS = 500
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """
+    Strip literals and collapse IN-lists/whitespace so that statements
+    differing only by values share a fingerprint.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Short, stable identifier for a normalized statement.
+    """
+    return hashlib.sha1(normalize_statement(statement).encode("utf-8")).hexdigest()[:16]
+
+
+def _statement_origin() -> Optional[str]:
+    """
+    Find the innermost application frame (router, service...) that issued
+    the statement, skipping SQLAlchemy and our own instrumentation.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and not filename.startswith(_SKIP_DIRS):
+            relative = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+            return f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _format_parameters(parameters: Any) -> str:
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMS_CHARS:
+        text = text[:_MAX_PARAMS_CHARS] + "...]"
+    return text
+
+
+class QueryLog:
+    """
+    Ring buffers of slow statements and N+1 suspects.
+    """
+
+    def __init__(
+        self,
+        slow_query_ms: float = 200.0,
+        n_plus_one_threshold: int = 10,
+        buffer_size: int = 500,
+        capture_parameters: bool = False,
+    ):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.capture_parameters = capture_parameters
+        self.slow_queries: deque = deque(maxlen=buffer_size)
+        self.n_plus_one: deque = deque(maxlen=buffer_size)
+
+    def record(self, statement: str, parameters: Any, elapsed: float, request: Optional[RequestContext]) -> None:
+        """
+        Inspect one executed statement. Called from after_cursor_execute.
+        """
+        duration_ms = elapsed * 1000
+
+        if request is not None and self.n_plus_one_threshold > 0:
+            statement_fp = fingerprint(statement)
+            if request.query_counts is None:
+                request.query_counts = {}
+            count = request.query_counts.get(statement_fp, 0) + 1
+            request.query_counts[statement_fp] = count
+            if count > self.n_plus_one_threshold:
+                self._track_n_plus_one(statement, statement_fp, count, request)
+
+        if duration_ms >= self.slow_query_ms:
+            entry = self._entry(statement, parameters, request)
+            entry["duration_ms"] = round(duration_ms, 3)
+            self.slow_queries.append(entry)
+            logger.warning(json.dumps({"event": "slow_query", **entry}, default=str))
+
+    def _track_n_plus_one(self, statement: str, statement_fp: str, count: int, request: RequestContext) -> None:
+        if request.n_plus_one is None:
+            request.n_plus_one = {}
+        entry = request.n_plus_one.get(statement_fp)
+        if entry is not None:
+            # Already reported for this request; keep the count current.
+            entry["count"] = count
+            return
+        entry = self._entry(statement, None, request)
+        entry["count"] = count
+        entry["threshold"] = self.n_plus_one_threshold
+        request.n_plus_one[statement_fp] = entry
+        self.n_plus_one.append(entry)
+        logger.warning(json.dumps({"event": "n_plus_one", **entry}, default=str))
+
+    def _entry(self, statement: str, parameters: Any, request: Optional[RequestContext]) -> Dict[str, Any]:
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "fingerprint": fingerprint(statement),
+            "statement": statement[:_MAX_STATEMENT_CHARS],
+            "route": request.route if request is not None else None,
+            "method": request.method if request is not None else None,
+            "path": request.path if request is not None else None,
+            "origin": _statement_origin(),
+        }
+        if parameters is not None and self.capture_parameters:
+            entry["parameters"] = _format_parameters(parameters)
+        return entry
+
+    def recent_slow_queries(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._newest(self.slow_queries, limit)
+
+    def recent_n_plus_one(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._newest(self.n_plus_one, limit)
+
+    @staticmethod
+    def _newest(buffer: deque, limit: int) -> List[Dict[str, Any]]:
+        # [-0:] would be the whole buffer
+        if limit <= 0:
+            return []
+        return list(buffer)[-limit:][::-1]
+
+    def clear(self) -> None:
+        self.slow_queries.clear()
+        self.n_plus_one.clear()
+
+
+query_log: Optional[QueryLog] = None
+if settings.DB_QUERY_LOG_ENABLED:
+    query_log = QueryLog(
+        slow_query_ms=settings.DB_SLOW_QUERY_MS,
+        n_plus_one_threshold=settings.DB_N_PLUS_ONE_THRESHOLD,
+        buffer_size=settings.DB_QUERY_LOG_BUFFER_SIZE,
+        capture_parameters=settings.DB_QUERY_LOG_PARAMETERS,
+    )
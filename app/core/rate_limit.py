@@ -0,0 +1,243 @@
+"""
+Token-bucket rate limiting per client and route group.
+
+Each (group, client) pair has a bucket holding up to `burst` tokens that
+refills at `per_second` tokens per second; a request takes one token or is
+rejected with 429 and the time until one is available.
+
+Backends:
+- MemoryBackend keeps buckets in the process (limits are per worker). The
+  check is a dict lookup and a few float operations.
+- SharedBackend keeps buckets in a store shared by all workers/instances,
+  updated with compare-and-set so concurrent requests never both spend the
+  same token. A store needs only async `get` and `compare_and_set`;
+  RedisStore is the production one, LocalStore an in-process fake.
+"""
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Rule(NamedTuple):
+    group: str
+    per_second: float
+    burst: int
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until a token is available (0 if allowed)
+    window: float  # seconds an empty bucket takes to refill (the policy window)
+
+
+def _spend(tokens: float, updated: float, rule: Rule, now: float, cost: float) -> Tuple[Decision, float]:
+    """
+    Refill a bucket to `now` and try to take `cost` tokens from it.
+    Returns the decision and the bucket's new token count.
+    """
+    tokens = min(rule.burst, tokens + (now - updated) * rule.per_second)
+    allowed = tokens >= cost
+    if allowed:
+        tokens -= cost
+    retry_after = 0.0 if allowed else (cost - tokens) / rule.per_second
+    decision = Decision(
+        allowed=allowed,
+        limit=rule.burst,
+        remaining=int(tokens),
+        reset_after=(rule.burst - tokens) / rule.per_second,
+        retry_after=retry_after,
+        window=rule.burst / rule.per_second,
+    )
+    return decision, tokens
+
+
+class MemoryBackend:
+    """
+    Buckets in a dict keyed by (group, client). When it grows past
+    `max_keys`, buckets that have refilled completely (indistinguishable
+    from new ones) are dropped, then the oldest if that is not enough.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        # (group, client) -> [tokens, updated, rule]
+        self._buckets: Dict[Tuple[str, str], list] = {}
+
+    async def acquire(self, rule: Rule, client: str, cost: float = 1.0) -> Decision:
+        now = self.clock()
+        key = (rule.group, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            bucket = self._buckets[key] = [float(rule.burst), now, rule]
+        decision, bucket[0] = _spend(bucket[0], bucket[1], rule, now, cost)
+        bucket[1] = now
+        return decision
+
+    def _evict(self, now: float) -> None:
+        for key, (tokens, updated, rule) in list(self._buckets.items()):
+            if tokens + (now - updated) * rule.per_second >= rule.burst:
+                del self._buckets[key]
+        overflow = len(self._buckets) - self.max_keys * 9 // 10
+        for key in list(self._buckets)[:max(overflow, 0)]:
+            del self._buckets[key]
+
+
+class LocalStore:
+    """
+    In-process store with the SharedBackend interface; for tests and local
+    runs of the shared code path.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, str] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data.get(key)
+
+    async def compare_and_set(self, key: str, expected: Optional[str], value: str, ttl_ms: int) -> bool:
+        if self._data.get(key) != expected:
+            return False
+        self._data[key] = value
+        return True
+
+
+_REDIS_CAS = """
+local current = redis.call('GET', KEYS[1])
+if (current or '') ~= ARGV[1] then return 0 end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+return 1
+"""
+
+
+class RedisStore:
+    """
+    Redis-backed store (needs the `redis` package). Compare-and-set runs as
+    a Lua script so it is atomic on the server.
+    """
+
+    def __init__(self, url: str, prefix: str = "flowpilot:ratelimit:"):
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._cas = self.client.register_script(_REDIS_CAS)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def compare_and_set(self, key: str, expected: Optional[str], value: str, ttl_ms: int) -> bool:
+        return bool(await self._cas(keys=[self.prefix + key], args=[expected or "", value, ttl_ms]))
+
+
+class SharedBackend:
+    """
+    Buckets stored as "tokens:timestamp" strings in a shared store. Uses
+    wall-clock time, since the timestamps are compared across hosts.
+    When the store fails, requests are let through (fail open).
+    """
+
+    def __init__(self, store, max_attempts: int = 5, clock=time.time):
+        self.store = store
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    async def acquire(self, rule: Rule, client: str, cost: float = 1.0) -> Decision:
+        key = f"{rule.group}:{client}"
+        # Keep a bucket only as long as it takes to refill completely
+        ttl_ms = max(int(rule.burst / rule.per_second * 1000), 1000)
+        for _ in range(self.max_attempts):
+            try:
+                current = await self.store.get(key)
+                now = self.clock()
+                if current is None:
+                    tokens, updated = float(rule.burst), now
+                else:
+                    tokens_text, updated_text = current.split(":")
+                    tokens, updated = float(tokens_text), float(updated_text)
+                now = max(now, updated)
+                decision, tokens = _spend(tokens, updated, rule, now, cost)
+                if await self.store.compare_and_set(key, current, f"{tokens:.4f}:{now:.4f}", ttl_ms):
+                    return decision
+            except Exception as e:
+                logger.warning("Rate limit store unavailable (%s); allowing request", type(e).__name__)
+                break
+        else:
+            logger.warning("Rate limit bucket %s stayed contended; allowing request", key)
+        return Decision(True, rule.burst, rule.burst, 0.0, 0.0, rule.burst / rule.per_second)
+
+
+class RateLimiter:
+    """
+    Maps requests to a rule (by path prefix) and a client key, and asks the
+    backend for a decision. Clients listed in `client_multipliers` get
+    their rates and bursts scaled (e.g. 5 for a trusted integration).
+    """
+
+    def __init__(self, backend, rules: List[Tuple[str, Rule]], client_multipliers: Optional[Dict[str, float]] = None):
+        self.backend = backend
+        # Longest prefix first so /api/v1/foundry wins over /api/v1
+        self.rules = sorted(rules, key=lambda item: len(item[0]), reverse=True)
+        self.client_multipliers = client_multipliers or {}
+        if any(multiplier <= 0 for multiplier in self.client_multipliers.values()):
+            raise ValueError("Rate limit client multipliers must be positive")
+        if any(rule.per_second <= 0 or rule.burst < 1 for _, rule in self.rules):
+            raise ValueError("Rate limit rules need a positive rate and a burst of at least 1")
+        self._scaled: Dict[Tuple[str, str], Rule] = {}
+
+    def rule_for(self, path: str) -> Optional[Rule]:
+        for prefix, rule in self.rules:
+            if path.startswith(prefix):
+                return rule
+        return None
+
+    def _client_rule(self, rule: Rule, client: str) -> Rule:
+        multiplier = self.client_multipliers.get(client)
+        if multiplier is None:
+            return rule
+        scaled = self._scaled.get((rule.group, client))
+        if scaled is None:
+            scaled = self._scaled[(rule.group, client)] = Rule(
+                rule.group, rule.per_second * multiplier, max(int(rule.burst * multiplier), 1)
+            )
+        return scaled
+
+    async def check(self, rule: Rule, client: str) -> Decision:
+        return await self.backend.acquire(self._client_rule(rule, client), client)
+
+
+def create_backend(name: str, redis_url: Optional[str] = None):
+    if name == "memory":
+        return MemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if name == "local":
+        return SharedBackend(LocalStore())
+    if name == "redis":
+        if not redis_url:
+            raise ValueError("RATE_LIMIT_BACKEND=redis needs RATE_LIMIT_REDIS_URL")
+        return SharedBackend(RedisStore(redis_url))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r} (use memory, redis or local)")
+
+
+rate_limiter: Optional[RateLimiter] = None
+if settings.RATE_LIMIT_ENABLED:
+    crud_rule = Rule("crud", settings.RATE_LIMIT_CRUD_PER_SECOND, settings.RATE_LIMIT_CRUD_BURST)
+    rate_limiter = RateLimiter(
+        create_backend(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_REDIS_URL),
+        rules=[
+            # Usage reports are database reads, not Foundry calls
+            ("/api/v1/foundry/usage", crud_rule),
+            ("/api/v1/foundry", Rule("foundry", settings.RATE_LIMIT_FOUNDRY_PER_SECOND, settings.RATE_LIMIT_FOUNDRY_BURST)),
+            ("/api/v1/", crud_rule),
+        ],
+        client_multipliers=settings.RATE_LIMIT_CLIENT_MULTIPLIERS,
+    )
@@ -0,0 +1,178 @@
+"""
+Read-replica routing.
+
+GET/HEAD requests read from a replica, picked round-robin or by fewest
+sessions in use; everything else uses the primary. A client that wrote
+recently carries a short-lived cookie that pins its reads to the primary
+(read-your-writes), since replicas apply changes with some lag.
+
+Replicas are probed with `SELECT 1` in the background and skipped while
+failing; with no healthy replica, reads fall back to the primary.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+STICKY_COOKIE = "flowpilot_read_primary_until"
+STRATEGIES = ("round_robin", "least_connections")
+
+
+class Replica:
+    """
+    One read replica: its engine, session factory and health state.
+    """
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.healthy = True
+        self.in_use = 0
+        self.last_error: Optional[str] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ok" if self.healthy else "fail",
+            "in_use": self.in_use,
+            "latency_ms": self.latency_ms,
+            "error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """
+    Picks the replica for each read and tracks replica health.
+    """
+
+    def __init__(self, replicas: Sequence[Replica], strategy: str = "round_robin", sticky_seconds: float = 5.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy!r} (use {' or '.join(STRATEGIES)})")
+        self.replicas: List[Replica] = list(replicas)
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._next = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        """
+        Reserve a healthy replica for one session, or return None when none
+        is healthy. Every pick must be paired with `release`.
+        """
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                return None
+            # Rotating the start also spreads ties under least_connections.
+            start = self._next % len(healthy)
+            self._next += 1
+            candidates = healthy[start:] + healthy[:start]
+            if self.strategy == "least_connections":
+                replica = min(candidates, key=lambda r: r.in_use)
+            else:
+                replica = candidates[0]
+            replica.in_use += 1
+            return replica
+
+    def release(self, replica: Replica) -> None:
+        with self._lock:
+            replica.in_use -= 1
+
+    def mark_failed(self, replica: Replica, error: str) -> None:
+        """
+        Take a replica out of rotation until its next successful health check.
+        """
+        if replica.healthy:
+            logger.warning("Read replica %s marked unhealthy: %s", replica.name, error)
+        replica.healthy = False
+        replica.last_error = error
+
+    def is_sticky(self, cookies: Mapping[str, str]) -> bool:
+        """
+        Whether the client wrote recently enough that it must read from the primary.
+        """
+        try:
+            return float(cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def sticky_cookie(self) -> str:
+        """
+        Set-Cookie value pinning the client's reads to the primary for
+        `sticky_seconds`.
+        """
+        until = time.time() + self.sticky_seconds
+        max_age = max(int(self.sticky_seconds + 0.999), 1)
+        return f"{STICKY_COOKIE}={until:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+
+    def _select_one(self, replica: Replica) -> None:
+        with replica.engine.connect() as connection:
+            connection.execute(text("SELECT 1")).scalar()
+
+    async def check(self, replica: Replica, timeout: float) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self._select_one, replica), timeout)
+        except asyncio.TimeoutError:
+            self.mark_failed(replica, f"timed out after {timeout}s")
+        except Exception as e:
+            self.mark_failed(replica, type(e).__name__)
+        else:
+            if not replica.healthy:
+                logger.info("Read replica %s is healthy again", replica.name)
+            replica.healthy = True
+            replica.last_error = None
+        replica.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        replica.checked_at = time.monotonic()
+
+    async def check_all(self, timeout: float) -> None:
+        await asyncio.gather(*(self.check(replica, timeout) for replica in self.replicas))
+
+    async def _run_health_checks(self, interval: float, timeout: float) -> None:
+        while True:
+            await self.check_all(timeout)
+            await asyncio.sleep(interval)
+
+    def start_health_checks(self, interval: float, timeout: float) -> None:
+        """
+        Probe every replica now and then every `interval` seconds.
+        """
+        if self.enabled and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._run_health_checks(interval, timeout))
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Readiness check entry: ok while at least one replica is healthy.
+        Reads fall back to the primary otherwise, so it is never required.
+        """
+        return {
+            "status": "ok" if any(replica.healthy for replica in self.replicas) else "fail",
+            "required": False,
+            "strategy": self.strategy,
+            "replicas": {replica.name: replica.status() for replica in self.replicas},
+        }
@@ -0,0 +1,54 @@
+from contextvars import ContextVar
+from typing import Optional
+import time
+
+
+class RequestContext:
+    """
+    Per-request bookkeeping shared between middleware and engine events.
+
+    The context variable is copied into the threadpool that runs sync
+    endpoints, so engine listeners see the same object as the middleware.
+    """
+    __slots__ = ("scope", "method", "path", "started", "db_queries", "db_time", "query_counts", "n_plus_one")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.method = scope.get("method", "")
+        self.path = scope.get("path", "")
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        # Filled lazily by the query log (fingerprint -> count / flagged entry)
+        self.query_counts: Optional[dict] = None
+        self.n_plus_one: Optional[dict] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        """
+        Path template of the matched route (e.g. /api/v1/todos/{id}),
+        available once routing has happened.
+        """
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("flowpilot_request", default=None)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """
+    Return the context of the request being served, if any.
+    """
+    return _current_request.get()
+
+
+def set_request_context(context: Optional[RequestContext]):
+    """
+    Bind a request context to the current task; returns a reset token.
+    """
+    return _current_request.set(context)
+
+
+def reset_request_context(token) -> None:
+    _current_request.reset(token)
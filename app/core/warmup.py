@@ -0,0 +1,129 @@
+"""
+Startup warm-up, run from the application lifespan before traffic arrives.
+
+- warm_pool opens pooled connections up front, so the first requests do not
+  pay for TCP/TLS/login to the database.
+- warm_statement_cache calls every GET endpoint that uses `get_db` once,
+  with ids that do not exist, so SQLAlchemy compiles their queries into the
+  engine's compiled cache (the cache key ignores bound values, so later
+  requests with real ids hit the same entries).
+"""
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, params
+from fastapi.routing import APIRoute
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal, engine, get_db, read_replicas
+
+
+logger = logging.getLogger(__name__)
+
+PATH_PLACEHOLDERS = {int: 0, str: "warmup"}
+
+
+def warm_pool(target: Engine, connections: int) -> int:
+    """
+    Check out `connections` connections at once and return them to the pool
+    (capped at the pool size, beyond which they would be closed again).
+    """
+    size = target.pool.size() if hasattr(target.pool, "size") else 1
+    opened = []
+    try:
+        for _ in range(min(connections, size)):
+            opened.append(target.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def _warmup_call(route: APIRoute) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    (session argument name, other arguments) to call a route's endpoint
+    with, or None when it cannot be called safely without a request.
+    """
+    if "GET" not in route.methods or inspect.iscoroutinefunction(route.endpoint):
+        return None
+    session_argument = None
+    arguments: Dict[str, Any] = {}
+    for name, parameter in inspect.signature(route.endpoint).parameters.items():
+        default = parameter.default
+        if isinstance(default, params.Depends):
+            if default.dependency is not get_db:
+                return None
+            session_argument = name
+        elif name in route.param_convertors:
+            if parameter.annotation not in PATH_PLACEHOLDERS:
+                return None
+            arguments[name] = PATH_PLACEHOLDERS[parameter.annotation]
+        elif isinstance(default, params.Param):
+            if default.is_required():
+                return None
+            arguments[name] = default.default
+        elif default is inspect.Parameter.empty:
+            return None
+        else:
+            arguments[name] = default
+    if session_argument is None:
+        return None
+    return session_argument, arguments
+
+
+def warm_statement_cache(app: FastAPI, session_factory: Callable[[], Session]) -> int:
+    """
+    Run each GET endpoint that reads through `get_db` once against
+    `session_factory`. Returns the number of endpoints run; failures are
+    logged and skipped, never raised.
+    """
+    warmed = 0
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        call = _warmup_call(route)
+        if call is None:
+            continue
+        session_argument, arguments = call
+        db = session_factory()
+        try:
+            route.endpoint(**arguments, **{session_argument: db})
+        except HTTPException:
+            pass  # 404 for the placeholder ids; the queries ran
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s", route.path, type(e).__name__)
+            continue
+        finally:
+            db.rollback()
+            db.close()
+        warmed += 1
+    return warmed
+
+
+def warm_up(app: FastAPI, connections: int) -> Dict[str, Any]:
+    """
+    Warm the primary and every read replica, and build the OpenAPI schema.
+    """
+    started = time.perf_counter()
+    targets = [("primary", engine, SessionLocal)]
+    targets += [(replica.name, replica.engine, replica.session_factory) for replica in read_replicas.replicas]
+
+    report: Dict[str, Any] = {}
+    for name, target_engine, session_factory in targets:
+        try:
+            opened = warm_pool(target_engine, connections)
+        except Exception as e:
+            logger.warning("Could not open connections to %s during warm-up: %s", name, type(e).__name__)
+            report[name] = {"error": type(e).__name__}
+            continue
+        report[name] = {
+            "connections": opened,
+            "endpoints": warm_statement_cache(app, session_factory),
+        }
+    app.openapi()
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("Warm-up finished: %s", report)
+    return report
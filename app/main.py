@@ -1,14 +1,102 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
-from app.api.v1 import projects, todos, status_reports, community, foundry_chat
+from app.core.database import SessionLocal, read_replicas
+from app.core.rate_limit import rate_limiter
+from app.core.warmup import warm_up
+from app.core.metrics import registry
+from app.schemas.scope import without_scope_inputs
+from app.services.health_service import health_monitor
+from app.services.jobs import job_worker
+from app.services.write_behind import todo_status_buffer
+from app.services.foundry_usage import usage_recorder
+from app.services.foundry_chat_service import close_foundry_client, get_foundry_client
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+from app.api.v1 import projects, todos, tasks, status_reports, community, members, foundry_chat, jobs, admin, analytics
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prepare the process before it takes traffic: shared Foundry client,
+    warmed connection pools and statement cache, background health checks,
+    the job worker, the todo status write-behind flush and the Foundry
+    usage flush.
+    """
+    get_foundry_client()
+    if settings.STARTUP_WARMUP_ENABLED:
+        try:
+            # Through the threadpool sync endpoints use, which also loads
+            # anyio's worker-thread machinery ahead of the first request.
+            await run_in_threadpool(warm_up, app, settings.DB_POOL_WARM_CONNECTIONS)
+        except Exception:
+            logger.warning("Startup warm-up failed; continuing cold", exc_info=True)
+    read_replicas.start_health_checks(
+        interval=settings.DB_REPLICA_HEALTH_INTERVAL_SECONDS,
+        timeout=settings.DB_REPLICA_HEALTH_TIMEOUT_SECONDS,
+    )
+    health_refresh = asyncio.create_task(health_monitor.refresh())
+    if settings.JOBS_ENABLED:
+        job_worker.start()
+    if settings.TODO_STATUS_WRITE_BEHIND_ENABLED:
+        todo_status_buffer.start()
+    usage_recorder.start()
+    yield
+    health_refresh.cancel()
+    await job_worker.stop(timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS)
+    # After the last request: nothing can be buffered after this flush
+    await todo_status_buffer.stop()
+    # After the job worker, whose calls are recorded too
+    await usage_recorder.stop()
+    await read_replicas.stop_health_checks()
+    await close_foundry_client()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="FlowPilot Backend API for project management with Foundry integration"
+    description="FlowPilot Backend API for project management with Foundry integration",
+    lifespan=lifespan
 )
 
+# Replay stored responses to retried POSTs with an Idempotency-Key header
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        session_factory=SessionLocal,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_HOURS * 3600,
+        lock_timeout_seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+        client_header=settings.IDEMPOTENCY_CLIENT_HEADER,
+    )
+
+# 413 for oversized bodies before they are read or parsed (outside the
+# idempotency middleware, which buffers POST bodies)
+if settings.REQUEST_MAX_BODY_BYTES:
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=settings.REQUEST_MAX_BODY_BYTES)
+
+# Token buckets per client and route group; inside CORS and the metrics
+# so rejected requests still get CORS headers and are counted, and outside
+# the body-size and idempotency middleware so a throttled request is turned
+# away before its body is read or its key is claimed
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, key_header=settings.RATE_LIMIT_KEY_HEADER)
+
 # Configure CORS for local development
 app.add_middleware(
     CORSMiddleware,
@@ -18,12 +106,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (Brotli if installed, gzip otherwise)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+    )
+
+# Wraps everything except the request context and read-your-writes
+# middleware below, so latency and response sizes cover the rest of the stack
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+# Binds the per-request context used by metrics and the slow-query log
+app.add_middleware(RequestContextMiddleware)
+
+# Pin a client's reads to the primary for a few seconds after it writes
+if read_replicas.enabled:
+    app.add_middleware(ReadYourWritesMiddleware, router=read_replicas)
+
 # Include routers
 app.include_router(projects.router)
 app.include_router(todos.router)
+app.include_router(tasks.router)
 app.include_router(status_reports.router)
 app.include_router(community.router)
+app.include_router(members.router)
 app.include_router(foundry_chat.router)
+app.include_router(jobs.router)
+app.include_router(admin.router)
+app.include_router(analytics.router)
+
+
+@app.exception_handler(RequestValidationError)
+async def request_validation_error(request: Request, exc: RequestValidationError):
+    """
+    FastAPI's 422, minus the input of errors inside a scope (which can be
+    the whole document).
+    """
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(without_scope_inputs(exc.errors()))})
 
 
 @app.get("/health")
@@ -38,6 +162,34 @@ def health_check():
     }
 
 
+@app.get("/health/live")
+def liveness_check():
+    """
+    Liveness probe: the process is up and serving requests.
+    Never touches dependencies.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: database, connection pool and Foundry checks with
+    per-dependency timings. Results are cached and refreshed in the background.
+    """
+    report = await health_monitor.get_report()
+    status_code = 503 if report["status"] == "not_ready" else 200
+    return JSONResponse(report, status_code=status_code)
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root():
     """
@@ -47,5 +199,7 @@ def root():
         "message": "Welcome to FlowPilot Backend API",
         "version": settings.APP_VERSION,
         "docs": "/docs",
-        "health": "/health"
+        "health": "/health",
+        "readiness": "/health/ready",
+        "liveness": "/health/live"
     }
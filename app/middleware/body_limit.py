@@ -0,0 +1,87 @@
+import json
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+
+class RequestBodyTooLarge(HTTPException):
+    """
+    Raised from `receive` once a request body goes over the limit. It is an
+    HTTPException so that FastAPI answers 413 when a route is reading the
+    body, instead of turning it into a 400.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body is larger than {max_bytes} bytes")
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than `max_bytes` with a 413.
+
+    A Content-Length over the limit is rejected before the app runs and
+    before any of the body is read. Bodies without one (chunked uploads) or
+    with a wrong one are counted while the app reads them, and reading
+    stops at the first chunk past the limit, so an oversized body is never
+    buffered or parsed.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def reject(self, send: Send) -> None:
+        metrics.REQUESTS_TOO_LARGE.inc()
+        body = json.dumps({"detail": f"Request body is larger than {self.max_bytes} bytes"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > self.max_bytes:
+                    await self.reject(send)
+                    return
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestBodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                if received > self.max_bytes:
+                    metrics.REQUESTS_TOO_LARGE.inc()
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            # Raised outside a FastAPI route (e.g. by a middleware buffering the body)
+            if response_started:
+                raise
+            await self.reject(send)
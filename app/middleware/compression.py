@@ -0,0 +1,225 @@
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/*",
+)
+
+
+class _GzipCompressor:
+    """
+    Incremental gzip compressor built on zlib (no intermediate buffers).
+    """
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    """
+    Incremental Brotli compressor.
+    """
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _parse_accept_encoding(value: str) -> dict:
+    """
+    Parse an Accept-Encoding header into a {coding: q-value} mapping.
+    """
+    codings = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with Brotli (when installed and accepted) or gzip.
+
+    Only responses whose media type is in the allowlist and whose body is at
+    least `minimum_size` bytes are compressed. Streaming responses are
+    compressed and flushed chunk by chunk, so they are never buffered in
+    full and each chunk reaches the client as soon as it is produced.
+    Responses of an allowlisted type always carry `Vary: Accept-Encoding`,
+    compressed or not, so shared caches keep the variants apart.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exact_types = set()
+        self.prefix_types = []
+        for content_type in content_types:
+            content_type = content_type.strip().lower()
+            if content_type.endswith("/*"):
+                self.prefix_types.append(content_type[:-1])
+            else:
+                self.exact_types.add(content_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """
+        Pick the best supported encoding for an Accept-Encoding header.
+        """
+        if not accept_encoding:
+            return None
+        codings = _parse_accept_encoding(accept_encoding)
+        wildcard = codings.get("*", 0.0)
+        br_q = codings.get("br", wildcard) if brotli is not None else 0.0
+        gzip_q = codings.get("gzip", wildcard)
+        if br_q > 0 and br_q >= gzip_q:
+            return "br"
+        if gzip_q > 0:
+            return "gzip"
+        return None
+
+    def is_compressible(self, content_type: str) -> bool:
+        """
+        Check a Content-Type header against the allowlist.
+        """
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        if media_type in self.exact_types:
+            return True
+        return any(media_type.startswith(prefix) for prefix in self.prefix_types)
+
+    def create_compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    """
+    Per-request send wrapper that decides whether and how to compress.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk tells us
+            # whether the response is worth compressing.
+            self.initial_message = message
+            headers = MutableHeaders(scope=message)
+            eligible = (
+                "content-encoding" not in headers
+                and self.middleware.is_compressible(headers.get("content-type", ""))
+            )
+            if eligible:
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = not eligible or self.encoding is None
+            return
+
+        if message_type != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self._send(self.initial_message)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Small responses cost more to compress than they save.
+                self.passthrough = True
+                await self._send(self.initial_message)
+                await self._send(message)
+                return
+
+            self.compressor = self.middleware.create_compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+                body = self.compressor.compress(body) + self.compressor.flush()
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+            await self._send(self.initial_message)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        # Subsequent chunks of a streaming response.
+        body = self.compressor.compress(body)
+        body += self.compressor.flush() if more_body else self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
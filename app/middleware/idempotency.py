@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.idempotency import (
+    IN_PROGRESS,
+    MISMATCH,
+    REPLAY,
+    claim_key,
+    client_key,
+    heartbeat_key,
+    release_key,
+    request_fingerprint,
+    store_response,
+)
+
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.05
+
+
+async def _send_in_progress(send: Send) -> None:
+    await _send_json(
+        send, 409, "A request with this Idempotency-Key is still in progress",
+        [(b"retry-after", b"1")],
+    )
+
+
+async def _send_json(send: Send, status: int, detail: str, headers: List = ()) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """
+    Make POSTs under `path_prefix` that carry an `Idempotency-Key` header
+    safe to retry.
+
+    The first request with a key runs normally and its response is stored
+    if it succeeded (status < 400); retries get that response back, marked
+    `Idempotent-Replayed: true`, without running the handler again. A
+    duplicate that arrives while the first is still running waits for it
+    (up to `lock_timeout` seconds in all, then 409). Reusing a key for a
+    different request body or path is a 422. Failed requests release the key.
+
+    Keys are per client: the `client_header` value when set (a header a
+    trusted gateway sets after authenticating the caller), otherwise the
+    client IP. The same key from two clients is two separate requests.
+
+    While the handler runs its claim is refreshed every `lock_timeout / 3`
+    seconds, so only claims of requests that died (no heartbeat for
+    `lock_timeout`) are taken over, never a slow request still running.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        session_factory: Callable[[], Session],
+        ttl_seconds: float,
+        lock_timeout_seconds: float,
+        path_prefix: str = "/api/v1/",
+        client_header: Optional[str] = None,
+    ):
+        self.app = app
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lock_timeout = timedelta(seconds=lock_timeout_seconds)
+        self.path_prefix = path_prefix
+        self.client_header = client_header.lower().encode("latin-1") if client_header else None
+        # Duplicates within this worker queue here instead of polling the table
+        self._local_locks: Dict[str, List] = {}
+
+    def client_id(self, scope: Scope) -> str:
+        if self.client_header is not None:
+            for name, value in scope["headers"]:
+                if name == self.client_header:
+                    return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        key = next((value for name, value in scope["headers"] if name == HEADER), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        key = key.decode("latin-1").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+        key = client_key(self.client_id(scope), key)
+
+        body = await self._read_body(receive)
+        fingerprint = request_fingerprint(scope["method"], scope["path"], body)
+
+        # One deadline for the whole wait, in this worker's queue and on the table
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout.total_seconds()
+        entry = self._local_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(entry[0].acquire(), self.lock_timeout.total_seconds())
+            except asyncio.TimeoutError:
+                await _send_in_progress(send)
+                return
+            try:
+                await self._handle(scope, receive, send, key, fingerprint, body, deadline)
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._local_locks[key]
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _run(self, function, *args):
+        db = self.session_factory()
+        try:
+            return function(db, *args)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, key: str, locked_at: datetime) -> None:
+        interval = self.lock_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            now = datetime.utcnow()
+            try:
+                held = await run_in_threadpool(self._run, heartbeat_key, key, locked_at, now)
+            except Exception:
+                logger.warning("Idempotency-Key heartbeat failed for %r; retrying", key, exc_info=True)
+                continue
+            if not held:
+                logger.warning("Idempotency-Key claim %r was taken over while its request ran", key)
+                return
+            locked_at = now
+
+    async def _handle(
+        self, scope: Scope, receive: Receive, send: Send, key: str, fingerprint: str, body: bytes, deadline: float
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            claimed_at = datetime.utcnow()
+            outcome, record = await run_in_threadpool(
+                self._run, claim_key, key, fingerprint, self.ttl, self.lock_timeout, claimed_at
+            )
+            if outcome != IN_PROGRESS:
+                break
+            if loop.time() >= deadline:
+                await _send_in_progress(send)
+                return
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        if outcome == MISMATCH:
+            await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+            return
+        if outcome == REPLAY:
+            await send({
+                "type": "http.response.start",
+                "status": record.response_status,
+                "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record.response_headers]
+                + [(b"idempotent-replayed", b"true")],
+            })
+            await send({"type": "http.response.body", "body": record.response_body})
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers: List[List[str]] = []
+        chunks: List[bytes] = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        heartbeat = asyncio.create_task(self._heartbeat(key, claimed_at))
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await run_in_threadpool(self._run, release_key, key)
+            raise
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        if status < 400:
+            await run_in_threadpool(self._run, store_response, key, status, headers, b"".join(chunks))
+        else:
+            await run_in_threadpool(self._run, release_key, key)
@@ -0,0 +1,67 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.request_context import RequestContext, get_request_context
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Record per-route latency, status codes, response sizes and DB time.
+
+    Also emits a `Server-Timing` header splitting the request time into
+    database time and everything else. Expects RequestContextMiddleware to
+    be installed outside of it.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        context = get_request_context() or RequestContext(scope)
+        status_code = 500
+        response_size = 0
+        in_progress_labels = (method,)
+        metrics.HTTP_REQUESTS_IN_PROGRESS.inc(in_progress_labels)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - context.started) * 1000
+                    db_ms = context.db_time * 1000
+                    value = (
+                        f'db;dur={db_ms:.2f};desc="{context.db_queries} queries", '
+                        f"app;dur={total_ms - db_ms:.2f}, total;dur={total_ms:.2f}"
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode("latin-1"))
+                    ]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - context.started
+            # Route templates (not raw paths) keep label cardinality bounded
+            route = context.route or UNMATCHED_ROUTE
+            labels = (method, route)
+            metrics.HTTP_REQUESTS_IN_PROGRESS.dec(in_progress_labels)
+            metrics.HTTP_REQUESTS.inc((method, route, str(status_code)))
+            metrics.HTTP_REQUEST_DURATION.observe(elapsed, labels)
+            metrics.HTTP_RESPONSE_SIZE.observe(response_size, labels)
+            metrics.DB_QUERIES_PER_REQUEST.observe(context.db_queries, (route,))
+            metrics.DB_TIME_PER_REQUEST.observe(context.db_time, (route,))
@@ -0,0 +1,74 @@
+import json
+import math
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.rate_limit import RateLimiter
+
+
+REJECTED_BODY = json.dumps({"detail": "Rate limit exceeded"}).encode()
+
+
+class RateLimitMiddleware:
+    """
+    Apply the limiter's token buckets before the request reaches the app.
+
+    The client key is the `key_header` value when set, otherwise the client
+    IP. The header is taken as is, so it must be one a trusted gateway sets
+    (or overwrites) after authenticating the caller: a client choosing its
+    own value could send a new one with every request. Limited requests
+    get `RateLimit-*` headers; rejected ones a 429 with `Retry-After`.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter, key_header: Optional[str] = None):
+        self.app = app
+        self.limiter = limiter
+        self.key_header = key_header.lower().encode("latin-1") if key_header else None
+
+    def client_key(self, scope: Scope) -> str:
+        if self.key_header is not None:
+            for name, value in scope["headers"]:
+                if name == self.key_header:
+                    return value.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self.limiter.rule_for(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.check(rule, self.client_key(scope))
+        headers = [
+            (b"ratelimit-limit", str(decision.limit).encode()),
+            (b"ratelimit-remaining", str(decision.remaining).encode()),
+            (b"ratelimit-reset", str(math.ceil(decision.reset_after)).encode()),
+            (b"ratelimit-policy", f"{decision.limit};w={math.ceil(decision.window)}".encode()),
+        ]
+        if not decision.allowed:
+            metrics.RATE_LIMITED.inc((rule.group,))
+            retry_after = str(max(math.ceil(decision.retry_after), 1)).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", retry_after),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(REJECTED_BODY)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": REJECTED_BODY})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
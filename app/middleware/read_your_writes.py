@@ -0,0 +1,27 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.replicas import READ_METHODS, ReplicaRouter
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, set a short-lived cookie that sends the
+    client's following reads to the primary instead of a lagging replica.
+    """
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", self.router.sticky_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
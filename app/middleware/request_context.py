@@ -0,0 +1,24 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.request_context import RequestContext, set_request_context, reset_request_context
+
+
+class RequestContextMiddleware:
+    """
+    Bind a RequestContext for the lifetime of each HTTP request so that
+    metrics and database instrumentation can attribute work to it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = set_request_context(RequestContext(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_request_context(token)
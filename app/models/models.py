@@ -1,14 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, JSON, LargeBinary, PrimaryKeyConstraint
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
 from app.core.database import Base
 
 
+# JSON documents: NVARCHAR(MAX) on SQL Server, JSON (text) on SQLite, JSONB on PostgreSQL
+JSONDocument = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("IX_projects_deleted_at", "deleted_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    scope = Column(Text, nullable=False)  # JSON stored as NVARCHAR(MAX)
+    scope = Column(JSONDocument, nullable=False)
     status = Column(String(50), nullable=False, default="active")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -21,10 +30,14 @@ class Project(Base):
 
 class Todo(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        Index("IX_todos_project_id", "project_id"),
+        Index("IX_todos_deleted_at", "deleted_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
-    scope = Column(Text, nullable=False)  # JSON stored as NVARCHAR(MAX)
+    scope = Column(JSONDocument, nullable=False)
     status = Column(String(50), nullable=False, default="open")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -33,14 +46,45 @@ class Todo(Base):
     # Relationships
     project = relationship("Project", back_populates="todos")
     status_reports = relationship("StatusReport", back_populates="todo", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="todo", cascade="all, delete-orphan", order_by="Task.position")
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (
+        Index("IX_tasks_todo_id_status_assignee", "todo_id", "status", "assignee"),
+        Index("IX_tasks_assignee_status", "assignee", "status"),
+        Index("IX_tasks_deleted_at", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    todo_id = Column(Integer, ForeignKey("todos.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # Order within the todo's task list
+    title = Column(String(500), nullable=True)
+    description = Column(Text, nullable=True)
+    status = Column(String(50), nullable=True)  # NULL: the task has no status
+    priority = Column(String(50), nullable=True)
+    assignee = Column(String(255), nullable=True)
+    attributes = Column(JSONDocument, nullable=True)  # Remaining task keys
+    key_order = Column(JSONDocument, nullable=True)  # Task keys as sent, when not attributes-then-columns
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    todo = relationship("Todo", back_populates="tasks")
 
 
 class StatusReport(Base):
     __tablename__ = "status_reports"
+    __table_args__ = (
+        Index("IX_status_reports_todo_id", "todo_id"),
+        Index("IX_status_reports_deleted_at", "deleted_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     todo_id = Column(Integer, ForeignKey("todos.id", ondelete="CASCADE"), nullable=False)
-    scope = Column(Text, nullable=False)  # JSON stored as NVARCHAR(MAX)
+    scope = Column(JSONDocument, nullable=False)
     status = Column(String(50), nullable=False, default="draft")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -52,10 +96,14 @@ class StatusReport(Base):
 
 class Community(Base):
     __tablename__ = "community"
+    __table_args__ = (
+        Index("IX_community_project_id", "project_id"),
+        Index("IX_community_deleted_at", "deleted_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
-    team = Column(Text, nullable=False)  # JSON array stored as NVARCHAR(MAX)
+    team = Column(JSONDocument, nullable=False)  # JSON array
     role = Column(String(100), nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -63,3 +111,178 @@ class Community(Base):
     
     # Relationships
     project = relationship("Project", back_populates="community")
+    members = relationship("TeamMember", back_populates="community", cascade="all, delete-orphan")
+
+
+class TeamMember(Base):
+    # One row per member of a community team, derived from Community.team
+    __tablename__ = "team_members"
+    __table_args__ = (
+        Index(
+            "IX_team_members_email",
+            "email",
+            mssql_include=["project_id", "community_id", "name", "role"],
+        ),
+        Index("IX_team_members_project_id", "project_id"),
+        Index("IX_team_members_community_id", "community_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    community_id = Column(Integer, ForeignKey("community.id", ondelete="CASCADE"), nullable=False)
+    # No cascade here: SQL Server rejects a second cascade path from projects.
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    email = Column(String(320), nullable=False)  # Lower-cased
+    name = Column(String(255), nullable=True)
+    role = Column(String(100), nullable=True)
+    
+    # Relationships
+    community = relationship("Community", back_populates="members")
+
+
+class IdempotencyKey(Base):
+    # Response stored per Idempotency-Key header; a row without a response
+    # is a request in flight (the primary key makes the insert a lock).
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("IX_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    key = Column(String(255), primary_key=True)  # SHA-256 of client and header value
+    fingerprint = Column(String(64), nullable=False)  # SHA-256 of method, path and body
+    locked_at = Column(DateTime, nullable=True)
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSONDocument, nullable=True)  # [[name, value], ...]
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class Job(Base):
+    # Background job (see app/services/jobs.py); rows double as the queue
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("IX_jobs_status_run_after", "status", "run_after"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, succeeded, failed
+    payload = Column(JSONDocument, nullable=False)
+    result = Column(JSONDocument, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Not claimed before this (retry backoff)
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ProjectSummary(Base):
+    # Read model for project listings (see app/services/project_summaries.py),
+    # one row per live project, refreshed by the write handlers
+    __tablename__ = "project_summaries"
+    __table_args__ = (
+        Index("IX_project_summaries_status", "status", "project_id"),
+        Index("IX_project_summaries_open_todo_count", "open_todo_count", "project_id"),
+    )
+    
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    title = Column(String(500), nullable=True)  # scope.project_title
+    status = Column(String(50), nullable=False)
+    todo_count = Column(Integer, nullable=False, default=0)
+    open_todo_count = Column(Integer, nullable=False, default=0)
+    member_count = Column(Integer, nullable=False, default=0)
+    latest_report_id = Column(Integer, nullable=True)
+    latest_report_status = Column(String(50), nullable=True)
+    latest_report_at = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class StatusEvent(Base):
+    # Append-only history of todo and status report statuses: one row each
+    # time an entity enters a status (including its initial one), written in
+    # the transaction that changed it. Clustered on (entity, time) on SQL
+    # Server so an entity's history is one range scan.
+    __tablename__ = "status_events"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", name="PK_status_events", mssql_clustered=False),
+        Index("IX_status_events_entity", "entity_type", "entity_id", "occurred_at", mssql_clustered=True),
+        Index(
+            "IX_status_events_project",
+            "project_id",
+            "entity_type",
+            "occurred_at",
+            mssql_include=["entity_id", "status"],
+        ),
+    )
+    
+    id = Column(Integer, autoincrement=True)
+    entity_type = Column(String(20), nullable=False)  # todo, status_report
+    entity_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)  # No FK: history is purged with the project
+    status = Column(String(50), nullable=False)  # The status entered
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class FoundryUsage(Base):
+    # One row per Foundry agent call (or call refused by a project budget),
+    # written in batches by app.services.foundry_usage
+    __tablename__ = "foundry_usage"
+    __table_args__ = (
+        Index("IX_foundry_usage_created_at", "created_at"),
+        Index("IX_foundry_usage_project_created_at", "project_id", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(Integer, nullable=True)  # No FK: purged with the project
+    source = Column(String(20), nullable=False)  # chat, job
+    outcome = Column(String(20), nullable=False)  # ok, http_error, timeout, connect_error, error, over_budget
+    status_code = Column(Integer, nullable=True)  # Upstream HTTP status, if it answered
+    latency_ms = Column(Integer, nullable=False)
+    request_bytes = Column(Integer, nullable=False)
+    response_bytes = Column(Integer, nullable=False)
+    prompt_tokens = Column(Integer, nullable=True)  # Token counts, when the response reports them
+    completion_tokens = Column(Integer, nullable=True)
+    total_tokens = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+STATUS_EVENT_TYPES = {Todo: "todo", StatusReport: "status_report"}
+
+
+@event.listens_for(Session, "after_flush")
+def _record_status_events(session, flush_context):
+    """
+    Append a StatusEvent for every Todo or StatusReport the flush inserted,
+    or updated to a different status. Core UPDATEs of the status column
+    bypass this; they record their events themselves
+    (app.services.status_events).
+    """
+    changed = [instance for instance in session.new if type(instance) in STATUS_EVENT_TYPES]
+    for instance in session.dirty:
+        if type(instance) not in STATUS_EVENT_TYPES:
+            continue
+        history = inspect(instance).attrs.status.history
+        if history.added and history.added[0] not in history.deleted:
+            changed.append(instance)
+    if not changed:
+        return
+    
+    now = datetime.utcnow()
+    connection = session.connection()
+    todo_ids = {i.todo_id for i in changed if isinstance(i, StatusReport)}
+    report_projects = dict(connection.execute(
+        select(Todo.id, Todo.project_id).where(Todo.id.in_(todo_ids))
+    ).all()) if todo_ids else {}
+    connection.execute(insert(StatusEvent), [
+        {
+            "entity_type": STATUS_EVENT_TYPES[type(i)],
+            "entity_id": i.id,
+            "project_id": i.project_id if isinstance(i, Todo) else report_projects[i.todo_id],
+            "status": i.status,
+            "occurred_at": now,
+        }
+        for i in changed
+    ])
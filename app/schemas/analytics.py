@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+
+
+# Status History Schemas
+class CycleTimeRead(BaseModel):
+    entity: str
+    start_status: str
+    end_status: str
+    count: int
+    mean_hours: Optional[float] = None
+    min_hours: Optional[float] = None
+    max_hours: Optional[float] = None
+    p50_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+
+
+class ThroughputWeek(BaseModel):
+    week_start: date  # Monday
+    completed: int
+    cumulative: int
+
+
+class ThroughputRead(BaseModel):
+    entity: str
+    status: str
+    weeks: List[ThroughputWeek]
+
+
+class BurndownDay(BaseModel):
+    day: date
+    opened: int
+    closed: int
+    open: int  # Open todos at the end of the day
+
+
+class BurndownRead(BaseModel):
+    project_id: int
+    days: List[BurndownDay]
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List
+
+from app.schemas.project import ProjectRead, ProjectScope
+from app.schemas.todo import TodoRead, TodoScope
+from app.schemas.community import CommunityRead
+
+
+# Project graph Schemas (POST /api/v1/projects/compose)
+class ComposeCommunity(BaseModel):
+    team: List[Dict[str, str]]
+    role: Optional[str] = None
+
+
+class ComposeTodo(BaseModel):
+    scope: TodoScope
+    status: str = "open"
+
+
+class ProjectCompose(BaseModel):
+    scope: ProjectScope
+    status: str = "active"
+    community: List[ComposeCommunity] = []
+    todos: List[ComposeTodo] = []
+
+
+class ProjectComposeRead(BaseModel):
+    project: ProjectRead
+    community: List[CommunityRead]
+    todos: List[TodoRead]
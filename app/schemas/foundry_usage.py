@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date, datetime
+
+
+# Foundry Usage Schemas
+class FoundryUsageGroup(BaseModel):
+    # One of project_id, source or day, depending on group_by
+    project_id: Optional[int] = None
+    source: Optional[str] = None
+    day: Optional[date] = None
+    calls: int
+    errors: int
+    rejected: int  # Refused by the project's budget, upstream not called
+    request_bytes: int
+    response_bytes: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    avg_latency_ms: Optional[float] = None
+    max_latency_ms: Optional[int] = None
+    # group_by=project only: budget per period (None if unlimited) and the
+    # tokens used this period as counted by the serving process
+    budget_tokens: Optional[int] = None
+    period_used_tokens: Optional[int] = None
+
+
+class FoundryUsageRead(BaseModel):
+    group_by: str
+    since: datetime
+    until: Optional[datetime] = None
+    budget_period: str
+    groups: List[FoundryUsageGroup]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+
+
+# Job Schemas
+class StatusReportJobCreate(BaseModel):
+    project_id: int
+    todo_ids: Optional[List[int]] = None  # Default: every live todo of the project
+    instructions: Optional[str] = Field(default=None, max_length=4000)
+
+
+class JobRead(BaseModel):
+    id: int
+    type: str
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
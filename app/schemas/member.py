@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+# Team Member Schemas
+class MemberProjectRead(BaseModel):
+    project_id: int
+    community_id: int
+    email: str
+    name: Optional[str] = None
+    role: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,12 +1,18 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from typing_extensions import Annotated, TypedDict
 from datetime import datetime
 
+from app.schemas.scope import Scope
+
 
 # Project Schemas
-class ProjectScopeBase(BaseModel):
-    project_title: str
-    project_description: str
+class ProjectScopeBase(TypedDict, total=False):
+    project_title: Annotated[Optional[str], Field(max_length=500)]
+    project_description: Optional[str]
+
+
+ProjectScope = Scope(ProjectScopeBase)
 
 
 class ProjectBase(BaseModel):
@@ -15,11 +21,11 @@ class ProjectBase(BaseModel):
 
 
 class ProjectCreate(ProjectBase):
-    pass
+    scope: ProjectScope
 
 
 class ProjectUpdate(BaseModel):
-    scope: Optional[Dict[str, Any]] = None
+    scope: Optional[ProjectScope] = None
     status: Optional[str] = None
 
 
@@ -31,3 +37,24 @@ class ProjectRead(ProjectBase):
     
     class Config:
         from_attributes = True
+
+
+class ProjectSummaryRead(BaseModel):
+    project_id: int
+    title: Optional[str] = None
+    status: str
+    todo_count: int
+    open_todo_count: int
+    member_count: int
+    latest_report_id: Optional[int] = None
+    latest_report_status: Optional[str] = None
+    latest_report_at: Optional[datetime] = None
+    refreshed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ProjectSummaryPage(BaseModel):
+    items: List[ProjectSummaryRead]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
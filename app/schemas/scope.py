@@ -0,0 +1,79 @@
+"""
+Validation of `scope` documents.
+
+A scope is a JSON object: a few well-known keys with a fixed shape (one
+TypedDict per resource describes them) next to any number of free-form
+keys. Scope fields check the document against its TypedDict and its size
+as JSON against SCOPE_MAX_BYTES, then keep the document exactly as sent, so
+stored scopes keep their keys, order and values.
+
+TypedDicts rather than models keep validation cheap: pydantic compiles one
+validator per type when the schema classes are created, and running it
+builds no objects and skips unknown keys instead of copying them.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Type
+
+from pydantic import (
+    PlainSerializer,
+    TypeAdapter,
+    ValidationError,
+    ValidatorFunctionWrapHandler,
+    WrapValidator,
+)
+from pydantic_core import to_json
+from typing_extensions import Annotated
+
+from app.core.config import settings
+
+
+def _validate_scope(value: Any, handler: ValidatorFunctionWrapHandler) -> Any:
+    if isinstance(value, dict):
+        size = len(to_json(value))
+        if size > settings.SCOPE_MAX_BYTES:
+            raise ValueError(f"Scope is {size} bytes as JSON; the limit is {settings.SCOPE_MAX_BYTES}")
+    handler(value)
+    return value
+
+
+def Scope(typed_dict: Type[Dict[str, Any]]) -> Any:
+    """
+    Field type for a scope checked against `typed_dict` (the value is the
+    dict as sent).
+    """
+    return Annotated[
+        typed_dict,
+        WrapValidator(_validate_scope),
+        PlainSerializer(lambda value: value, return_type=Dict[str, Any]),
+    ]
+
+
+@lru_cache(maxsize=None)
+def scope_adapter(scope_type: Any) -> TypeAdapter:
+    return TypeAdapter(scope_type)
+
+
+def _scope_error(loc: list, error_detail: Dict[str, Any]) -> Dict[str, Any]:
+    return {"loc": loc, "msg": error_detail["msg"], "type": error_detail["type"]}
+
+
+def scope_errors(error: ValidationError) -> list:
+    """
+    Validation errors of a scope in the format of FastAPI's 422 responses
+    (without the input, which can be the whole document).
+    """
+    return [
+        _scope_error(["body", "scope", *error_detail["loc"]], error_detail)
+        for error_detail in error.errors(include_url=False)
+    ]
+
+
+def without_scope_inputs(errors: list) -> list:
+    """
+    Request validation errors with those inside a `scope` reduced to the
+    scope_errors() format, so a 422 never echoes a (large) scope back.
+    """
+    return [
+        _scope_error(list(error_detail["loc"]), error_detail) if "scope" in error_detail["loc"] else error_detail
+        for error_detail in errors
+    ]
@@ -1,9 +1,27 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Union
+from typing_extensions import Annotated, TypedDict
+from datetime import date, datetime
+
+from app.schemas.scope import Scope
 
 
 # Status Report Schemas
+class StatusReportOwner(TypedDict, total=False):
+    name: Optional[str]
+    email: Optional[str]
+
+
+class StatusReportScopeBase(TypedDict, total=False):
+    title: Annotated[Optional[str], Field(max_length=500)]
+    description: Optional[str]
+    owners: Optional[List[Union[str, StatusReportOwner]]]
+    createdAt: Optional[Union[datetime, date]]
+
+
+StatusReportScope = Scope(StatusReportScopeBase)
+
+
 class StatusReportBase(BaseModel):
     todo_id: int
     scope: Dict[str, Any]
@@ -11,11 +29,11 @@ class StatusReportBase(BaseModel):
 
 
 class StatusReportCreate(StatusReportBase):
-    pass
+    scope: StatusReportScope
 
 
 class StatusReportUpdate(BaseModel):
-    scope: Optional[Dict[str, Any]] = None
+    scope: Optional[StatusReportScope] = None
     status: Optional[str] = None
 
 
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+
+# Task Schemas
+class TaskBase(BaseModel):
+    title: Optional[str] = Field(default=None, max_length=500)
+    description: Optional[str] = None
+    status: str = Field(default="open", max_length=50)
+    priority: Optional[str] = Field(default=None, max_length=50)
+    assignee: Optional[str] = Field(default=None, max_length=255)
+    attributes: Optional[Dict[str, Any]] = None
+
+
+class TaskCreate(TaskBase):
+    todo_id: int
+    position: Optional[int] = None
+
+
+class TaskUpdate(BaseModel):
+    title: Optional[str] = Field(default=None, max_length=500)
+    description: Optional[str] = None
+    status: Optional[str] = Field(default=None, max_length=50)
+    priority: Optional[str] = Field(default=None, max_length=50)
+    assignee: Optional[str] = Field(default=None, max_length=255)
+    position: Optional[int] = None
+    attributes: Optional[Dict[str, Any]] = None
+
+
+class TaskRead(TaskBase):
+    status: Optional[str] = None  # None for tasks saved through scope.tasks without one
+    id: int
+    todo_id: int
+    position: int
+    attributes: Optional[Any] = None  # Legacy non-object task entries are returned as-is
+    created_at: datetime
+    updated_at: datetime
+    deleted_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TaskCount(BaseModel):
+    project_id: int
+    status: Optional[str] = None
+    count: int
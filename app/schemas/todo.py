@@ -1,9 +1,29 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Union
+from typing_extensions import TypedDict
 from datetime import datetime
 
+from app.schemas.project import ProjectScopeBase
+from app.schemas.scope import Scope
+
 
 # Todo Schemas
+class TodoTaskBase(TypedDict, total=False):
+    id: Optional[Union[int, str]]
+    title: Optional[str]
+    description: Optional[str]
+    status: Optional[str]
+    priority: Optional[str]
+    assignee: Optional[str]
+
+
+class TodoScopeBase(ProjectScopeBase, total=False):
+    tasks: Optional[List[TodoTaskBase]]
+
+
+TodoScope = Scope(TodoScopeBase)
+
+
 class TodoBase(BaseModel):
     project_id: int
     scope: Dict[str, Any]
@@ -11,14 +31,24 @@ class TodoBase(BaseModel):
 
 
 class TodoCreate(TodoBase):
-    pass
+    scope: TodoScope
 
 
 class TodoUpdate(BaseModel):
-    scope: Optional[Dict[str, Any]] = None
+    scope: Optional[TodoScope] = None
     status: Optional[str] = None
 
 
+class TodoStatusUpdate(BaseModel):
+    status: str = Field(max_length=50)
+
+
+class TodoStatusRead(BaseModel):
+    id: int
+    status: str
+    buffered: bool  # True: accepted for the next write-behind flush
+
+
 class TodoRead(TodoBase):
     id: int
     created_at: datetime
@@ -0,0 +1,145 @@
+"""
+Production launcher.
+
+    python -m app.server                      # one worker per CPU core
+    python -m app.server --workers 4 --port 8080
+    python -m app.server --gunicorn           # gunicorn master + uvicorn workers
+
+Runs `app.main:app` in several worker processes with uvloop and httptools
+(when installed). Each worker has its own connection pool, so with
+DB_MAX_CONNECTIONS set the per-worker pool is shrunk to keep
+`workers x (pool_size + max_overflow)` within that budget; the sizes are
+handed to the workers through the DB_POOL_SIZE / DB_MAX_OVERFLOW
+environment variables.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("app.server")
+
+APP = "app.main:app"
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def pool_sizes(workers: int, max_connections: Optional[int], pool_size: int, max_overflow: int) -> Tuple[int, int]:
+    """
+    Per-worker (pool_size, max_overflow) so that all workers together stay
+    within `max_connections` (no limit when it is None).
+    """
+    if not max_connections:
+        return pool_size, max_overflow
+    per_worker = max_connections // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"DB_MAX_CONNECTIONS={max_connections} cannot give each of {workers} workers a connection"
+        )
+    size = min(pool_size, per_worker)
+    return size, min(max_overflow, per_worker - size)
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def run_uvicorn(options: Dict) -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=options["host"],
+        port=options["port"],
+        workers=options["workers"],
+        loop="uvloop" if _has_module("uvloop") else "asyncio",
+        http="httptools" if _has_module("httptools") else "h11",
+        backlog=options["backlog"],
+        timeout_keep_alive=options["keepalive"],
+        timeout_graceful_shutdown=options["graceful_timeout"],
+        limit_concurrency=options["limit_concurrency"],
+        proxy_headers=True,
+        forwarded_allow_ips=options["forwarded_allow_ips"],
+        access_log=options["access_log"],
+    )
+
+
+def run_gunicorn(options: Dict) -> None:
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("--gunicorn needs gunicorn installed (pip install gunicorn)")
+
+    class Application(BaseApplication):
+        def load_config(self):
+            config = {
+                "bind": f"{options['host']}:{options['port']}",
+                "workers": options["workers"],
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "backlog": options["backlog"],
+                "keepalive": options["keepalive"],
+                "graceful_timeout": options["graceful_timeout"],
+                "timeout": options["worker_timeout"],
+                "max_requests": options["max_requests"],
+                "max_requests_jitter": options["max_requests"] // 10,
+                "forwarded_allow_ips": options["forwarded_allow_ips"],
+                "accesslog": "-" if options["access_log"] else None,
+            }
+            for key, value in config.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Application().run()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS or default_workers())
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--keepalive", type=int, default=settings.SERVER_KEEPALIVE_SECONDS,
+                        help="Seconds to keep idle connections open")
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--limit-concurrency", type=int, default=settings.SERVER_LIMIT_CONCURRENCY,
+                        help="Per-worker cap on concurrent connections (503 beyond it)")
+    parser.add_argument("--gunicorn", action="store_true", help="Use a gunicorn master with uvicorn workers")
+    parser.add_argument("--worker-timeout", type=int, default=60, help="gunicorn: restart workers silent this long")
+    parser.add_argument("--max-requests", type=int, default=0, help="gunicorn: recycle workers after N requests")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args(argv)
+
+    pool_size, max_overflow = pool_sizes(
+        args.workers, settings.DB_MAX_CONNECTIONS, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    )
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    logger.info(
+        "Starting %d worker(s) on %s:%d, database pool %d+%d per worker",
+        args.workers, args.host, args.port, pool_size, max_overflow,
+    )
+
+    options = {
+        **vars(args),
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+    }
+    if args.gunicorn:
+        run_gunicorn(options)
+    else:
+        run_uvicorn(options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,60 @@
+import json
+import time
 import httpx
 from typing import Dict, Any, Optional
 from fastapi import HTTPException
 from integrations.foundry_config import foundry_config
+from app.services.foundry_usage import CONNECT_ERROR, ERROR, HTTP_ERROR, OK, TIMEOUT, usage_recorder
 
 
-async def chat_with_foundry_agent(message: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_foundry_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client for Foundry calls, so connections (and TLS sessions)
+    are reused across requests. Created by the app lifespan, or on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_foundry_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def chat_with_foundry_agent(
+    message: str,
+    context: Optional[Dict[str, Any]] = None,
+    project_id: Optional[int] = None,
+    source: str = "chat",
+) -> Dict[str, Any]:
     """
     Send a message to the Foundry Agent and get a response.
     
     Args:
         message: The message to send to the agent
         context: Optional context dictionary to provide additional information
+        project_id: Project the call is made for (budget and usage accounting)
+        source: What made the call (chat, job), for usage accounting
         
     Returns:
         Dictionary containing the agent's response
         
     Raises:
-        HTTPException: If the request fails
+        HTTPException: If the request fails, or 429 (FoundryBudgetExceeded)
+            if the project has used its token budget
     """
+    usage_recorder.check_budget(project_id, source)
+    
     endpoint = foundry_config.get_agent_endpoint()
     
     headers = {
@@ -33,26 +70,36 @@ async def chat_with_foundry_agent(message: str, context: Optional[Dict[str, Any]
     if context:
         payload["context"] = context
     
+    # Serialized here so the request size can be accounted for
+    content = json.dumps(payload).encode("utf-8")
+    outcome = ERROR
+    response: Optional[httpx.Response] = None
+    body: Any = None
+    started = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                endpoint,
-                json=payload,
-                headers=headers
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await get_foundry_client().post(
+            endpoint,
+            content=content,
+            headers=headers
+        )
+        response.raise_for_status()
+        body = response.json()
+        outcome = OK
+        return body
     except httpx.TimeoutException as e:
+        outcome = TIMEOUT
         raise HTTPException(
             status_code=504,
             detail="Request to Foundry Agent timed out"
         )
     except httpx.HTTPStatusError as e:
+        outcome = HTTP_ERROR
         raise HTTPException(
             status_code=e.response.status_code,
             detail=f"Foundry Agent returned status {e.response.status_code}"
         )
     except httpx.RequestError as e:
+        outcome = CONNECT_ERROR
         raise HTTPException(
             status_code=503,
             detail="Failed to connect to Foundry Agent"
@@ -62,3 +109,14 @@ async def chat_with_foundry_agent(message: str, context: Optional[Dict[str, Any]
             status_code=500,
             detail="An unexpected error occurred while communicating with Foundry Agent"
         )
+    finally:
+        usage_recorder.record(
+            project_id,
+            source,
+            outcome,
+            latency=time.perf_counter() - started,
+            request_bytes=len(content),
+            response_bytes=len(response.content) if response is not None else 0,
+            status_code=response.status_code if response is not None else None,
+            body=body,
+        )
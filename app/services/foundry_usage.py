@@ -0,0 +1,402 @@
+"""
+Foundry usage accounting and per-project token budgets.
+
+Every Foundry agent call (chat endpoint and jobs) is recorded with its
+latency, request and response sizes, the token counts its response reports
+and its outcome. record() only appends to an in-memory buffer under a
+lock, so it is safe and cheap to call from the event loop; the buffer is
+written to `foundry_usage` every `interval` seconds in batched INSERTs,
+from a worker thread. Records still buffered are lost if the process dies
+without a graceful shutdown (a graceful one flushes first).
+
+Budgets are checked against an in-memory count of each project's tokens in
+the current period (UTC day or month), so the check costs no round trip
+before the upstream call. Every `sync_interval` seconds the count is
+reloaded from `foundry_usage` (plus this process's unflushed records),
+which folds in the usage of other processes. Enforcement is soft: calls
+already in flight when a project reaches its budget still complete, and
+other processes' calls count from the next sync.
+"""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import FoundryUsage
+from app.services.status_events import day_start
+
+
+logger = logging.getLogger(__name__)
+
+# Outcomes
+OK = "ok"
+HTTP_ERROR = "http_error"
+TIMEOUT = "timeout"
+CONNECT_ERROR = "connect_error"
+ERROR = "error"
+OVER_BUDGET = "over_budget"  # Refused before calling upstream
+
+BUDGET_PERIODS = ("day", "month")
+
+# Rows per INSERT batch
+FLUSH_CHUNK_SIZE = 1000
+
+
+class FoundryBudgetExceeded(HTTPException):
+    """
+    429 for a call of a project over its token budget. Unlike an upstream
+    429 it won't succeed on a retry before the next period.
+    """
+
+
+def period_start(period: str, now: datetime) -> datetime:
+    if period == "day":
+        return datetime(now.year, now.month, now.day)
+    if period == "month":
+        return datetime(now.year, now.month, 1)
+    raise ValueError(f"Unknown FOUNDRY_BUDGET_PERIOD {period!r} (use day or month)")
+
+
+def period_end(period: str, now: datetime) -> datetime:
+    start = period_start(period, now)
+    if period == "day":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def token_counts(body: Any) -> Dict[str, Optional[int]]:
+    """
+    Token counts from a response's `usage` object, named
+    prompt/completion/total_tokens or input/output_tokens. None when the
+    response doesn't report them.
+    """
+    usage = body.get("usage") if isinstance(body, dict) else None
+    if not isinstance(usage, dict):
+        usage = {}
+
+    def count(*names: str) -> Optional[int]:
+        for name in names:
+            value = usage.get(name)
+            if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+                return value
+        return None
+
+    prompt = count("prompt_tokens", "input_tokens")
+    completion = count("completion_tokens", "output_tokens")
+    total = count("total_tokens")
+    if total is None and (prompt is not None or completion is not None):
+        total = (prompt or 0) + (completion or 0)
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": total}
+
+
+class FoundryUsageRecorder:
+    """
+    Buffered usage records and per-project token counts.
+
+    record() and check_budget() are called from request and job code on
+    the event loop, flush() and sync_budgets() from the background task's
+    worker thread; shared state is guarded by a lock that is never held
+    during I/O.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = 2.0,
+        max_pending: int = 10000,
+        budget_tokens: int = 0,
+        budget_overrides: Optional[Dict[int, int]] = None,
+        budget_period: str = "month",
+        sync_interval: float = 30.0,
+        enabled: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_pending = max_pending
+        self.budget_tokens = budget_tokens
+        self.budget_overrides = budget_overrides or {}
+        self.budget_period = budget_period
+        self.sync_interval = sync_interval
+        self.enabled = enabled
+        self._pending: List[Dict[str, Any]] = []
+        self._used: Dict[int, int] = {}
+        self._period_start = period_start(budget_period, datetime.utcnow())
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._last_sync: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def has_budgets(self) -> bool:
+        return self.budget_tokens > 0 or any(budget > 0 for budget in self.budget_overrides.values())
+
+    def budget_for(self, project_id: int) -> int:
+        """
+        Token budget of a project per period; 0 means none.
+        """
+        return self.budget_overrides.get(project_id, self.budget_tokens)
+
+    def _roll_period(self, now: datetime) -> None:
+        # Caller holds self._lock
+        start = period_start(self.budget_period, now)
+        if start != self._period_start:
+            self._period_start = start
+            self._used = {}
+
+    def used_tokens(self, project_id: int) -> int:
+        """
+        Tokens of a project in the current period, as known to this process.
+        """
+        with self._lock:
+            self._roll_period(datetime.utcnow())
+            return self._used.get(project_id, 0)
+
+    def check_budget(self, project_id: Optional[int], source: str) -> None:
+        """
+        Raise FoundryBudgetExceeded (and record the refusal) if the project
+        has used up its budget for the period.
+        """
+        if project_id is None:
+            return
+        budget = self.budget_for(project_id)
+        if budget <= 0:
+            return
+        used = self.used_tokens(project_id)
+        if used < budget:
+            return
+        self.record(project_id, source, OVER_BUDGET, latency=0.0, request_bytes=0)
+        now = datetime.utcnow()
+        retry_after = math.ceil((period_end(self.budget_period, now) - now).total_seconds())
+        raise FoundryBudgetExceeded(
+            status_code=429,
+            detail=f"Project {project_id} has used its Foundry token budget for this {self.budget_period} ({used} of {budget})",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def record(
+        self,
+        project_id: Optional[int],
+        source: str,
+        outcome: str,
+        latency: float,
+        request_bytes: int,
+        response_bytes: int = 0,
+        status_code: Optional[int] = None,
+        body: Any = None,
+    ) -> None:
+        """
+        Account for one call: count its tokens against the project's budget
+        and buffer its usage row.
+        """
+        now = datetime.utcnow()
+        tokens = token_counts(body)
+        row = {
+            "project_id": project_id,
+            "source": source,
+            "outcome": outcome,
+            "status_code": status_code,
+            "latency_ms": round(latency * 1000),
+            "request_bytes": request_bytes,
+            "response_bytes": response_bytes,
+            "created_at": now,
+            **tokens,
+        }
+        metrics.FOUNDRY_CALLS.inc((source, outcome))
+        if outcome != OVER_BUDGET:
+            metrics.FOUNDRY_CALL_DURATION.observe(latency, (source,))
+        for kind in ("prompt", "completion"):
+            if tokens[f"{kind}_tokens"]:
+                metrics.FOUNDRY_TOKENS.inc((kind,), amount=tokens[f"{kind}_tokens"])
+
+        with self._lock:
+            self._roll_period(now)
+            if project_id is not None and tokens["total_tokens"]:
+                self._used[project_id] = self._used.get(project_id, 0) + tokens["total_tokens"]
+            if not self.enabled:
+                return
+            self._pending.append(row)
+            self._drop_overflow()
+
+    def _drop_overflow(self) -> None:
+        # Caller holds self._lock; the oldest records go first
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            metrics.FOUNDRY_USAGE_DROPPED.inc(amount=overflow)
+        metrics.FOUNDRY_USAGE_PENDING.set(len(self._pending))
+
+    def flush(self) -> int:
+        """
+        Write every buffered record. Returns the number written. On failure
+        the records go back into the buffer for the next flush and the
+        error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._drop_overflow()
+                raise
+            with self._lock:
+                metrics.FOUNDRY_USAGE_PENDING.set(len(self._pending))
+            return len(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        db = self.session_factory()
+        try:
+            for start in range(0, len(batch), FLUSH_CHUNK_SIZE):
+                db.execute(insert(FoundryUsage), batch[start:start + FLUSH_CHUNK_SIZE])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def sync_budgets(self) -> None:
+        """
+        Reload every project's tokens in the current period from
+        `foundry_usage`, plus this process's unflushed records.
+        """
+        # Holding the flush lock: no batch is on its way from the buffer
+        # to the table, so nothing is counted twice or missed
+        with self._flush_lock:
+            start = period_start(self.budget_period, datetime.utcnow())
+            db = self.session_factory()
+            try:
+                totals = db.execute(
+                    select(FoundryUsage.project_id, func.sum(FoundryUsage.total_tokens))
+                    .where(FoundryUsage.created_at >= start, FoundryUsage.project_id.is_not(None))
+                    .group_by(FoundryUsage.project_id)
+                ).all()
+            finally:
+                db.close()
+            with self._lock:
+                self._roll_period(datetime.utcnow())
+                if self._period_start != start:
+                    return  # The period ended meanwhile
+                used = {project_id: int(total or 0) for project_id, total in totals}
+                for row in self._pending:
+                    if row["project_id"] is not None and row["total_tokens"] and row["created_at"] >= start:
+                        used[row["project_id"]] = used.get(row["project_id"], 0) + row["total_tokens"]
+                self._used = used
+            self._last_sync = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            if self.has_budgets and (self._last_sync is None or time.monotonic() - self._last_sync >= self.sync_interval):
+                try:
+                    await asyncio.to_thread(self.sync_budgets)
+                except Exception:
+                    logger.exception("Foundry budget sync failed; keeping the in-memory counts")
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Foundry usage flush failed; retrying in %ss", self.interval)
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the periodic flush and write what is left (the shutdown hook).
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception:
+            logger.exception("Final Foundry usage flush failed; %s records lost", len(self._pending))
+
+
+def usage_summary(
+    db: Session,
+    group_by: str,
+    since: datetime,
+    until: Optional[datetime] = None,
+    project_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Aggregate `foundry_usage` per project, source or day. Calls refused by
+    a budget are counted as `rejected`, not as calls.
+    """
+    key = {
+        "project": FoundryUsage.project_id,
+        "source": FoundryUsage.source,
+        "day": day_start(FoundryUsage.created_at),
+    }[group_by]
+    called = FoundryUsage.outcome != OVER_BUDGET
+    criteria = [FoundryUsage.created_at >= since]
+    if until is not None:
+        criteria.append(FoundryUsage.created_at < until)
+    if project_id is not None:
+        criteria.append(FoundryUsage.project_id == project_id)
+    rows = db.execute(
+        select(
+            key.label("key"),
+            func.sum(case((called, 1), else_=0)).label("calls"),
+            func.sum(case((FoundryUsage.outcome.in_((OK, OVER_BUDGET)), 0), else_=1)).label("errors"),
+            func.sum(case((called, 0), else_=1)).label("rejected"),
+            func.sum(FoundryUsage.request_bytes).label("request_bytes"),
+            func.sum(FoundryUsage.response_bytes).label("response_bytes"),
+            func.sum(FoundryUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(FoundryUsage.completion_tokens).label("completion_tokens"),
+            func.sum(FoundryUsage.total_tokens).label("total_tokens"),
+            func.avg(case((called, FoundryUsage.latency_ms))).label("avg_latency_ms"),
+            func.max(case((called, FoundryUsage.latency_ms))).label("max_latency_ms"),
+        )
+        .where(*criteria)
+        .group_by(key)
+        .order_by(key)
+    )
+    return [
+        {
+            group_by if group_by != "project" else "project_id": row.key,
+            "calls": int(row.calls),
+            "errors": int(row.errors),
+            "rejected": int(row.rejected),
+            "request_bytes": int(row.request_bytes or 0),
+            "response_bytes": int(row.response_bytes or 0),
+            "prompt_tokens": int(row.prompt_tokens or 0),
+            "completion_tokens": int(row.completion_tokens or 0),
+            "total_tokens": int(row.total_tokens or 0),
+            "avg_latency_ms": round(float(row.avg_latency_ms), 1) if row.avg_latency_ms is not None else None,
+            "max_latency_ms": row.max_latency_ms,
+        }
+        for row in rows
+    ]
+
+
+usage_recorder = FoundryUsageRecorder(
+    SessionLocal,
+    interval=settings.FOUNDRY_USAGE_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.FOUNDRY_USAGE_MAX_PENDING,
+    budget_tokens=settings.FOUNDRY_BUDGET_TOKENS,
+    budget_overrides=settings.FOUNDRY_BUDGET_OVERRIDES,
+    budget_period=settings.FOUNDRY_BUDGET_PERIOD,
+    sync_interval=settings.FOUNDRY_BUDGET_SYNC_SECONDS,
+    enabled=settings.FOUNDRY_USAGE_ENABLED,
+)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine, read_replicas
+from app.services.foundry_chat_service import get_foundry_client
+from integrations.foundry_config import foundry_config
+
+
+def _result(ok: bool, started: float, **details: Any) -> Dict[str, Any]:
+    return {
+        "status": "ok" if ok else "fail",
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        **details,
+    }
+
+
+def _select_one() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1")).scalar()
+
+
+async def probe_database(timeout: float) -> Dict[str, Any]:
+    """
+    Run `SELECT 1` on a pooled connection, giving up after `timeout` seconds.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(_select_one), timeout)
+        return _result(True, started)
+    except asyncio.TimeoutError:
+        return _result(False, started, error=f"timed out after {timeout}s")
+    except Exception as e:
+        return _result(False, started, error=type(e).__name__)
+
+
+def probe_pool(saturation_threshold: float) -> Dict[str, Any]:
+    """
+    Report connection pool usage; fail when checked-out connections reach
+    the threshold fraction of the pool's total capacity.
+    """
+    started = time.perf_counter()
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return _result(True, started, detail=f"{type(pool).__name__} has no fixed capacity")
+
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    saturation = checked_out / capacity if capacity else 0.0
+    return _result(
+        saturation < saturation_threshold,
+        started,
+        checked_out=checked_out,
+        capacity=capacity,
+        saturation=round(saturation, 3),
+    )
+
+
+async def probe_foundry(timeout: float) -> Dict[str, Any]:
+    """
+    Check that the Foundry host answers HTTP at all (any non-5xx response).
+    """
+    started = time.perf_counter()
+    try:
+        response = await get_foundry_client().get(foundry_config.BASE_URL, timeout=timeout)
+        return _result(response.status_code < 500, started, status_code=response.status_code)
+    except httpx.TimeoutException:
+        return _result(False, started, error=f"timed out after {timeout}s")
+    except httpx.HTTPError as e:
+        return _result(False, started, error=type(e).__name__)
+
+
+class HealthMonitor:
+    """
+    Caches readiness probe results for `ttl` seconds.
+
+    A stale result is served immediately while a single background task
+    refreshes it, so health checks never queue up behind slow dependencies
+    or multiply load on them. Only the very first check waits for probes.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        db_timeout: float = 2.0,
+        foundry_timeout: float = 2.0,
+        pool_saturation_threshold: float = 0.9,
+        foundry_required: bool = False,
+    ):
+        self.ttl = ttl
+        self.db_timeout = db_timeout
+        self.foundry_timeout = foundry_timeout
+        self.pool_saturation_threshold = pool_saturation_threshold
+        self.foundry_required = foundry_required
+        self._report: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> Dict[str, Any]:
+        """
+        Run every probe concurrently and store the combined report.
+        """
+        started = time.perf_counter()
+        database, foundry = await asyncio.gather(
+            probe_database(self.db_timeout),
+            probe_foundry(self.foundry_timeout),
+        )
+        checks = {
+            "database": database,
+            "pool": probe_pool(self.pool_saturation_threshold),
+            "foundry": {**foundry, "required": self.foundry_required},
+        }
+        if read_replicas.enabled:
+            checks["replicas"] = read_replicas.status()
+        failed = [check for check in checks.values() if check["status"] != "ok"]
+        if any(check.get("required", True) for check in failed):
+            status = "not_ready"
+        else:
+            # Optional checks (Foundry by default) only degrade readiness
+            status = "degraded" if failed else "ready"
+        self._report = {
+            "status": status,
+            "checked_at": datetime.utcnow().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checks": checks,
+        }
+        self._checked_at = time.monotonic()
+        return self._report
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def get_report(self) -> Dict[str, Any]:
+        """
+        Return the cached report, refreshing in the background when stale.
+        """
+        if self._report is None:
+            async with self._lock:
+                if self._report is None:
+                    await self.refresh()
+        elif time.monotonic() - self._checked_at >= self.ttl:
+            self._schedule_refresh()
+
+        return {**self._report, "age_seconds": round(time.monotonic() - self._checked_at, 3)}
+
+
+health_monitor = HealthMonitor(
+    ttl=settings.HEALTH_CACHE_TTL_SECONDS,
+    db_timeout=settings.HEALTH_DB_TIMEOUT_SECONDS,
+    foundry_timeout=settings.HEALTH_FOUNDRY_TIMEOUT_SECONDS,
+    pool_saturation_threshold=settings.HEALTH_POOL_SATURATION_THRESHOLD,
+    foundry_required=settings.HEALTH_FOUNDRY_REQUIRED,
+)
@@ -0,0 +1,160 @@
+"""
+Storage for Idempotency-Key handling (see app/middleware/idempotency.py).
+
+Keys are scoped per client: rows are stored under client_key(client, key),
+so two clients that happen to pick the same key never see each other's
+responses. The first request with a key inserts its row; the primary key makes that
+insert the lock, so of several concurrent duplicates (in any worker) only
+one runs the handler. When it finishes, its response is stored on the row
+and replayed to every later request with the same key until the row expires.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.models import IdempotencyKey
+
+
+CLAIMED = "claimed"
+REPLAY = "replay"
+MISMATCH = "mismatch"
+IN_PROGRESS = "in_progress"
+
+
+def _digest(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def client_key(client: str, key: str) -> str:
+    """
+    The stored key for an Idempotency-Key sent by `client`.
+    """
+    return _digest(client.encode(), key.encode())
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return _digest(method.encode(), path.encode(), body)
+
+
+def claim_key(
+    db: Session,
+    key: str,
+    fingerprint: str,
+    ttl: timedelta,
+    lock_timeout: timedelta,
+    now: Optional[datetime] = None,
+) -> Tuple[str, Optional[IdempotencyKey]]:
+    """
+    Try to become the request that runs the handler for `key`.
+
+    Returns (CLAIMED, None) when it did, (REPLAY, row) when a response is
+    stored, (MISMATCH, row) when the key was used for a different request
+    and (IN_PROGRESS, row) while another request holds it. The claim's
+    `locked_at` is `now`; its holder refreshes it with heartbeat_key()
+    while the handler runs. A claim without a response whose heartbeat is
+    older than `lock_timeout` is taken over, since its request crashed or
+    was cut off before it could release the key.
+    """
+    now = now or datetime.utcnow()
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.expires_at < now))
+    db.add(IdempotencyKey(key=key, fingerprint=fingerprint, locked_at=now, created_at=now, expires_at=now + ttl))
+    try:
+        db.commit()
+        return CLAIMED, None
+    except IntegrityError:
+        db.rollback()
+
+    record = db.scalars(select(IdempotencyKey).where(IdempotencyKey.key == key)).first()
+    if record is None:
+        # Released between our insert and this read; the caller retries
+        return IN_PROGRESS, None
+    if record.fingerprint != fingerprint:
+        return MISMATCH, record
+    if record.response_status is not None:
+        return REPLAY, record
+    if record.locked_at < now - lock_timeout:
+        taken = db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.response_status.is_(None),
+                IdempotencyKey.locked_at == record.locked_at,
+            )
+            .values(locked_at=now, expires_at=now + ttl)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if taken:
+            return CLAIMED, None
+    return IN_PROGRESS, record
+
+
+def heartbeat_key(db: Session, key: str, locked_at: datetime, now: datetime) -> bool:
+    """
+    Move the claim made at `locked_at` to `now`, so it doesn't look
+    abandoned. Returns False if the claim is no longer ours (taken over,
+    released or answered).
+    """
+    refreshed = db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.response_status.is_(None),
+            IdempotencyKey.locked_at == locked_at,
+        )
+        .values(locked_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(refreshed)
+
+
+def store_response(db: Session, key: str, status: int, headers: List[List[str]], body: bytes) -> None:
+    db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(locked_at=None, response_status=status, response_headers=headers, response_body=body)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_key(db: Session, key: str) -> None:
+    """
+    Drop an unfinished claim so a retry with the same key runs the handler.
+    """
+    db.execute(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.key == key, IdempotencyKey.response_status.is_(None))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def purge_expired_keys(db: Session, batch_size: int = 1000, now: Optional[datetime] = None) -> int:
+    """
+    Delete expired keys, `batch_size` rows per transaction.
+    """
+    now = now or datetime.utcnow()
+    purged = 0
+    while True:
+        keys = db.scalars(
+            select(IdempotencyKey.key).where(IdempotencyKey.expires_at < now).limit(batch_size)
+        ).all()
+        if not keys:
+            return purged
+        db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.key.in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        purged += len(keys)
@@ -0,0 +1,365 @@
+"""
+Background jobs stored in the `jobs` table.
+
+Any process can enqueue a job; JobWorker instances (in the API processes,
+or standalone via `python -m app.cli run-jobs`) claim queued rows with a
+compare-and-set UPDATE, so each job runs once however many workers poll
+the table. A job's handler commits its writes together with the job's
+success (complete_job), so a retried or taken-over job never writes twice.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import Job, Project, StatusReport, Todo
+from app.schemas.scope import scope_adapter
+from app.schemas.status_report import StatusReportScope
+from app.services.foundry_chat_service import chat_with_foundry_agent
+from app.services.foundry_usage import FoundryBudgetExceeded
+from app.services.project_summaries import refresh_todo_project_summaries
+from app.services.tasks import load_tasks, todo_scope
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Foundry answers worth retrying: timeouts, throttling, server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class RetryableJobError(Exception):
+    """
+    Raised by handlers for failures that may succeed on a later attempt.
+    """
+
+
+class LostJobClaim(Exception):
+    """
+    The job was taken over by another worker while this one ran it.
+    """
+
+
+def enqueue_job(db: Session, job_type: str, payload: Dict[str, Any], max_attempts: int = 3) -> Job:
+    job = Job(type=job_type, status=QUEUED, payload=payload, max_attempts=max_attempts)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next_job(db: Session, lock_timeout: timedelta, now: Optional[datetime] = None) -> Optional[Job]:
+    """
+    Mark the oldest runnable job as running and return it, or None.
+
+    Runnable means queued and due, or running with a claim older than
+    `lock_timeout` (its worker died). The UPDATE only succeeds if the row
+    is still in the state it was read in, so concurrent workers never
+    claim the same job.
+    """
+    now = now or datetime.utcnow()
+    runnable = or_(
+        (Job.status == QUEUED) & (Job.run_after <= now),
+        (Job.status == RUNNING) & (Job.locked_at < now - lock_timeout),
+    )
+    candidates = db.execute(
+        select(Job.id, Job.status, Job.attempts).where(runnable).order_by(Job.run_after, Job.id).limit(5)
+    ).all()
+    for job_id, current_status, attempts in candidates:
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == current_status, Job.attempts == attempts)
+            .values(status=RUNNING, attempts=attempts + 1, locked_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def complete_job(db: Session, job: Job, result: Dict[str, Any]) -> None:
+    """
+    Mark `job` succeeded in the caller's transaction (commit it together
+    with the job's writes). Raises LostJobClaim if another worker has
+    claimed the job since.
+    """
+    now = datetime.utcnow()
+    updated = db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == RUNNING, Job.attempts == job.attempts)
+        .values(status=SUCCEEDED, result=result, error=None, locked_at=None, finished_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        raise LostJobClaim(f"job {job.id} attempt {job.attempts} was taken over")
+
+
+def fail_job(db: Session, job: Job, error: str, retry_after: Optional[timedelta] = None) -> bool:
+    """
+    Record a failed attempt: requeue the job after `retry_after` if it has
+    attempts left, otherwise mark it failed. Returns True if requeued.
+    """
+    now = datetime.utcnow()
+    retry = retry_after is not None and job.attempts < job.max_attempts
+    values = {"error": error, "locked_at": None, "updated_at": now}
+    if retry:
+        values.update(status=QUEUED, run_after=now + retry_after)
+    else:
+        values.update(status=FAILED, finished_at=now)
+    db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == RUNNING, Job.attempts == job.attempts)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return retry
+
+
+def requeue_jobs(db: Session, job_ids: List[int]) -> None:
+    """
+    Put running jobs back in the queue (on shutdown), without counting the
+    interrupted attempt.
+    """
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.status == RUNNING)
+        .values(status=QUEUED, attempts=Job.attempts - 1, locked_at=None, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+# Status report generation
+
+STATUS_REPORTS = "status_reports"
+
+DEFAULT_REPORT_INSTRUCTIONS = (
+    "Draft a status report for each todo in the context. Answer with a `reports` list, "
+    "one object per todo with its `todo_id`, a `title`, a `description` and `owners`."
+)
+
+
+def _report_context(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    project = db.query(Project).filter(Project.id == payload["project_id"], Project.deleted_at.is_(None)).first()
+    if project is None:
+        raise ValueError(f"Project {payload['project_id']} not found")
+    query = db.query(Todo).filter(Todo.project_id == project.id, Todo.deleted_at.is_(None))
+    if payload.get("todo_ids"):
+        query = query.filter(Todo.id.in_(payload["todo_ids"]))
+    todos = query.order_by(Todo.id).all()
+    tasks = load_tasks(db, [t.id for t in todos])
+    return {
+        "project": {"id": project.id, "status": project.status, "scope": project.scope},
+        "todos": [{"id": t.id, "status": t.status, "scope": todo_scope(t, tasks)} for t in todos],
+    }
+
+
+def _store_reports(db: Session, job: Job, todo_ids: List[int], reports: List[Any]) -> Dict[str, Any]:
+    """
+    Match the agent's reports to todos (by `todo_id`, else by position),
+    insert them as draft status reports and complete the job, in one
+    transaction. Reports that are not valid status report scopes are
+    skipped, like the API would reject them.
+    """
+    wanted = set(todo_ids)
+    rows = []
+    for position, report in enumerate(reports):
+        if not isinstance(report, dict):
+            continue
+        scope = dict(report)
+        todo_id = scope.pop("todo_id", None)
+        if todo_id not in wanted:
+            todo_id = todo_ids[position] if position < len(todo_ids) else None
+        if todo_id is None:
+            continue
+        try:
+            scope_adapter(StatusReportScope).validate_python(scope)
+        except ValidationError as e:
+            logger.warning("Job %s: skipping invalid report for todo %s: %s", job.id, todo_id, e.errors()[0]["msg"])
+            continue
+        rows.append(StatusReport(todo_id=todo_id, scope=scope, status="draft"))
+    try:
+        db.add_all(rows)
+        db.flush()
+        refresh_todo_project_summaries(db, {row.todo_id for row in rows})
+        result = {"status_report_ids": [row.id for row in rows], "todos": len(todo_ids)}
+        complete_job(db, job, result)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+async def generate_status_reports(session_factory: Callable[[], Session], job: Job) -> Dict[str, Any]:
+    """
+    Ask the Foundry agent to draft status reports for a project's todos
+    (payload: project_id, optional todo_ids and instructions) and store them.
+    """
+    def load():
+        with session_factory() as db:
+            return _report_context(db, job.payload)
+
+    context = await asyncio.to_thread(load)
+    todo_ids = [todo["id"] for todo in context["todos"]]
+    response: Dict[str, Any] = {}
+    if todo_ids:
+        message = job.payload.get("instructions") or DEFAULT_REPORT_INSTRUCTIONS
+        try:
+            response = await chat_with_foundry_agent(
+                message=message, context=context, project_id=job.payload["project_id"], source="job"
+            )
+        except HTTPException as e:
+            # Over budget until the next period: no point in retrying soon
+            if e.status_code in RETRYABLE_STATUS_CODES and not isinstance(e, FoundryBudgetExceeded):
+                raise RetryableJobError(e.detail) from e
+            raise
+
+    def store():
+        with session_factory() as db:
+            return _store_reports(db, job, todo_ids, response.get("reports") or [])
+
+    return await asyncio.to_thread(store)
+
+
+JobHandler = Callable[[Callable[[], Session], Job], Awaitable[Dict[str, Any]]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    STATUS_REPORTS: generate_status_reports,
+}
+
+
+class JobWorker:
+    """
+    `concurrency` asyncio tasks that claim and run jobs. This is also the
+    limit on concurrent Foundry calls per process. Idle tasks poll every
+    `poll_interval` seconds, or sooner when notify() is called after an
+    enqueue in the same process.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        lock_timeout: float = 300.0,
+        retry_backoff: float = 2.0,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lock_timeout = timedelta(seconds=lock_timeout)
+        self.retry_backoff = retry_backoff
+        self.handlers = handlers or JOB_HANDLERS
+        self.running: Set[int] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        Let running jobs finish for up to `timeout` seconds, then cancel
+        them and put them back in the queue.
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.notify()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if self.running:
+            interrupted = list(self.running)
+            await asyncio.to_thread(self._with_session, requeue_jobs, interrupted)
+            logger.warning("Requeued interrupted jobs %s", interrupted)
+            self.running.clear()
+        self._tasks = []
+
+    def _with_session(self, function, *args):
+        with self.session_factory() as db:
+            return function(db, *args)
+
+    async def _consume(self) -> None:
+        while not self._stopping:
+            try:
+                job = await asyncio.to_thread(self._with_session, claim_next_job, self.lock_timeout)
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.running.add(job.id)
+            cancelled = False
+            try:
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                # Left in `running`, so stop() can requeue it
+                cancelled = True
+                raise
+            except Exception:
+                # Recording the outcome failed (e.g. the database is down);
+                # the claim expires after lock_timeout and the job is retried
+                logger.exception("Job %s: could not record its outcome", job.id)
+            finally:
+                if not cancelled:
+                    self.running.discard(job.id)
+
+    async def run_job(self, job: Job) -> None:
+        handler = self.handlers.get(job.type)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job type {job.type!r}")
+            await handler(self.session_factory, job)
+            logger.info("Job %s (%s) succeeded on attempt %s", job.id, job.type, job.attempts)
+        except LostJobClaim:
+            logger.warning("Job %s was taken over by another worker; dropped this attempt", job.id)
+        except RetryableJobError as e:
+            backoff = timedelta(seconds=self.retry_backoff * 2 ** (job.attempts - 1))
+            retried = await asyncio.to_thread(self._with_session, fail_job, job, str(e), backoff)
+            logger.warning("Job %s attempt %s failed (%s); %s", job.id, job.attempts, e, "retrying" if retried else "giving up")
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e) or type(e).__name__
+            await asyncio.to_thread(self._with_session, fail_job, job, detail)
+            logger.warning("Job %s failed: %s", job.id, detail)
+
+
+job_worker = JobWorker(
+    SessionLocal,
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lock_timeout=settings.JOB_LOCK_TIMEOUT_SECONDS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+)
@@ -0,0 +1,241 @@
+"""
+Project summary read model.
+
+`project_summaries` holds one row per live project with what project
+listings show: title, status, todo and open-todo counts, member count and
+the latest status report. Every write that changes one of those inputs
+calls refresh_project_summaries() for the affected projects inside its own
+transaction, so a summary commits or rolls back together with the write.
+
+Rows are recomputed from the source tables (a handful of indexed
+aggregates per batch of projects) instead of being adjusted by deltas, so
+a missed or replayed refresh can't leave a count permanently wrong; the
+next refresh or `python -m app.cli rebuild-project-summaries` fixes it.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, case, delete, distinct, exists, func, insert, or_, select, update
+from sqlalchemy.sql import Select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.models import Project, ProjectSummary, StatusReport, TeamMember, Todo
+
+
+# Todo statuses that don't count as open
+CLOSED_TODO_STATUSES = ("done", "closed", "cancelled")
+
+# Projects per refresh round trip (keeps IN lists well under SQL Server's
+# 2100-parameter limit)
+REFRESH_CHUNK_SIZE = 500
+
+
+def _title(scope: Any) -> Optional[str]:
+    title = scope.get("project_title") if isinstance(scope, dict) else None
+    return title[:500] if isinstance(title, str) else None
+
+
+def summary_values(db: Session, project_ids: List[int], now: datetime) -> Dict[int, Dict[str, Any]]:
+    """
+    Compute the summary rows of the live projects among `project_ids`.
+    """
+    values = {
+        row.id: {
+            "project_id": row.id,
+            "title": _title(row.scope),
+            "status": row.status,
+            "todo_count": 0,
+            "open_todo_count": 0,
+            "member_count": 0,
+            "latest_report_id": None,
+            "latest_report_status": None,
+            "latest_report_at": None,
+            "refreshed_at": now,
+        }
+        for row in db.execute(
+            select(Project.id, Project.scope, Project.status)
+            .where(Project.id.in_(project_ids), Project.deleted_at.is_(None))
+        )
+    }
+    if not values:
+        return values
+    live = list(values)
+
+    todo_counts = db.execute(
+        select(
+            Todo.project_id,
+            func.count().label("todos"),
+            func.sum(case((Todo.status.in_(CLOSED_TODO_STATUSES), 0), else_=1)).label("open_todos"),
+        )
+        .where(Todo.project_id.in_(live), Todo.deleted_at.is_(None))
+        .group_by(Todo.project_id)
+    )
+    for row in todo_counts:
+        values[row.project_id]["todo_count"] = row.todos
+        values[row.project_id]["open_todo_count"] = row.open_todos or 0
+
+    # team_members only holds rows of live community entries
+    member_counts = db.execute(
+        select(TeamMember.project_id, func.count(distinct(TeamMember.email)).label("members"))
+        .where(TeamMember.project_id.in_(live))
+        .group_by(TeamMember.project_id)
+    )
+    for row in member_counts:
+        values[row.project_id]["member_count"] = row.members
+
+    ranked = (
+        select(
+            Todo.project_id,
+            StatusReport.id,
+            StatusReport.status,
+            StatusReport.created_at,
+            func.row_number().over(
+                partition_by=Todo.project_id,
+                order_by=(StatusReport.created_at.desc(), StatusReport.id.desc()),
+            ).label("position"),
+        )
+        .join(Todo, Todo.id == StatusReport.todo_id)
+        .where(Todo.project_id.in_(live), Todo.deleted_at.is_(None), StatusReport.deleted_at.is_(None))
+        .subquery()
+    )
+    for row in db.execute(select(ranked).where(ranked.c.position == 1)):
+        values[row.project_id].update(
+            latest_report_id=row.id,
+            latest_report_status=row.status,
+            latest_report_at=row.created_at,
+        )
+    return values
+
+
+def _write_summaries(db: Session, values: Dict[int, Dict[str, Any]]) -> None:
+    existing = set(db.execute(
+        select(ProjectSummary.project_id).where(ProjectSummary.project_id.in_(list(values)))
+    ).scalars())
+    updates = [row for project_id, row in values.items() if project_id in existing]
+    if updates:
+        db.execute(update(ProjectSummary), updates)
+    missing = [row for project_id, row in values.items() if project_id not in existing]
+    if not missing:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(ProjectSummary), missing)
+    except IntegrityError:
+        # Another transaction created some of them meanwhile
+        for row in missing:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(ProjectSummary), [row])
+            except IntegrityError:
+                db.execute(update(ProjectSummary), [row])
+
+
+def refresh_project_summaries(db: Session, project_ids: Iterable[Optional[int]], now: Optional[datetime] = None) -> None:
+    """
+    Recompute the summaries of `project_ids` inside the caller's transaction.
+    Deleted or missing projects lose their summary row.
+    """
+    ids = sorted({project_id for project_id in project_ids if project_id is not None})
+    now = now or datetime.utcnow()
+    db.flush()  # The aggregates must see the caller's pending ORM changes
+    for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+        chunk = ids[start:start + REFRESH_CHUNK_SIZE]
+        values = summary_values(db, chunk, now)
+        gone = [project_id for project_id in chunk if project_id not in values]
+        if gone:
+            db.execute(delete(ProjectSummary).where(ProjectSummary.project_id.in_(gone)))
+        if values:
+            _write_summaries(db, values)
+
+
+def refresh_todo_project_summaries(db: Session, todo_ids: Iterable[int], now: Optional[datetime] = None) -> None:
+    """
+    Recompute the summaries of the projects owning `todo_ids`.
+    """
+    todo_ids = list(todo_ids)
+    project_ids = set()
+    for start in range(0, len(todo_ids), REFRESH_CHUNK_SIZE):
+        project_ids.update(db.execute(
+            select(Todo.project_id).where(Todo.id.in_(todo_ids[start:start + REFRESH_CHUNK_SIZE])).distinct()
+        ).scalars())
+    refresh_project_summaries(db, project_ids, now)
+
+
+# Listing orders; each ends with project_id so keyset cursors are unique
+SUMMARY_SORTS = {
+    "id": (ProjectSummary.project_id,),
+    "-open_todos": (ProjectSummary.open_todo_count.desc(), ProjectSummary.project_id.desc()),
+}
+
+
+def encode_cursor(sort: str, summary: ProjectSummary) -> str:
+    if sort == "id":
+        key = [summary.project_id]
+    else:
+        key = [summary.open_todo_count, summary.project_id]
+    return base64.urlsafe_b64encode(json.dumps([sort, *key]).encode()).decode().rstrip("=")
+
+
+def apply_cursor(query: Select, sort: str, cursor: str) -> Select:
+    """
+    Restrict `query` to the summaries after `cursor` in `sort` order.
+    Raises ValueError for a malformed cursor or one from another sort.
+    """
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(decoded, list) or not decoded or decoded[0] != sort:
+        raise ValueError("Cursor does not match the sort order")
+    key = decoded[1:]
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in key):
+        raise ValueError("Invalid cursor")
+
+    if sort == "id" and len(key) == 1:
+        return query.where(ProjectSummary.project_id > key[0])
+    if sort == "-open_todos" and len(key) == 2:
+        open_todos, project_id = key
+        return query.where(or_(
+            ProjectSummary.open_todo_count < open_todos,
+            and_(ProjectSummary.open_todo_count == open_todos, ProjectSummary.project_id < project_id),
+        ))
+    raise ValueError("Invalid cursor")
+
+
+def rebuild_project_summaries(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Regenerate `project_summaries` from the source tables, `batch_size`
+    projects per transaction, and drop rows of deleted projects. Safe to run
+    while the API is serving writes, and to re-run.
+    """
+    counts = {"projects": 0, "removed": 0}
+    last_id = 0
+    while True:
+        ids = list(db.execute(
+            select(Project.id)
+            .where(Project.id > last_id, Project.deleted_at.is_(None))
+            .order_by(Project.id)
+            .limit(batch_size)
+        ).scalars())
+        if not ids:
+            break
+        last_id = ids[-1]
+        refresh_project_summaries(db, ids)
+        db.commit()
+        counts["projects"] += len(ids)
+
+    live_project = exists().where(Project.id == ProjectSummary.project_id, Project.deleted_at.is_(None))
+    while True:
+        ids = list(db.execute(
+            select(ProjectSummary.project_id).where(~live_project).limit(batch_size)
+        ).scalars())
+        if not ids:
+            break
+        db.execute(delete(ProjectSummary).where(ProjectSummary.project_id.in_(ids)))
+        db.commit()
+        counts["removed"] += len(ids)
+    return counts
@@ -0,0 +1,432 @@
+"""
+Partial updates of `scope` documents.
+
+Supports RFC 7396 JSON Merge Patch and RFC 6902 JSON Patch. Merge patches
+are applied inside the database when the dialect can do it in a single
+UPDATE (SQLite `json_patch`; for shallow patches SQL Server `JSON_MODIFY`
+and PostgreSQL jsonb `||` / `-`);
+everything else is applied in Python with a compare-and-swap on
+`updated_at` so concurrent patches never overwrite each other.
+"""
+from copy import deepcopy
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import json
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import Boolean, LargeBinary, Text, bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.scope import scope_adapter, scope_errors
+
+
+MERGE_PATCH = "application/merge-patch+json"
+JSON_PATCH = "application/json-patch+json"
+
+_MAX_CAS_ATTEMPTS = 5
+
+
+class JsonPatchError(ValueError):
+    """
+    Raised when a patch is malformed or cannot be applied to the document.
+    """
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """
+    Raised when a JSON Patch `test` operation does not match.
+    """
+
+
+# --------------------------------------------------------------------------
+# RFC 7396 - JSON Merge Patch
+# --------------------------------------------------------------------------
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply a merge patch and return the new document (inputs are not modified).
+    """
+    if not isinstance(patch, dict):
+        return deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+# --------------------------------------------------------------------------
+# RFC 6902 - JSON Patch
+# --------------------------------------------------------------------------
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(document: Any, tokens: List[str]) -> Any:
+    current = document
+    for token in tokens[:-1]:
+        if isinstance(current, dict):
+            if token not in current:
+                raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+            current = current[token]
+        elif isinstance(current, list):
+            current = current[_list_index(current, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return current
+
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return document
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_list_index(parent, token, allow_end=False)]
+    raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to a scalar at /{'/'.join(tokens)}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve_parent(document, tokens)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+        del parent[token]
+    elif isinstance(parent, list):
+        del parent[_list_index(parent, token, allow_end=False)]
+    else:
+        raise JsonPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    # Python treats True == 1; JSON does not.
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Apply a JSON Patch atomically: either every operation succeeds and the
+    new document is returned, or JsonPatchError is raised.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("A JSON Patch must be an array of operations")
+    document = deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid operation: {operation!r}")
+        op = operation["op"]
+        path = _parse_pointer(operation["path"])
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' operation requires a value")
+
+        if op == "add":
+            document = _add(document, path, deepcopy(operation["value"]))
+        elif op == "remove":
+            document = _remove(document, path)
+        elif op == "replace":
+            _get(document, path)
+            if path:
+                document = _remove(document, path)
+            document = _add(document, path, deepcopy(operation["value"]))
+        elif op in ("move", "copy"):
+            if "from" not in operation:
+                raise JsonPatchError(f"'{op}' operation requires 'from'")
+            source = _parse_pointer(operation["from"])
+            value = _get(document, source)
+            if op == "move":
+                if path[:len(source)] == source and len(path) > len(source):
+                    raise JsonPatchError("Cannot move a value into one of its children")
+                document = _remove(document, source)
+            else:
+                value = deepcopy(value)
+            document = _add(document, path, value)
+        elif op == "test":
+            if not _json_equal(_get(document, path), operation["value"]):
+                raise JsonPatchTestFailed(f"Test failed at {operation['path']}")
+        else:
+            raise JsonPatchError(f"Unknown operation: {op!r}")
+    return document
+
+
+# --------------------------------------------------------------------------
+# Database application
+# --------------------------------------------------------------------------
+
+class ScopeView:
+    """
+    Maps between the stored `scope` column and the document clients patch,
+    for resources that keep part of their scope in other tables. `keys` are
+    the top-level keys owned by the view; patches touching them are always
+    applied in Python.
+    """
+    keys: Tuple[str, ...] = ()
+
+    def load(self, db: Session, entity_id: int, scope: Dict[str, Any]) -> Dict[str, Any]:
+        return scope
+
+    def store(self, db: Session, entity_id: int, document: Dict[str, Any]) -> Dict[str, Any]:
+        return document
+
+
+def parse_etag(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an If-Match header carrying the `updated_at` ETag of a resource.
+    """
+    if not value or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return datetime.fromisoformat(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match must be an ETag returned by this API")
+
+
+def resolve_patch_format(content_type: Optional[str]) -> str:
+    """
+    Map a request Content-Type to a patch format; plain JSON is a merge patch.
+    """
+    media_type = (content_type or "application/json").split(";", 1)[0].strip().lower()
+    if media_type in (MERGE_PATCH, "application/json"):
+        return MERGE_PATCH
+    if media_type == JSON_PATCH:
+        return JSON_PATCH
+    raise HTTPException(
+        status_code=415,
+        detail=f"Use {MERGE_PATCH} or {JSON_PATCH}"
+    )
+
+
+def make_etag(updated_at: datetime) -> str:
+    return f'"{updated_at.isoformat()}"'
+
+
+def _mssql_json_path(key: str) -> Optional[str]:
+    if '"' in key or "\\" in key:
+        return None
+    return f'$."{key}"'
+
+
+def _json_size(dialect: str, document):
+    """
+    Size of a JSON document in the database, never smaller than the compact
+    JSON the scope size limit is checked against (PostgreSQL's text form
+    adds spaces, SQL Server's NVARCHAR two bytes per character).
+    """
+    if dialect == "sqlite":
+        return func.length(cast(document, LargeBinary))
+    if dialect == "postgresql":
+        return func.octet_length(cast(document, Text))
+    return func.DATALENGTH(document)
+
+
+def _in_database_merge(db: Session, model, entity_id: int, patch: Dict[str, Any], now: datetime,
+                       expected_updated_at: Optional[datetime], max_bytes: Optional[int] = None) -> Optional[int]:
+    """
+    Apply a merge patch with a single UPDATE when the dialect supports it.
+    Returns the affected row count, or None if the patch must go through Python.
+    With `max_bytes`, rows whose merged scope would be larger are not updated.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        new_scope = func.json_patch(model.scope, bindparam("patch_document", json.dumps(patch)))
+    elif dialect == "mssql":
+        new_scope = model.scope
+        for index, (key, value) in enumerate(patch.items()):
+            path = _mssql_json_path(key)
+            if path is None or isinstance(value, dict):
+                # Nested objects need a recursive merge; let Python handle them.
+                return None
+            param = bindparam(f"patch_value_{index}", json.dumps(value) if isinstance(value, list) else value)
+            if isinstance(value, list):
+                param = func.JSON_QUERY(param)
+            elif isinstance(value, bool):
+                param = cast(param, Boolean)
+            new_scope = func.JSON_MODIFY(new_scope, path, param)
+    elif dialect == "postgresql":
+        if any(isinstance(value, dict) for value in patch.values()):
+            # `||` is a shallow merge; nested objects go through Python.
+            return None
+        new_scope = model.scope
+        for key, value in patch.items():
+            if value is None:
+                new_scope = new_scope.op("-")(literal(key, Text))
+        values = {key: value for key, value in patch.items() if value is not None}
+        if values:
+            new_scope = new_scope.op("||")(bindparam("patch_document", values, type_=JSONB))
+    else:
+        return None
+
+    statement = (
+        update(model)
+        .where(model.id == entity_id, model.deleted_at.is_(None))
+        .values(scope=new_scope, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_updated_at is not None:
+        statement = statement.where(model.updated_at == expected_updated_at)
+    if max_bytes is not None:
+        statement = statement.where(_json_size(dialect, new_scope) <= max_bytes)
+    return db.execute(statement).rowcount
+
+
+def patch_scope(
+    db: Session,
+    model,
+    entity_id: int,
+    patch: Union[Dict[str, Any], List[Dict[str, Any]]],
+    patch_format: str,
+    expected_updated_at: Optional[datetime] = None,
+    not_found_detail: str = "Not found",
+    view: Optional[ScopeView] = None,
+    scope_type: Any = None,
+    on_write: Optional[Callable[[], None]] = None,
+):
+    """
+    Apply a merge patch or JSON Patch to `model.scope` for one row and
+    commit. Returns the refreshed ORM instance.
+
+    With `expected_updated_at` (from If-Match) the update only happens if
+    the row has not changed since; otherwise 412 is raised. A `view`
+    exposes data kept outside the scope column as part of the document.
+    With a `scope_type` (see app.schemas.scope) the patched document is
+    validated, or only the values a merge patch sets when it is applied in
+    the database (plus the merged document's size, in SQL); invalid
+    documents get a 422. `on_write` runs after the
+    update, in the same transaction (e.g. to refresh derived rows).
+    """
+    now = datetime.utcnow()
+    view = view or ScopeView()
+
+    if patch_format == MERGE_PATCH and isinstance(patch, dict) and not set(view.keys) & patch.keys():
+        # Known scope keys hold scalars and lists, which a merge patch
+        # replaces as a whole, so checking the new values is enough.
+        _validate_scope(scope_type, {key: value for key, value in patch.items() if value is not None})
+        max_bytes = settings.SCOPE_MAX_BYTES if scope_type is not None else None
+        affected = _in_database_merge(db, model, entity_id, patch, now, expected_updated_at, max_bytes)
+        if affected:
+            return _commit_and_load(db, model, entity_id, on_write)
+        if affected == 0:
+            _raise_missing_or_conflict(db, model, entity_id, not_found_detail, expected_updated_at)
+            # The row is there, so the merged scope may be over the size
+            # limit: the Python path below measures it exactly (and 422s).
+
+    for _ in range(_MAX_CAS_ATTEMPTS):
+        row = db.execute(
+            select(model.scope, model.updated_at)
+            .where(model.id == entity_id, model.deleted_at.is_(None))
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail=not_found_detail)
+        if expected_updated_at is not None and row.updated_at != expected_updated_at:
+            raise HTTPException(status_code=412, detail="Resource was modified; re-read and retry")
+
+        current = view.load(db, entity_id, row.scope)
+        try:
+            if patch_format == JSON_PATCH:
+                patched = apply_json_patch(current, patch)
+            else:
+                patched = apply_merge_patch(current, patch)
+        except JsonPatchTestFailed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except JsonPatchError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        if not isinstance(patched, dict):
+            raise HTTPException(status_code=422, detail="Patched scope must be a JSON object")
+        _validate_scope(scope_type, patched)
+
+        # Compare-and-swap: only write if nobody changed the row since we read
+        # it. Anything the view writes elsewhere is rolled back with it.
+        scope = view.store(db, entity_id, patched)
+        affected = db.execute(
+            update(model)
+            .where(model.id == entity_id, model.deleted_at.is_(None), model.updated_at == row.updated_at)
+            .values(scope=scope, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if affected:
+            return _commit_and_load(db, model, entity_id, on_write)
+        db.rollback()
+        if expected_updated_at is not None:
+            raise HTTPException(status_code=412, detail="Resource was modified; re-read and retry")
+
+    raise HTTPException(status_code=409, detail="Too many concurrent updates; retry")
+
+
+def _validate_scope(scope_type: Any, document: Dict[str, Any]) -> None:
+    if scope_type is None:
+        return
+    try:
+        scope_adapter(scope_type).validate_python(document)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=scope_errors(e))
+
+
+def _raise_missing_or_conflict(db: Session, model, entity_id: int, not_found_detail: str,
+                               expected_updated_at: Optional[datetime]):
+    row = db.execute(
+        select(model.updated_at).where(model.id == entity_id, model.deleted_at.is_(None))
+    ).first()
+    db.rollback()
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    if expected_updated_at is not None and row.updated_at != expected_updated_at:
+        raise HTTPException(status_code=412, detail="Resource was modified; re-read and retry")
+
+
+def _commit_and_load(db: Session, model, entity_id: int, on_write: Optional[Callable[[], None]] = None):
+    if on_write is not None:
+        on_write()
+    db.commit()
+    return db.query(model).filter(model.id == entity_id).first()
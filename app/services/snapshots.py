@@ -0,0 +1,484 @@
+"""
+Snapshot export and restore of the primary tables, for backups and for
+cloning an environment (e.g. production into staging).
+
+A snapshot is a directory:
+
+    manifest.json                   format, schema revision, per-table columns, rows and parts
+    projects/part-00000.parquet     (or .jsonl.zst, .jsonl.gz)
+    todos/part-00000.parquet
+    ...
+
+Each table is read in keyset batches and written to parts of at most
+`part_rows` rows, and restored part by part with batched INSERTs, so
+memory stays at one batch per table either way. Tables are exported and
+restored in parallel, one worker (and connection) per table.
+
+Parquet (zstd-compressed, JSON documents as strings) needs pyarrow;
+without it, JSON lines compressed with zstd (needs zstandard) or gzip.
+Derived tables (team_members, project_summaries) are not exported; they
+are rebuilt after a restore.
+"""
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import JSON, DateTime, Integer, Table, delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.models.models import Community, Project, ProjectSummary, StatusEvent, StatusReport, Task, TeamMember, Todo
+from app.services.project_summaries import rebuild_project_summaries
+from app.services.team_members import backfill_team_members
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet is optional, JSON lines are always available
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+
+FORMAT_VERSION = 1
+PARQUET = "parquet"
+JSONL_ZSTD = "jsonl.zst"
+JSONL_GZIP = "jsonl.gz"
+FORMATS = (PARQUET, JSONL_ZSTD, JSONL_GZIP)
+
+SNAPSHOT_TABLES: Dict[str, Table] = {
+    "projects": Project.__table__,
+    "community": Community.__table__,
+    "todos": Todo.__table__,
+    "tasks": Task.__table__,
+    "status_reports": StatusReport.__table__,
+    "status_events": StatusEvent.__table__,
+}
+
+# Restore order when foreign keys can't be deferred: each level only
+# references tables of earlier levels
+RESTORE_LEVELS = (("projects",), ("community", "todos"), ("tasks", "status_reports", "status_events"))
+
+# Emptied before a replacing restore, children first
+DERIVED_TABLES = (TeamMember.__table__, ProjectSummary.__table__)
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+class SnapshotError(Exception):
+    """
+    The snapshot can't be written or restored (bad name or format,
+    non-empty target, schema mismatch, constraint violations).
+    """
+
+
+def available_formats() -> List[str]:
+    return [
+        name for name, available in ((PARQUET, pyarrow is not None), (JSONL_ZSTD, zstandard is not None), (JSONL_GZIP, True))
+        if available
+    ]
+
+
+def default_format() -> str:
+    return available_formats()[0]
+
+
+def snapshot_path(directory: str, name: str) -> str:
+    if not NAME_PATTERN.match(name):
+        raise SnapshotError(f"Invalid snapshot name {name!r}")
+    return os.path.join(directory, name)
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(path, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise SnapshotError(f"No snapshot at {path}")
+
+
+def list_snapshots(directory: str) -> List[Dict[str, Any]]:
+    """
+    Manifests of the snapshots in `directory`, newest first.
+    """
+    if not os.path.isdir(directory):
+        return []
+    manifests = []
+    for name in os.listdir(directory):
+        if NAME_PATTERN.match(name) and os.path.isfile(os.path.join(directory, name, "manifest.json")):
+            manifests.append({"name": name, **read_manifest(os.path.join(directory, name))})
+    return sorted(manifests, key=lambda manifest: manifest["created_at"], reverse=True)
+
+
+def schema_revision(bind: Engine) -> Optional[str]:
+    """
+    The Alembic revision of the database (None for a schema created
+    without migrations).
+    """
+    with bind.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            return None
+
+
+# --------------------------------------------------------------------------
+# Part files
+# --------------------------------------------------------------------------
+
+def _json_columns(table: Table) -> List[str]:
+    return [column.name for column in table.columns if isinstance(column.type, JSON)]
+
+
+def _datetime_columns(table: Table) -> List[str]:
+    return [column.name for column in table.columns if isinstance(column.type, DateTime)]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Can't serialize {type(value).__name__}")
+
+
+def _arrow_schema(table: Table, columns: List[str]):
+    types = []
+    for name in columns:
+        column_type = table.c[name].type
+        if isinstance(column_type, DateTime):
+            types.append((name, pyarrow.timestamp("us")))
+        elif isinstance(column_type, Integer):
+            types.append((name, pyarrow.int64()))
+        else:  # Strings, and JSON documents serialized as strings
+            types.append((name, pyarrow.string()))
+    return pyarrow.schema(types)
+
+
+class PartWriter:
+    """
+    Writes one part file, a batch of rows at a time.
+    """
+
+    def __init__(self, path: str, snapshot_format: str, table: Table, columns: List[str]):
+        self.snapshot_format = snapshot_format
+        self.columns = columns
+        self.json_columns = _json_columns(table)
+        if snapshot_format == PARQUET:
+            self._file = pyarrow.parquet.ParquetWriter(path, _arrow_schema(table, columns), compression="zstd")
+        elif snapshot_format == JSONL_ZSTD:
+            self._file = zstandard.open(path, "wb", cctx=zstandard.ZstdCompressor(level=3))
+        else:
+            self._file = gzip.open(path, "wb", compresslevel=6)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.snapshot_format == PARQUET:
+            for row in rows:
+                for name in self.json_columns:
+                    if row[name] is not None:
+                        row[name] = json.dumps(row[name], separators=(",", ":"))
+            self._file.write_table(pyarrow.Table.from_pylist(rows, schema=self._file.schema))
+            return
+        self._file.write(b"".join(
+            json.dumps([row[name] for name in self.columns], default=_encode, separators=(",", ":")).encode() + b"\n"
+            for row in rows
+        ))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_part(path: str, table: Table, columns: List[str], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield the rows of a part file in batches of up to `batch_size`, with
+    the column types the table expects.
+    """
+    if path.endswith(PARQUET):
+        if pyarrow is None:
+            raise SnapshotError("Restoring a Parquet snapshot needs pyarrow (pip install pyarrow)")
+        json_columns = [name for name in _json_columns(table) if name in columns]
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            rows = batch.to_pylist()
+            for row in rows:
+                for name in json_columns:
+                    if row[name] is not None:
+                        row[name] = json.loads(row[name])
+            yield rows
+        return
+
+    if path.endswith(JSONL_ZSTD):
+        if zstandard is None:
+            raise SnapshotError("Restoring a zstd snapshot needs zstandard (pip install zstandard)")
+        source = zstandard.open(path, "rt", encoding="utf-8")
+    else:
+        source = gzip.open(path, "rb")
+    datetime_columns = [index for index, name in enumerate(columns) if name in _datetime_columns(table)]
+    with source:
+        rows = []
+        for line in source:
+            values = json.loads(line)
+            for index in datetime_columns:
+                if values[index] is not None:
+                    values[index] = datetime.fromisoformat(values[index])
+            rows.append(dict(zip(columns, values)))
+            if len(rows) >= batch_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+# --------------------------------------------------------------------------
+# Export
+# --------------------------------------------------------------------------
+
+def _export_table(bind: Engine, name: str, path: str, snapshot_format: str, part_rows: int, batch_size: int) -> Dict[str, Any]:
+    table = SNAPSHOT_TABLES[name]
+    columns = [column.name for column in table.columns]
+    os.makedirs(os.path.join(path, name), exist_ok=True)
+    parts: List[str] = []
+    rows = 0
+    writer: Optional[PartWriter] = None
+    in_part = 0
+    last_id = None
+    try:
+        with bind.connect() as connection:
+            while True:
+                query = select(table).order_by(table.c.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.where(table.c.id > last_id)
+                batch = [dict(row) for row in connection.execute(query).mappings()]
+                if not batch:
+                    break
+                last_id = batch[-1]["id"]
+                if writer is None or in_part >= part_rows:
+                    if writer is not None:
+                        writer.close()
+                    parts.append(f"part-{len(parts):05d}.{snapshot_format}")
+                    writer = PartWriter(os.path.join(path, name, parts[-1]), snapshot_format, table, columns)
+                    in_part = 0
+                writer.write(batch)
+                in_part += len(batch)
+                rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return {"columns": columns, "rows": rows, "parts": parts}
+
+
+def export_snapshot(
+    bind: Engine,
+    path: str,
+    snapshot_format: Optional[str] = None,
+    part_rows: int = 100000,
+    batch_size: int = 5000,
+    workers: int = 4,
+) -> Dict[str, Any]:
+    """
+    Write every snapshot table to a new snapshot directory at `path` and
+    return its manifest. Tables are read on separate connections, so a
+    snapshot taken while the API serves writes may miss rows written
+    during the export; take it from a quiet database (or a replica) for an
+    exact copy.
+    """
+    snapshot_format = snapshot_format or default_format()
+    if snapshot_format not in available_formats():
+        raise SnapshotError(f"Format {snapshot_format!r} is not available; use one of {available_formats()}")
+    if os.path.exists(path):
+        raise SnapshotError(f"{path} already exists")
+    os.makedirs(path)
+
+    started = datetime.utcnow()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {
+            name: pool.submit(_export_table, bind, name, path, snapshot_format, part_rows, batch_size)
+            for name in SNAPSHOT_TABLES
+        }
+        tables = {name: future.result() for name, future in futures.items()}
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "format": snapshot_format,
+        "created_at": started.isoformat(),
+        "seconds": round((datetime.utcnow() - started).total_seconds(), 3),
+        "database": bind.dialect.name,
+        "schema_revision": schema_revision(bind),
+        "tables": tables,
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# --------------------------------------------------------------------------
+# Restore
+# --------------------------------------------------------------------------
+
+def _restore_table(bind: Engine, name: str, path: str, manifest_table: Dict[str, Any], batch_size: int) -> int:
+    table = SNAPSHOT_TABLES[name]
+    columns = [column for column in manifest_table["columns"] if column in table.c]
+    rows = 0
+    with bind.connect() as connection:
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            # Checked once for the whole restore (foreign_key_check)
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        if dialect == "mssql":
+            connection.exec_driver_sql(f"SET IDENTITY_INSERT {name} ON")
+        try:
+            for part in manifest_table["parts"]:
+                for batch in read_part(os.path.join(path, name, part), table, columns, batch_size):
+                    connection.execute(table.insert(), batch)
+                    connection.commit()
+                    rows += len(batch)
+        finally:
+            connection.rollback()
+            # The connection goes back to the pool
+            if dialect == "mssql":
+                connection.exec_driver_sql(f"SET IDENTITY_INSERT {name} OFF")
+            if dialect == "sqlite":
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    return rows
+
+
+def _defer_constraints(connection: Connection) -> bool:
+    """
+    Turn off foreign key checks for the duration of the load, where the
+    backend allows it. Returns False if tables must be loaded parents
+    first instead (PostgreSQL: the keys are not DEFERRABLE).
+    """
+    dialect = connection.dialect.name
+    if dialect == "mssql":
+        for name in SNAPSHOT_TABLES:
+            connection.exec_driver_sql(f"ALTER TABLE {name} NOCHECK CONSTRAINT ALL")
+        connection.commit()
+        return True
+    return dialect == "sqlite"  # Per connection, in _restore_table
+
+
+def _check_constraints(connection: Connection, validate: bool = True) -> None:
+    """
+    Turn foreign key checks back on. With `validate`, verify the loaded rows
+    and raise if any references a missing parent.
+    """
+    dialect = connection.dialect.name
+    if dialect == "mssql":
+        # WITH CHECK validates the loaded rows and keeps the keys trusted
+        option = "WITH CHECK CHECK" if validate else "CHECK"
+        for name in SNAPSHOT_TABLES:
+            connection.exec_driver_sql(f"ALTER TABLE {name} {option} CONSTRAINT ALL")
+        connection.commit()
+    elif dialect == "sqlite" and validate:
+        violations = connection.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise SnapshotError(f"{len(violations)} rows reference missing parents (first: {tuple(violations[0])})")
+
+
+def _reset_sequences(connection: Connection) -> None:
+    # PostgreSQL sequences don't advance on explicit-id inserts
+    if connection.dialect.name != "postgresql":
+        return
+    for name in SNAPSHOT_TABLES:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {name}), 0) + 1, false)"
+        ))
+    connection.commit()
+
+
+def _clear_tables(connection: Connection, replace: bool) -> None:
+    tables = [*DERIVED_TABLES, *reversed(list(SNAPSHOT_TABLES.values()))]
+    if not replace:
+        for table in tables:
+            if connection.execute(select(func.count()).select_from(table)).scalar():
+                raise SnapshotError(f"Table {table.name} is not empty; restore with replace to overwrite it")
+        return
+    for table in tables:
+        connection.execute(delete(table))
+    connection.commit()
+
+
+def restore_snapshot(
+    bind: Engine,
+    path: str,
+    replace: bool = False,
+    batch_size: int = 5000,
+    workers: int = 4,
+) -> Dict[str, Any]:
+    """
+    Load the snapshot at `path` into the snapshot tables of `bind`, then
+    rebuild team_members and project_summaries. The tables must be empty
+    unless `replace` is set, which deletes their rows first.
+
+    Foreign key checks are deferred to the end where the backend allows it
+    (SQL Server, SQLite) and every table loads at once; otherwise tables
+    load parents first, in parallel within each level.
+
+    Rows are committed batch by batch: a restore that fails (e.g. on rows
+    without parents) leaves what it loaded; fix the snapshot and restore
+    again with `replace`.
+    """
+    manifest = read_manifest(path)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format version {manifest.get('format_version')!r}")
+    revision = schema_revision(bind)
+    if manifest.get("schema_revision") and revision and manifest["schema_revision"] != revision:
+        raise SnapshotError(
+            f"Snapshot has schema revision {manifest['schema_revision']}, the database has {revision}; "
+            "migrate one of them first"
+        )
+
+    started = datetime.utcnow()
+    with bind.connect() as connection:
+        _clear_tables(connection, replace)
+        deferred = _defer_constraints(connection)
+
+    if deferred and bind.dialect.name != "sqlite":
+        levels = [tuple(SNAPSHOT_TABLES)]
+    elif deferred:
+        # SQLite has a single writer: parallel loaders would only wait for each other
+        levels = [(name,) for name in SNAPSHOT_TABLES]
+    else:
+        levels = RESTORE_LEVELS
+
+    counts: Dict[str, int] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            for level in levels:
+                futures = {
+                    name: pool.submit(_restore_table, bind, name, path, manifest["tables"][name], batch_size)
+                    for name in level
+                    if name in manifest["tables"]
+                }
+                counts.update({name: future.result() for name, future in futures.items()})
+    except BaseException:
+        with bind.connect() as connection:
+            _check_constraints(connection, validate=False)
+        raise
+
+    with bind.connect() as connection:
+        try:
+            _check_constraints(connection)
+        except DBAPIError as e:
+            # SQL Server found rows without parents; keep the keys enforced for new writes
+            connection.rollback()
+            _check_constraints(connection, validate=False)
+            raise SnapshotError(f"Loaded rows violate a foreign key: {e.orig}")
+        _reset_sequences(connection)
+
+    with Session(bind) as db:
+        members = backfill_team_members(db, batch_size=500)
+        summaries = rebuild_project_summaries(db, batch_size=500)
+
+    return {
+        "rows": counts,
+        "team_members": members,
+        "project_summaries": summaries,
+        "seconds": round((datetime.utcnow() - started).total_seconds(), 3),
+    }
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import Community, FoundryUsage, Project, ProjectSummary, StatusEvent, StatusReport, Task, TeamMember, Todo
+from app.services.project_summaries import refresh_project_summaries, refresh_todo_project_summaries
+
+
+def _soft_delete(db: Session, model, *criteria, deleted_at: datetime) -> int:
+    """
+    Stamp deleted_at on every live row matching `criteria` with one UPDATE.
+    """
+    result = db.execute(
+        update(model)
+        .where(*criteria, model.deleted_at.is_(None))
+        .values(deleted_at=deleted_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def soft_delete_project(db: Session, project_id: int, deleted_at: Optional[datetime] = None) -> bool:
+    """
+    Soft delete a project and cascade to its todos, their tasks and status
+    reports, and its community entries using set-based UPDATEs (no rows are loaded).
+
+    Runs inside the caller's transaction; returns False if the project does
+    not exist or is already deleted (nothing is changed in that case).
+    """
+    deleted_at = deleted_at or datetime.utcnow()
+    if not _soft_delete(db, Project, Project.id == project_id, deleted_at=deleted_at):
+        return False
+
+    project_todos = select(Todo.id).where(Todo.project_id == project_id).scalar_subquery()
+    _soft_delete(db, StatusReport, StatusReport.todo_id.in_(project_todos), deleted_at=deleted_at)
+    _soft_delete(db, Task, Task.todo_id.in_(project_todos), deleted_at=deleted_at)
+    _soft_delete(db, Todo, Todo.project_id == project_id, deleted_at=deleted_at)
+    _soft_delete(db, Community, Community.project_id == project_id, deleted_at=deleted_at)
+    # Membership rows only index live community entries, summaries live projects.
+    db.execute(delete(TeamMember).where(TeamMember.project_id == project_id))
+    refresh_project_summaries(db, [project_id])
+    return True
+
+
+def soft_delete_todo(db: Session, todo_id: int, deleted_at: Optional[datetime] = None) -> bool:
+    """
+    Soft delete a todo, its tasks and its status reports. Same contract as soft_delete_project.
+    """
+    deleted_at = deleted_at or datetime.utcnow()
+    if not _soft_delete(db, Todo, Todo.id == todo_id, deleted_at=deleted_at):
+        return False
+
+    _soft_delete(db, StatusReport, StatusReport.todo_id == todo_id, deleted_at=deleted_at)
+    _soft_delete(db, Task, Task.todo_id == todo_id, deleted_at=deleted_at)
+    refresh_todo_project_summaries(db, [todo_id])
+    return True
+
+
+def _expired_ids(db: Session, model, cutoff: datetime, batch_size: int) -> List[int]:
+    return list(db.execute(
+        select(model.id)
+        .where(model.deleted_at < cutoff)
+        .order_by(model.id)
+        .limit(batch_size)
+    ).scalars())
+
+
+def _purge_status_events(db: Session, entity_type: str, ids) -> None:
+    db.execute(delete(StatusEvent).where(StatusEvent.entity_type == entity_type, StatusEvent.entity_id.in_(ids)))
+
+
+def _purge_status_reports(db: Session, ids: List[int]) -> None:
+    _purge_status_events(db, "status_report", ids)
+    db.execute(delete(StatusReport).where(StatusReport.id.in_(ids)))
+
+
+def _purge_tasks(db: Session, ids: List[int]) -> None:
+    db.execute(delete(Task).where(Task.id.in_(ids)))
+
+
+def _purge_community(db: Session, ids: List[int]) -> None:
+    db.execute(delete(TeamMember).where(TeamMember.community_id.in_(ids)))
+    db.execute(delete(Community).where(Community.id.in_(ids)))
+
+
+def _purge_todos(db: Session, ids: List[int]) -> None:
+    # Children go first so this works without ON DELETE CASCADE (e.g. SQLite).
+    _purge_status_events(db, "status_report", select(StatusReport.id).where(StatusReport.todo_id.in_(ids)).scalar_subquery())
+    _purge_status_events(db, "todo", ids)
+    db.execute(delete(StatusReport).where(StatusReport.todo_id.in_(ids)))
+    db.execute(delete(Task).where(Task.todo_id.in_(ids)))
+    db.execute(delete(Todo).where(Todo.id.in_(ids)))
+
+
+def _purge_projects(db: Session, ids: List[int]) -> None:
+    todo_ids = select(Todo.id).where(Todo.project_id.in_(ids)).scalar_subquery()
+    db.execute(delete(StatusReport).where(StatusReport.todo_id.in_(todo_ids)))
+    db.execute(delete(Task).where(Task.todo_id.in_(todo_ids)))
+    db.execute(delete(Todo).where(Todo.project_id.in_(ids)))
+    db.execute(delete(TeamMember).where(TeamMember.project_id.in_(ids)))
+    db.execute(delete(Community).where(Community.project_id.in_(ids)))
+    db.execute(delete(ProjectSummary).where(ProjectSummary.project_id.in_(ids)))
+    db.execute(delete(StatusEvent).where(StatusEvent.project_id.in_(ids)))
+    db.execute(delete(FoundryUsage).where(FoundryUsage.project_id.in_(ids)))
+    db.execute(delete(Project).where(Project.id.in_(ids)))
+
+
+_PURGE_STEPS = (
+    ("status_reports", StatusReport, _purge_status_reports),
+    ("tasks", Task, _purge_tasks),
+    ("community", Community, _purge_community),
+    ("todos", Todo, _purge_todos),
+    ("projects", Project, _purge_projects),
+)
+
+
+def purge_soft_deleted(
+    db: Session,
+    retention_days: int,
+    batch_size: int = 1000,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Hard-delete rows soft-deleted more than `retention_days` ago.
+
+    Works leaf tables first, `batch_size` tombstones per transaction, so
+    locks stay short and the log never has to hold the whole purge.
+    Returns the number of tombstones purged per table.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    purged = {}
+    for name, model, purge in _PURGE_STEPS:
+        purged[name] = 0
+        while True:
+            ids = _expired_ids(db, model, cutoff, batch_size)
+            if not ids:
+                break
+            purge(db, ids)
+            db.commit()
+            purged[name] += len(ids)
+    return purged
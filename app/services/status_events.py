@@ -0,0 +1,301 @@
+"""
+Status history (`status_events`) and the reports computed from it.
+
+ORM writes of Todo.status / StatusReport.status are recorded by the
+after_flush listener in app.models.models. Code that updates statuses with
+Core UPDATEs (PUT /api/v1/todos/{id}/status, the write-behind flush) calls
+record_todo_statuses() before its UPDATE, in the same transaction.
+
+Cycle time, throughput and burndown are single SQL statements built on
+window functions (LAG, ROW_NUMBER, running SUM), so their cost doesn't
+depend on pulling the history into Python.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, Float, and_, case, func, insert, literal, or_, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models.models import StatusEvent, Todo
+from app.services.project_summaries import CLOSED_TODO_STATUSES
+
+
+TODO = "todo"
+STATUS_REPORT = "status_report"
+
+# Seven bound parameters per todo (the status CASE twice, the time CASE and
+# the IN list); stays under SQL Server's 2100-parameter limit.
+RECORD_CHUNK_SIZE = 250
+
+# Default (start, end) statuses of a cycle, per entity type
+CYCLE_STATUSES = {
+    TODO: ("in_progress", "done"),
+    STATUS_REPORT: ("draft", "approved"),
+}
+
+
+# --------------------------------------------------------------------------
+# Dialect-specific date arithmetic
+# --------------------------------------------------------------------------
+
+class seconds_between(FunctionElement):
+    """
+    seconds_between(start, end): elapsed seconds as a float.
+    """
+    type = Float()
+    name = "seconds_between"
+    inherit_cache = True
+
+
+@compiles(seconds_between)
+def _seconds_between(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+
+
+@compiles(seconds_between, "sqlite")
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"((julianday({end}) - julianday({start})) * 86400.0)"
+
+
+@compiles(seconds_between, "mssql")
+def _seconds_between_mssql(element, compiler, **kw):
+    start, end = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"(CAST(DATEDIFF_BIG(millisecond, {start}, {end}) AS FLOAT) / 1000)"
+
+
+class day_start(FunctionElement):
+    """
+    day_start(timestamp): the date of a timestamp.
+    """
+    type = Date()
+    name = "day_start"
+    inherit_cache = True
+
+
+@compiles(day_start)
+def _day_start(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+
+@compiles(day_start, "sqlite")
+def _day_start_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+
+class week_start(FunctionElement):
+    """
+    week_start(timestamp): the Monday of a timestamp's week.
+    """
+    type = Date()
+    name = "week_start"
+    inherit_cache = True
+
+
+@compiles(week_start)
+def _week_start(element, compiler, **kw):
+    return f"CAST(date_trunc('week', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, '-6 days', 'weekday 1')"
+
+
+@compiles(week_start, "mssql")
+def _week_start_mssql(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    # Independent of SET DATEFIRST: Monday gives 0
+    return f"CAST(DATEADD(day, -((DATEPART(weekday, {value}) + @@DATEFIRST + 5) " + "%" + f" 7), {value}) AS DATE)"
+
+
+# --------------------------------------------------------------------------
+# Recording
+# --------------------------------------------------------------------------
+
+def record_todo_statuses(db: Session, changes: Dict[int, Tuple[str, datetime]]) -> None:
+    """
+    Append events for todos about to be set to a new status with a Core
+    UPDATE (`changes`: todo id -> (status, time)). Call it before the
+    UPDATE: todos that are deleted, unknown or already in that status get
+    no event.
+    """
+    ids = sorted(changes)
+    for start in range(0, len(ids), RECORD_CHUNK_SIZE):
+        chunk = ids[start:start + RECORD_CHUNK_SIZE]
+        new_status = case({todo_id: changes[todo_id][0] for todo_id in chunk}, value=Todo.id)
+        occurred_at = case({todo_id: changes[todo_id][1] for todo_id in chunk}, value=Todo.id)
+        db.execute(
+            insert(StatusEvent).from_select(
+                ["entity_type", "entity_id", "project_id", "status", "occurred_at"],
+                select(literal(TODO), Todo.id, Todo.project_id, new_status, occurred_at)
+                .where(Todo.id.in_(chunk), Todo.deleted_at.is_(None), Todo.status != new_status)
+            )
+        )
+
+
+# --------------------------------------------------------------------------
+# Reports
+# --------------------------------------------------------------------------
+
+def _entity_events(entity_type: str, project_id: Optional[int]):
+    criteria = [StatusEvent.entity_type == entity_type]
+    if project_id is not None:
+        criteria.append(StatusEvent.project_id == project_id)
+    return criteria
+
+
+def cycle_time(
+    db: Session,
+    entity_type: str,
+    start_status: str,
+    end_status: str,
+    project_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Time from an entity's first entry into `start_status` to its first
+    entry into `end_status` after that, for entities that finished between
+    `since` and `until`: count, mean, min, max, p50 and p90, in hours.
+    """
+    started = (
+        select(
+            StatusEvent.entity_id,
+            StatusEvent.status,
+            StatusEvent.occurred_at,
+            func.min(case((StatusEvent.status == start_status, StatusEvent.occurred_at)))
+            .over(partition_by=StatusEvent.entity_id)
+            .label("started_at"),
+        )
+        .where(*_entity_events(entity_type, project_id))
+        .subquery()
+    )
+    cycles = (
+        select(
+            started.c.entity_id,
+            func.min(started.c.started_at).label("started_at"),
+            func.min(started.c.occurred_at).label("finished_at"),
+        )
+        .where(started.c.status == end_status, started.c.occurred_at >= started.c.started_at)
+        .group_by(started.c.entity_id)
+        .subquery()
+    )
+    window = []
+    if since is not None:
+        window.append(cycles.c.finished_at >= since)
+    if until is not None:
+        window.append(cycles.c.finished_at < until)
+    durations = select(seconds_between(cycles.c.started_at, cycles.c.finished_at).label("seconds")).where(*window).subquery()
+    ranked = select(
+        durations.c.seconds,
+        func.row_number().over(order_by=durations.c.seconds).label("position"),
+        func.count().over().label("total"),
+    ).subquery()
+
+    def percentile(fraction: float):
+        return func.min(case((ranked.c.position >= ranked.c.total * fraction, ranked.c.seconds)))
+
+    row = db.execute(select(
+        func.count().label("count"),
+        func.avg(ranked.c.seconds).label("mean"),
+        func.min(ranked.c.seconds).label("min"),
+        func.max(ranked.c.seconds).label("max"),
+        percentile(0.5).label("p50"),
+        percentile(0.9).label("p90"),
+    )).one()
+    hours = {
+        name: (round(getattr(row, name) / 3600, 3) if getattr(row, name) is not None else None)
+        for name in ("mean", "min", "max", "p50", "p90")
+    }
+    return {"count": row.count, **{f"{name}_hours": value for name, value in hours.items()}}
+
+
+def throughput(
+    db: Session,
+    entity_type: str,
+    end_status: str,
+    since: datetime,
+    project_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Entities that entered `end_status` for the first time, per week
+    (Monday to Sunday) since `since`, with a running total.
+    """
+    firsts = (
+        select(
+            StatusEvent.occurred_at,
+            func.row_number()
+            .over(partition_by=StatusEvent.entity_id, order_by=(StatusEvent.occurred_at, StatusEvent.id))
+            .label("position"),
+        )
+        .where(*_entity_events(entity_type, project_id), StatusEvent.status == end_status)
+        .subquery()
+    )
+    week = week_start(firsts.c.occurred_at)
+    rows = db.execute(
+        select(
+            week.label("week_start"),
+            func.count().label("completed"),
+            func.sum(func.count()).over(order_by=week).label("cumulative"),
+        )
+        .where(firsts.c.position == 1, firsts.c.occurred_at >= since)
+        .group_by(week)
+        .order_by(week)
+    )
+    return [
+        {"week_start": row.week_start, "completed": row.completed, "cumulative": int(row.cumulative)}
+        for row in rows
+    ]
+
+
+def burndown(
+    db: Session,
+    project_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Open todos of a project at the end of each day on which one was
+    opened or closed (open: not done, closed or cancelled). Deleted todos
+    are left out of the whole history.
+    """
+    is_open = case((StatusEvent.status.in_(CLOSED_TODO_STATUSES), 0), else_=1)
+    events = (
+        select(
+            StatusEvent.occurred_at,
+            is_open.label("is_open"),
+            func.lag(is_open)
+            .over(partition_by=StatusEvent.entity_id, order_by=(StatusEvent.occurred_at, StatusEvent.id))
+            .label("was_open"),
+        )
+        .join(Todo, Todo.id == StatusEvent.entity_id)
+        .where(*_entity_events(TODO, project_id), Todo.deleted_at.is_(None))
+        .subquery()
+    )
+    opened = func.sum(case((and_(events.c.is_open == 1, or_(events.c.was_open.is_(None), events.c.was_open == 0)), 1), else_=0))
+    closed = func.sum(case((and_(events.c.is_open == 0, events.c.was_open == 1), 1), else_=0))
+    day = day_start(events.c.occurred_at)
+    daily = (
+        select(
+            day.label("day"),
+            opened.label("opened"),
+            closed.label("closed"),
+            func.sum(opened - closed).over(order_by=day).label("open"),
+        )
+        .group_by(day)
+        .subquery()
+    )
+    # The running total covers the whole history; the range only trims the output
+    query = select(daily).order_by(daily.c.day)
+    if since is not None:
+        query = query.where(daily.c.day >= since.date())
+    if until is not None:
+        query = query.where(daily.c.day <= until.date())
+    return [
+        {"day": row.day, "opened": int(row.opened), "closed": int(row.closed), "open": int(row.open)}
+        for row in db.execute(query)
+    ]
@@ -0,0 +1,302 @@
+"""
+Todo tasks stored as rows of the `tasks` table.
+
+Todos used to keep their tasks in `scope.tasks`. Tasks now live in their own
+table so they can be filtered and aggregated in SQL; the API still presents
+them as `scope.tasks` on todos, exactly as sent: keys a task didn't have
+(e.g. `status`) are stored as NULL and left out again, values that don't
+fit a column stay in `attributes`, and `key_order` remembers the order of
+the keys when it differs from attributes-then-columns. The original task
+shape's `owner` fills the `assignee` column. An empty list is kept in the
+scope itself, so `"tasks": []` round-trips too. Todos whose scope still
+embeds a task list (not yet backfilled) are served as stored and migrated
+on their next write.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Text, bindparam, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.models import Task, Todo
+from app.services.scope_patch import ScopeView
+
+
+# Task keys promoted to columns; anything else is kept in `attributes`.
+TASK_COLUMNS = {
+    "title": 500,
+    "description": None,
+    "status": 50,
+    "priority": 50,
+    "assignee": 255,
+}
+
+# Other task keys stored in a column when the task doesn't use the column's
+# own key for it: `owner` is what the original task shape calls the assignee.
+TASK_KEY_ALIASES = {
+    "owner": "assignee",
+}
+
+
+def _fits(column: str, value: Any) -> bool:
+    max_length = TASK_COLUMNS[column]
+    return isinstance(value, str) and (max_length is None or len(value) <= max_length)
+
+
+def task_values(item: Any, position: int) -> Dict[str, Any]:
+    """
+    Split one `scope.tasks` entry into column values for a Task row.
+    """
+    values = {"position": position, "attributes": None, "key_order": None}
+    for column in TASK_COLUMNS:
+        values.setdefault(column, None)
+    if not isinstance(item, dict):
+        values["attributes"] = item
+        return values
+
+    stored = {}  # column -> the task key stored in it
+    for key, value in item.items():
+        if key in TASK_COLUMNS and _fits(key, value):
+            stored[key] = key
+    for key, value in item.items():
+        column = TASK_KEY_ALIASES.get(key)
+        if column is not None and column not in stored and _fits(column, value):
+            stored[column] = key
+    for column, key in stored.items():
+        values[column] = item[key]
+
+    attributes = {key: value for key, value in item.items() if key not in stored.values()}
+    if attributes:
+        values["attributes"] = attributes
+    default_order = list(attributes) + [column for column in TASK_COLUMNS if column in stored]
+    if list(item) != default_order or any(column != key for column, key in stored.items()):
+        values["key_order"] = list(item)
+    return values
+
+
+def task_document(row) -> Any:
+    """
+    Rebuild the `scope.tasks` entry for a Task row (or a row of its columns).
+    Keys come back in `key_order`; keys it doesn't list (a task edited
+    through /api/v1/tasks, rows saved without one) follow, attributes first.
+    A key kept in `attributes` (its value didn't fit the column) wins over
+    the column.
+    """
+    attributes = row.attributes if row.attributes is not None else {}
+    if not isinstance(attributes, dict):
+        return attributes
+    document = {}
+    filled = set()
+    for key in row.key_order or ():
+        column = TASK_KEY_ALIASES.get(key, key)
+        if key in attributes:
+            document[key] = attributes[key]
+        elif column in TASK_COLUMNS and column not in filled and getattr(row, column) is not None:
+            document[key] = getattr(row, column)
+            filled.add(column)
+    for key, value in attributes.items():
+        document.setdefault(key, value)
+    for column in TASK_COLUMNS:
+        value = getattr(row, column)
+        if value is not None and column not in filled and column not in document:
+            document[column] = value
+    return document
+
+
+def split_tasks(scope: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[list]]:
+    """
+    Return the scope without its task list, and the task list (None if the
+    scope has none). An empty list stays in the scope, which records that
+    the todo has a (empty) task list.
+    """
+    if not isinstance(scope.get("tasks"), list):
+        return scope, None
+    if not scope["tasks"]:
+        return scope, []
+    scope = dict(scope)
+    return scope, scope.pop("tasks")
+
+
+def load_tasks(db: Session, todo_ids: Iterable[int]) -> Dict[int, List[Any]]:
+    """
+    Load the live tasks of several todos with one query, keyed by todo id.
+    """
+    todo_ids = list(todo_ids)
+    tasks: Dict[int, List[Any]] = {}
+    if not todo_ids:
+        return tasks
+    rows = db.execute(
+        select(Task.todo_id, Task.attributes, Task.key_order, *(getattr(Task, column) for column in TASK_COLUMNS))
+        .where(Task.todo_id.in_(todo_ids), Task.deleted_at.is_(None))
+        .order_by(Task.todo_id, Task.position, Task.id)
+    )
+    for row in rows:
+        tasks.setdefault(row.todo_id, []).append(task_document(row))
+    return tasks
+
+
+def todo_scope(todo: Todo, tasks: Dict[int, List[Any]]) -> Dict[str, Any]:
+    """
+    The scope of a todo as exposed by the API, with `tasks` re-attached.
+    """
+    scope = dict(todo.scope)
+    if "tasks" not in scope and todo.id in tasks:
+        scope["tasks"] = tasks[todo.id]
+    return scope
+
+
+def sync_tasks(db: Session, todo_id: int, items: List[Any], now: Optional[datetime] = None) -> None:
+    """
+    Make the live tasks of a todo match `items`.
+
+    Rows are matched to items by position, so task ids stay stable when a
+    list is saved back unchanged or edited in place. Only changed rows are
+    updated; surplus rows are removed.
+    """
+    now = now or datetime.utcnow()
+    columns = ["position", "attributes", "key_order", *TASK_COLUMNS]
+    existing = db.execute(
+        select(Task.id, *(getattr(Task, column) for column in columns))
+        .where(Task.todo_id == todo_id, Task.deleted_at.is_(None))
+        .order_by(Task.position, Task.id)
+    ).all()
+
+    changed, added = [], []
+    for position, item in enumerate(items):
+        values = task_values(item, position)
+        if position < len(existing):
+            row = existing[position]
+            if any(getattr(row, column) != values[column] for column in columns):
+                changed.append({"task_id": row.id, "updated_at": now, **values})
+        else:
+            added.append({"todo_id": todo_id, "created_at": now, "updated_at": now, **values})
+
+    if changed:
+        db.execute(
+            update(Task.__table__)
+            .where(Task.__table__.c.id == bindparam("task_id"))
+            .values({column: bindparam(column) for column in columns + ["updated_at"]}),
+            changed,
+        )
+    if added:
+        db.execute(insert(Task), added)
+    surplus = [row.id for row in existing[len(items):]]
+    if surplus:
+        db.execute(delete(Task).where(Task.id.in_(surplus)))
+
+
+def touch_todo(db: Session, todo_id: int, now: Optional[datetime] = None) -> None:
+    """
+    Bump a todo's updated_at after its tasks changed, so its ETag changes too.
+    """
+    db.execute(
+        update(Todo)
+        .where(Todo.id == todo_id)
+        .values(updated_at=now or datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+class TaskScopeView(ScopeView):
+    """
+    Presents a todo's task rows as `scope.tasks` to scope patches.
+    """
+    keys = ("tasks",)
+
+    def load(self, db: Session, entity_id: int, scope: Dict[str, Any]) -> Dict[str, Any]:
+        if "tasks" in scope:
+            return scope
+        tasks = load_tasks(db, [entity_id])
+        if entity_id in tasks:
+            scope["tasks"] = tasks[entity_id]
+        return scope
+
+    def store(self, db: Session, entity_id: int, document: Dict[str, Any]) -> Dict[str, Any]:
+        scope, tasks = split_tasks(document)
+        sync_tasks(db, entity_id, tasks or [])
+        return scope
+
+
+task_scope_view = TaskScopeView()
+
+
+def _has_task_list(db: Session):
+    """
+    SQL predicate for todos whose scope still embeds a `tasks` array.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return Todo.scope.op("?")("tasks")
+    if dialect == "mssql":
+        return func.JSON_QUERY(Todo.scope, "$.tasks").isnot(None)
+    if dialect == "sqlite":
+        return func.json_type(Todo.scope, "$.tasks") == "array"
+    return cast(Todo.scope, Text).like('%"tasks"%')
+
+
+def backfill_tasks(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Move task lists embedded in todo scopes into the tasks table.
+
+    Walks todos in id order, `batch_size` per transaction. Each scope is
+    rewritten with a compare-and-swap on `updated_at`, so a todo written
+    through the API meanwhile is left alone (API writes already store tasks
+    in the table). Safe to re-run: migrated scopes no longer match.
+    """
+    counts = {"todos": 0, "tasks": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Todo.id, Todo.scope, Todo.updated_at)
+            .where(Todo.id > last_id, _has_task_list(db))
+            .order_by(Todo.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        task_rows = []
+        for row in rows:
+            scope, tasks = split_tasks(row.scope)
+            if not tasks:
+                continue  # Empty lists stay in the scope
+            migrated = db.execute(
+                update(Todo)
+                .where(Todo.id == row.id, Todo.updated_at == row.updated_at)
+                .values(scope=scope, updated_at=row.updated_at)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not migrated:
+                counts["skipped"] += 1
+                continue
+            task_rows.extend(
+                {"todo_id": row.id, "created_at": row.updated_at, "updated_at": row.updated_at,
+                 **task_values(item, position)}
+                for position, item in enumerate(tasks)
+            )
+            counts["todos"] += 1
+
+        if task_rows:
+            db.execute(insert(Task), task_rows)
+            counts["tasks"] += len(task_rows)
+        db.commit()
+    return counts
+
+
+def task_counts(db: Session, project_id: Optional[int] = None, assignee: Optional[str] = None):
+    """
+    Live task counts per project and status.
+    """
+    query = (
+        select(Todo.project_id, Task.status, func.count(Task.id).label("count"))
+        .join(Todo, Todo.id == Task.todo_id)
+        .where(Task.deleted_at.is_(None), Todo.deleted_at.is_(None))
+        .group_by(Todo.project_id, Task.status)
+        .order_by(Todo.project_id, Task.status)
+    )
+    if project_id is not None:
+        query = query.where(Todo.project_id == project_id)
+    if assignee is not None:
+        query = query.where(Task.assignee == assignee)
+    return db.execute(query).all()
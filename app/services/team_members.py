@@ -0,0 +1,88 @@
+"""
+Membership index derived from `Community.team`.
+
+`team_members` holds one row per (community, email) so "which projects is
+this person on" is an index seek on email. The `team` JSON stays the source
+of truth; rows are rebuilt from it whenever a community entry is written.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.models import Community, TeamMember
+
+
+def normalize_email(email: Any) -> Optional[str]:
+    if not isinstance(email, str):
+        return None
+    email = email.strip().lower()
+    return email or None
+
+
+def member_rows(community_id: int, project_id: int, team: List[Dict[str, Any]], role: Optional[str]) -> List[dict]:
+    """
+    Rows for one community's team; entries without an email are skipped and
+    duplicate emails are collapsed to the first entry.
+    """
+    rows, seen = [], set()
+    for entry in team:
+        if not isinstance(entry, dict):
+            continue
+        email = normalize_email(entry.get("email"))
+        if email is None or email in seen or len(email) > 320:
+            continue
+        seen.add(email)
+        name = entry.get("name")
+        rows.append({
+            "community_id": community_id,
+            "project_id": project_id,
+            "email": email,
+            "name": name[:255] if isinstance(name, str) else None,
+            "role": role,
+        })
+    return rows
+
+
+def sync_team_members(db: Session, community: Community) -> None:
+    """
+    Rebuild the membership rows of one community entry inside the caller's
+    transaction. Deleted entries lose all their rows.
+    """
+    db.execute(delete(TeamMember).where(TeamMember.community_id == community.id))
+    if community.deleted_at is not None:
+        return
+    rows = member_rows(community.id, community.project_id, community.team, community.role)
+    if rows:
+        db.execute(insert(TeamMember), rows)
+
+
+def backfill_team_members(db: Session, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rebuild `team_members` from every live community entry, `batch_size`
+    entries per transaction so neither table is locked for long. Safe to
+    re-run.
+    """
+    counts = {"community": 0, "members": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Community.id, Community.project_id, Community.team, Community.role)
+            .where(Community.id > last_id, Community.deleted_at.is_(None))
+            .order_by(Community.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        members = []
+        for row in rows:
+            members.extend(member_rows(row.id, row.project_id, row.team, row.role))
+        db.execute(delete(TeamMember).where(TeamMember.community_id.in_([row.id for row in rows])))
+        if members:
+            db.execute(insert(TeamMember), members)
+        db.commit()
+        counts["community"] += len(rows)
+        counts["members"] += len(members)
+    return counts
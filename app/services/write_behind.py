@@ -0,0 +1,165 @@
+"""
+Write-behind buffer for todo status updates (PUT /api/v1/todos/{id}/status
+with TODO_STATUS_WRITE_BEHIND_ENABLED).
+
+Updates are kept in memory, last write wins per todo, and written every
+`interval` seconds as one UPDATE per chunk of todos. Each row gets the
+status and updated_at of its last write, and one status_events row if
+that changed its status (intermediate buffered statuses leave no trace).
+
+Durability: an accepted (202) update lives only in this process's memory
+until the next flush. It is lost if the process dies without a graceful
+shutdown (crash, OOM kill, SIGKILL); a graceful shutdown flushes first.
+Reads see the old status until the flush. With several worker processes
+each has its own buffer, so two updates of the same todo sent to different
+workers within one interval are applied in flush order, not request order.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import Todo
+from app.services.project_summaries import refresh_todo_project_summaries
+from app.services.status_events import record_todo_statuses
+
+
+logger = logging.getLogger(__name__)
+
+# Five bound parameters per todo (two CASEs and the IN list); stays under
+# SQL Server's 2100-parameter limit.
+FLUSH_CHUNK_SIZE = 400
+
+
+class TodoStatusBuffer:
+    """
+    Pending todo status updates, keyed by todo id.
+
+    put() is called from request threads, flush() from the background task
+    (or from put() when `max_pending` is reached, which makes writers wait
+    for the database instead of growing the buffer without bound).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], interval: float = 0.5, max_pending: int = 10000):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, Tuple[str, datetime]] = {}
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._writes = 0
+        self._superseded = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, todo_id: int, status: str) -> None:
+        with self._lock:
+            if todo_id in self._pending:
+                self._superseded += 1
+            self._pending[todo_id] = (status, datetime.utcnow())
+            self._writes += 1
+            pending = len(self._pending)
+            metrics.TODO_STATUS_WRITES.inc()
+            metrics.TODO_STATUS_COALESCING_RATIO.set(self._superseded / self._writes)
+            metrics.TODO_STATUS_PENDING.set(pending)
+        if pending >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write every pending update. Returns the number of rows updated.
+        On failure the updates go back into the buffer (unless newer ones
+        arrived meanwhile) for the next flush, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                updated = self._write(batch)
+            except Exception:
+                with self._lock:
+                    for todo_id, entry in batch.items():
+                        self._pending.setdefault(todo_id, entry)
+                    metrics.TODO_STATUS_PENDING.set(len(self._pending))
+                metrics.TODO_STATUS_FLUSH_ERRORS.inc()
+                raise
+            metrics.TODO_STATUS_FLUSH_DURATION.observe(time.perf_counter() - started)
+            metrics.TODO_STATUS_FLUSHED_ROWS.inc(amount=updated)
+            with self._lock:
+                metrics.TODO_STATUS_PENDING.set(len(self._pending))
+            return updated
+
+    def _write(self, batch: Dict[int, Tuple[str, datetime]]) -> int:
+        ids = sorted(batch)  # Same lock order in every flush
+        updated = 0
+        db = self.session_factory()
+        try:
+            for start in range(0, len(ids), FLUSH_CHUNK_SIZE):
+                chunk = ids[start:start + FLUSH_CHUNK_SIZE]
+                record_todo_statuses(db, {todo_id: batch[todo_id] for todo_id in chunk})
+                result = db.execute(
+                    update(Todo)
+                    .where(Todo.id.in_(chunk), Todo.deleted_at.is_(None))
+                    .values(
+                        status=case({todo_id: batch[todo_id][0] for todo_id in chunk}, value=Todo.id),
+                        updated_at=case({todo_id: batch[todo_id][1] for todo_id in chunk}, value=Todo.id),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+            refresh_todo_project_summaries(db, ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return updated
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Todo status flush failed; retrying in %ss", self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the periodic flush and write what is left (the shutdown hook).
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            flushed = await asyncio.to_thread(self.flush)
+        except Exception:
+            logger.exception("Final todo status flush failed; %s updates lost", len(self._pending))
+            return
+        if flushed:
+            logger.info("Flushed %s buffered todo status updates on shutdown", flushed)
+
+
+todo_status_buffer = TodoStatusBuffer(
+    SessionLocal,
+    interval=settings.TODO_STATUS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.TODO_STATUS_MAX_PENDING,
+)
@@ -0,0 +1,130 @@
+"""
+Response compression benchmark.
+
+Measures bytes on the wire and CPU time per request for a list-style JSON
+payload at different gzip levels and Brotli qualities, running the payload
+through CompressionMiddleware exactly as a real request would.
+
+Usage:
+    python -m benchmarks.compression_benchmark --items 5000 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware
+
+
+def build_payload(items: int) -> bytes:
+    """Build a repetitive JSON body shaped like GET /api/v1/todos."""
+    now = datetime.utcnow().isoformat()
+    todos = [
+        {
+            "id": i,
+            "project_id": i // 10,
+            "scope": {
+                "project_title": f"Project {i // 10}",
+                "project_description": "Development of a complete project management system",
+                "tasks": [
+                    {"id": t, "title": f"Task {t}", "status": "open", "priority": "medium"}
+                    for t in range(3)
+                ],
+            },
+            "status": "open",
+            "created_at": now,
+            "updated_at": now,
+            "deleted_at": None,
+        }
+        for i in range(items)
+    ]
+    return json.dumps(todos).encode("utf-8")
+
+
+def make_app(body: bytes):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def run_request(middleware, accept_encoding: str) -> int:
+    sent = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/todos",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    await middleware(scope, receive, send)
+    return sent
+
+
+def measure(body: bytes, encoding: str, level: int, requests: int) -> dict:
+    middleware = CompressionMiddleware(
+        make_app(body),
+        minimum_size=0,
+        gzip_level=level,
+        brotli_quality=level,
+    )
+    accept = {"identity": "identity", "gzip": "gzip", "br": "br, gzip"}[encoding]
+    loop = asyncio.new_event_loop()
+    try:
+        wire_bytes = loop.run_until_complete(run_request(middleware, accept))
+        start = time.process_time()
+        for _ in range(requests):
+            loop.run_until_complete(run_request(middleware, accept))
+        cpu = time.process_time() - start
+    finally:
+        loop.close()
+    return {
+        "encoding": encoding,
+        "level": level,
+        "wire_bytes": wire_bytes,
+        "ratio": round(len(body) / wire_bytes, 2),
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000, help="Number of todos in the payload")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per configuration")
+    args = parser.parse_args()
+
+    body = build_payload(args.items)
+    results = [measure(body, "identity", 0, args.requests)]
+    for level in (1, 3, 6, 9):
+        results.append(measure(body, "gzip", level, args.requests))
+    if compression.brotli is not None:
+        for quality in (1, 4, 6, 9, 11):
+            results.append(measure(body, "br", quality, max(1, args.requests // 5) if quality >= 9 else args.requests))
+
+    print(f"Payload: {len(body):,} bytes ({args.items} todos)")
+    print(f"{'encoding':<10}{'level':>6}{'wire bytes':>14}{'ratio':>8}{'cpu ms/req':>12}")
+    for r in results:
+        print(f"{r['encoding']:<10}{r['level']:>6}{r['wire_bytes']:>14,}{r['ratio']:>8}{r['cpu_ms_per_request']:>12}")
+    if compression.brotli is None:
+        print("\nBrotli not installed (pip install brotli) - only gzip was measured.")
+
+
+if __name__ == "__main__":
+    main()
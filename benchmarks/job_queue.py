@@ -0,0 +1,128 @@
+"""
+Background job benchmark for Foundry status report generation.
+
+Seeds a temporary SQLite database, starts the local Foundry stub (with
+optional latency and failure rate), enqueues one status report job per
+project through `POST /api/v1/jobs/status-reports` and runs a JobWorker
+until every job has finished. Reports enqueue latency (what the client
+waits for) next to job completion times, throughput, retries and the
+number of status reports created, as JSON.
+
+Usage:
+    python -m benchmarks.job_queue --jobs 100 --worker-concurrency 8 \\
+        --foundry-latency-ms 500 --foundry-failure-rate 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_db
+from app.main import app
+from app.models.models import Job, StatusReport
+from app.services.jobs import SUCCEEDED, FAILED, JobWorker
+from benchmarks.load_test import create_sqlite_engine, percentile, seed
+from benchmarks.stub_foundry import StubFoundryServer
+from integrations.foundry_config import FoundryConfig
+
+
+async def run(session_factory, args) -> Dict[str, Any]:
+    worker = JobWorker(
+        session_factory,
+        concurrency=args.worker_concurrency,
+        poll_interval=0.05,
+        retry_backoff=args.retry_backoff,
+    )
+    enqueue_latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        worker.start()
+        for project_id in range(1, args.jobs + 1):
+            request_started = time.perf_counter()
+            response = await client.post("/api/v1/jobs/status-reports", json={"project_id": project_id})
+            enqueue_latencies.append(time.perf_counter() - request_started)
+            response.raise_for_status()
+
+        while True:
+            with session_factory() as db:
+                finished = db.scalar(select(func.count()).select_from(Job).where(Job.status.in_([SUCCEEDED, FAILED])))
+            if finished >= args.jobs:
+                break
+            await asyncio.sleep(0.05)
+        wall = time.perf_counter() - started
+        await worker.stop()
+
+    with session_factory() as db:
+        jobs = db.scalars(select(Job)).all()
+        durations = sorted((job.finished_at - job.created_at).total_seconds() for job in jobs)
+        reports = db.scalar(select(func.count()).select_from(StatusReport).where(StatusReport.status == "draft"))
+        enqueue_latencies.sort()
+        return {
+            "jobs": len(jobs),
+            "succeeded": sum(job.status == SUCCEEDED for job in jobs),
+            "failed": sum(job.status == FAILED for job in jobs),
+            "retries": sum(job.attempts - 1 for job in jobs),
+            "status_reports_created": reports,
+            "wall_seconds": round(wall, 3),
+            "jobs_per_second": round(len(jobs) / wall, 2),
+            "enqueue_p50_ms": round(percentile(enqueue_latencies, 50) * 1000, 3),
+            "enqueue_p99_ms": round(percentile(enqueue_latencies, 99) * 1000, 3),
+            "completion_p50_ms": round(percentile(durations, 50) * 1000, 1),
+            "completion_p99_ms": round(percentile(durations, 99) * 1000, 1),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs to enqueue (one per project)")
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--worker-concurrency", type=int, default=4)
+    parser.add_argument("--retry-backoff", type=float, default=0.1, help="Seconds before the first retry")
+    parser.add_argument("--foundry-latency-ms", type=float, default=200.0)
+    parser.add_argument("--foundry-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine(os.path.join(tempfile.mkdtemp(prefix="flowpilot-jobs-"), "bench.db"))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counts = seed(engine, args.jobs, args.todos_per_project, 0, random.Random(args.seed))
+
+    def get_bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+
+    with StubFoundryServer(latency_ms=args.foundry_latency_ms, failure_rate=args.foundry_failure_rate) as stub:
+        FoundryConfig.BASE_URL = stub.base_url
+        results = asyncio.run(run(session_factory, args))
+
+    print(
+        f"{results['succeeded']}/{results['jobs']} jobs in {results['wall_seconds']:.1f}s "
+        f"({results['jobs_per_second']:.1f}/s), {results['retries']} retries, "
+        f"enqueue p50 {results['enqueue_p50_ms']:.1f} ms, completion p50 {results['completion_p50_ms']:.0f} ms",
+        file=sys.stderr,
+    )
+    output = json.dumps({"parameters": vars(args), "dataset": counts, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+In-process load test for every API endpoint.
+
+Runs the FastAPI app against a temporary SQLite database seeded with a
+configurable volume of projects x todos x status reports, drives each
+endpoint with concurrent async clients and reports throughput and
+p50/p95/p99 latency as JSON. Foundry calls go to a local stub server.
+
+Usage:
+    python -m benchmarks.load_test --projects 200 --todos-per-project 10 \\
+        --reports-per-todo 5 --concurrency 16 --requests 500 --output results.json
+
+    # Fail (exit code 1) if any endpoint regressed more than 20% vs a baseline
+    python -m benchmarks.load_test --baseline results.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.orm import Session, sessionmaker
+
+# Measure the endpoints, not the per-client limits (one client drives everything)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+from app.core.database import Base, create_database_engine, get_db, get_uow, instrument_engine, open_unit_of_work
+from app.main import app
+from app.models.models import Community, Project, StatusReport, Todo
+from app.services.project_summaries import rebuild_project_summaries
+from benchmarks.stub_foundry import StubFoundryServer
+from integrations.foundry_config import FoundryConfig
+
+
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+# --------------------------------------------------------------------------
+# Database setup
+# --------------------------------------------------------------------------
+
+def create_sqlite_engine(path: str):
+    engine = create_database_engine(f"sqlite:///{path}", pool_size=32, max_overflow=0)
+    instrument_engine(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, projects: int, todos_per_project: int, reports_per_todo: int, rng: random.Random) -> Dict[str, int]:
+    """
+    Bulk insert the benchmark dataset with explicit ids so children can
+    reference parents without round trips.
+    """
+    now = datetime.utcnow()
+    todo_id = 0
+    report_id = 0
+    with engine.begin() as connection:
+        project_rows, community_rows, todo_rows, report_rows = [], [], [], []
+        for project_id in range(1, projects + 1):
+            project_rows.append({
+                "id": project_id,
+                "scope": {
+                    "project_title": f"Project {project_id}",
+                    "project_description": "Benchmark project " * rng.randint(1, 8),
+                },
+                "status": "active",
+                "created_at": now,
+                "updated_at": now,
+            })
+            community_rows.append({
+                "id": project_id,
+                "project_id": project_id,
+                "team": [
+                    {"name": f"Member {m}", "email": f"member{m}@example.com"}
+                    for m in range(rng.randint(1, 6))
+                ],
+                "role": "Development Team",
+                "created_at": now,
+                "updated_at": now,
+            })
+            for _ in range(todos_per_project):
+                todo_id += 1
+                todo_rows.append({
+                    "id": todo_id,
+                    "project_id": project_id,
+                    "scope": {
+                        "project_title": f"Project {project_id}",
+                        "tasks": [
+                            {"id": t, "title": f"Task {t}", "status": rng.choice(["open", "in_progress", "done"])}
+                            for t in range(rng.randint(0, 6))
+                        ],
+                    },
+                    "status": rng.choice(["open", "in_progress", "done"]),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+                for _ in range(reports_per_todo):
+                    report_id += 1
+                    report_rows.append({
+                        "id": report_id,
+                        "todo_id": todo_id,
+                        "scope": {
+                            "title": f"Report {report_id}",
+                            "description": "Weekly progress " * rng.randint(1, 10),
+                            "owners": [{"name": "Owner", "email": "owner@example.com"}],
+                            "createdAt": now.isoformat(),
+                        },
+                        "status": rng.choice(["draft", "submitted", "approved"]),
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+        for model, rows in (
+            (Project, project_rows),
+            (Community, community_rows),
+            (Todo, todo_rows),
+            (StatusReport, report_rows),
+        ):
+            for start in range(0, len(rows), 5000):
+                connection.execute(model.__table__.insert(), rows[start:start + 5000])
+    with Session(engine) as db:
+        rebuild_project_summaries(db)
+    return {"projects": projects, "todos": todo_id, "status_reports": report_id}
+
+
+# --------------------------------------------------------------------------
+# Scenarios
+# --------------------------------------------------------------------------
+
+def build_scenarios(counts: Dict[str, int]) -> Dict[str, Callable[[random.Random], Request]]:
+    projects = max(counts["projects"], 1)
+    todos = max(counts["todos"], 1)
+    reports = max(counts["status_reports"], 1)
+
+    def pid(rng):
+        return rng.randint(1, projects)
+
+    def tid(rng):
+        return rng.randint(1, todos)
+
+    def rid(rng):
+        return rng.randint(1, reports)
+
+    return {
+        "GET /health": lambda rng: ("GET", "/health", None),
+        "GET /health/live": lambda rng: ("GET", "/health/live", None),
+        "GET /api/v1/projects": lambda rng: ("GET", f"/api/v1/projects?skip={rng.randint(0, projects)}", None),
+        "GET /api/v1/projects/summaries": lambda rng: (
+            "GET", f"/api/v1/projects/summaries?limit=50&sort={rng.choice(['id', '-open_todos'])}", None,
+        ),
+        "GET /api/v1/projects/{id}": lambda rng: ("GET", f"/api/v1/projects/{pid(rng)}", None),
+        "GET /api/v1/projects/{id}/todos": lambda rng: ("GET", f"/api/v1/projects/{pid(rng)}/todos", None),
+        "GET /api/v1/projects/{id}/community": lambda rng: ("GET", f"/api/v1/projects/{pid(rng)}/community", None),
+        "POST /api/v1/projects": lambda rng: ("POST", "/api/v1/projects", {
+            "scope": {"project_title": "Bench", "project_description": "Created by load test"},
+        }),
+        "POST /api/v1/projects/compose": lambda rng: ("POST", "/api/v1/projects/compose", {
+            "scope": {"project_title": "Bench graph"},
+            "community": [{"team": [{"name": "Member", "email": "member@example.com"}], "role": "Development Team"}],
+            "todos": [
+                {"scope": {"tasks": [{"id": t, "title": f"Task {t}", "status": "open"} for t in range(3)]}}
+                for _ in range(5)
+            ],
+        }),
+        "PUT /api/v1/projects/{id}": lambda rng: ("PUT", f"/api/v1/projects/{pid(rng)}", {"status": "active"}),
+        "GET /api/v1/todos": lambda rng: ("GET", f"/api/v1/todos?skip={rng.randint(0, todos)}", None),
+        "GET /api/v1/todos/{id}": lambda rng: ("GET", f"/api/v1/todos/{tid(rng)}", None),
+        "GET /api/v1/todos/{id}/status-reports": lambda rng: ("GET", f"/api/v1/todos/{tid(rng)}/status-reports", None),
+        "POST /api/v1/todos": lambda rng: ("POST", "/api/v1/todos", {
+            "project_id": pid(rng),
+            "scope": {"project_title": "Bench", "tasks": [{"id": 1, "title": "Task", "status": "open"}]},
+        }),
+        "PUT /api/v1/todos/{id}": lambda rng: ("PUT", f"/api/v1/todos/{tid(rng)}", {
+            "status": rng.choice(["open", "in_progress", "done"]),
+        }),
+        "GET /api/v1/status-reports": lambda rng: ("GET", f"/api/v1/status-reports?skip={rng.randint(0, reports)}", None),
+        "GET /api/v1/status-reports/{id}": lambda rng: ("GET", f"/api/v1/status-reports/{rid(rng)}", None),
+        "POST /api/v1/status-reports": lambda rng: ("POST", "/api/v1/status-reports", {
+            "todo_id": tid(rng),
+            "scope": {"title": "Bench report", "description": "Created by load test", "owners": []},
+        }),
+        "PUT /api/v1/status-reports/{id}": lambda rng: ("PUT", f"/api/v1/status-reports/{rid(rng)}", {
+            "status": rng.choice(["draft", "submitted", "approved"]),
+        }),
+        "GET /api/v1/community": lambda rng: ("GET", f"/api/v1/community?skip={rng.randint(0, projects)}", None),
+        "GET /api/v1/community/{id}": lambda rng: ("GET", f"/api/v1/community/{pid(rng)}", None),
+        "POST /api/v1/community": lambda rng: ("POST", "/api/v1/community", {
+            "project_id": pid(rng),
+            "team": [{"name": "Bench", "email": "bench@example.com"}],
+        }),
+        "POST /api/v1/foundry/chat": lambda rng: ("POST", "/api/v1/foundry/chat", {
+            "message": "Summarize the project status",
+            "project_id": pid(rng),
+        }),
+    }
+
+
+# --------------------------------------------------------------------------
+# Load generation
+# --------------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[random.Random], Request],
+    requests: int,
+    concurrency: int,
+    seed_value: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed_value)
+    planned = [make_request(rng) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    cursor = 0
+
+    async def worker():
+        nonlocal cursor, errors
+        while cursor < len(planned):
+            method, url, body = planned[cursor]
+            cursor += 1
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+    }
+
+
+async def run_all(scenarios, names, requests: int, concurrency: int, seed_value: int) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for name in names:
+            # Warm up code paths and caches before measuring
+            await run_scenario(client, scenarios[name], min(requests, 20), 1, seed_value)
+            results[name] = await run_scenario(client, scenarios[name], requests, concurrency, seed_value)
+            print(
+                f"{name:<42} {results[name]['throughput_rps']:>9.1f} rps  "
+                f"p50 {results[name]['p50_ms']:>8.2f}  p95 {results[name]['p95_ms']:>8.2f}  "
+                f"p99 {results[name]['p99_ms']:>8.2f} ms  errors {results[name]['errors']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+# --------------------------------------------------------------------------
+# Baseline comparison
+# --------------------------------------------------------------------------
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Return a list of regressions: p95 latency up or throughput down by more
+    than `tolerance` (a fraction) for any endpoint present in both runs.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {previous['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+            )
+        if previous["throughput_rps"] and result["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps"
+            )
+        if result["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--reports-per-todo", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint")
+    parser.add_argument("--foundry-latency-ms", type=float, default=20.0, help="Stub Foundry response delay")
+    parser.add_argument("--only", action="append", help="Run only endpoints containing this substring")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previously saved JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression fraction (default 0.2)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix="flowpilot-bench-")
+    engine = create_sqlite_engine(os.path.join(workdir, "bench.db"))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def get_bench_uow():
+        with open_unit_of_work(engine) as uow:
+            yield uow
+
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[get_uow] = get_bench_uow
+
+    seed_started = time.perf_counter()
+    counts = seed(engine, args.projects, args.todos_per_project, args.reports_per_todo, rng)
+    print(f"Seeded {counts} in {time.perf_counter() - seed_started:.1f}s", file=sys.stderr)
+
+    scenarios = build_scenarios(counts)
+    names = [n for n in scenarios if not args.only or any(o in n for o in args.only)]
+
+    with StubFoundryServer(latency_ms=args.foundry_latency_ms) as stub:
+        FoundryConfig.BASE_URL = stub.base_url
+        results = asyncio.run(run_all(scenarios, names, args.requests, args.concurrency, args.seed))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": counts,
+            "concurrency": args.concurrency,
+            "requests_per_endpoint": args.requests,
+            "foundry_latency_ms": args.foundry_latency_ms,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    engine.dispose()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions vs baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            sys.exit(1)
+        print("\nNo regressions vs baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Instrumentation overhead benchmark.
+
+Compares a trivial ASGI endpoint with and without MetricsMiddleware, and a
+SQLite `SELECT 1` with and without the engine query listeners, so the
+per-request and per-query cost of instrumentation can be read directly.
+
+Usage:
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.core.database import instrument_engine
+from app.core.request_context import RequestContext, set_request_context, reset_request_context
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+
+
+BODY = b'{"status":"healthy"}'
+
+
+async def endpoint(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", b"20")],
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def drive(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def bench_middleware(requests: int) -> dict:
+    baseline = asyncio.run(drive(endpoint, requests))
+    instrumented = asyncio.run(drive(RequestContextMiddleware(MetricsMiddleware(endpoint)), requests))
+    return {
+        "baseline_us": baseline / requests * 1e6,
+        "instrumented_us": instrumented / requests * 1e6,
+    }
+
+
+def bench_engine(queries: int) -> dict:
+    results = {}
+    for label, instrumented in (("baseline_us", False), ("instrumented_us", True)):
+        engine = create_engine("sqlite://")
+        if instrumented:
+            instrument_engine(engine)
+        token = set_request_context(RequestContext({"type": "http", "method": "GET", "path": "/bench"}))
+        try:
+            with engine.connect() as conn:
+                statement = text("SELECT 1")
+                conn.execute(statement)
+                start = time.perf_counter()
+                for _ in range(queries):
+                    conn.execute(statement).scalar()
+                results[label] = (time.perf_counter() - start) / queries * 1e6
+        finally:
+            reset_request_context(token)
+            engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    http = bench_middleware(args.requests)
+    db = bench_engine(args.queries)
+    print(f"{'':<22}{'baseline':>12}{'instrumented':>14}{'overhead':>12}")
+    for name, result in (("ASGI request (us)", http), ("SQLite SELECT 1 (us)", db)):
+        overhead = result["instrumented_us"] - result["baseline_us"]
+        print(f"{name:<22}{result['baseline_us']:>12.2f}{result['instrumented_us']:>14.2f}{overhead:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Rate limiter overhead benchmark.
+
+Compares a trivial ASGI endpoint with and without RateLimitMiddleware for
+the in-memory backend and the shared backend (against the in-process
+LocalStore, so only the limiter's own work is measured, not Redis round
+trips). Requests come from a rotating set of client IPs with limits high
+enough that nothing is rejected.
+
+Usage:
+    python -m benchmarks.rate_limit_overhead --requests 20000 --clients 1000
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.rate_limit import LocalStore, MemoryBackend, RateLimiter, Rule, SharedBackend
+from app.middleware.rate_limit import RateLimitMiddleware
+from benchmarks.metrics_overhead import endpoint
+
+
+RULES = [("/api/v1/", Rule("crud", 1e9, 1_000_000_000))]
+
+
+async def drive(app, requests: int, clients: int) -> float:
+    scopes = [
+        {"type": "http", "method": "GET", "path": "/api/v1/todos", "headers": [], "client": (f"10.0.{i // 256}.{i % 256}", 5000)}
+        for i in range(clients)
+    ]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % clients]), receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+
+    apps = {
+        "no limiter": endpoint,
+        "memory backend": RateLimitMiddleware(endpoint, RateLimiter(MemoryBackend(), RULES)),
+        "shared backend": RateLimitMiddleware(endpoint, RateLimiter(SharedBackend(LocalStore()), RULES)),
+    }
+    baseline = None
+    print(f"{'':<18}{'us/request':>12}{'overhead':>12}")
+    for name, app in apps.items():
+        per_request = asyncio.run(drive(app, args.requests, args.clients)) / args.requests * 1e6
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<18}{per_request:>12.2f}{per_request - baseline:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
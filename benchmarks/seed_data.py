@@ -0,0 +1,368 @@
+"""
+Synthetic data generator and bulk seeder for large-scale testing.
+
+Generates realistic project/todo/task/status report/community rows with skewed
+(Pareto) fan-out and writes them with batched Core inserts, bypassing the
+HTTP API. Work is split into chunks of projects handled by a pool of worker
+processes; every chunk is generated and flushed in bounded batches, so
+memory stays flat regardless of the total volume.
+
+Row counts per project are derived from a per-project RNG, so the parent
+process can pre-compute id ranges for every chunk and workers insert
+explicit ids without coordinating. Once every chunk is in, the
+project_summaries read model is rebuilt from the seeded rows.
+
+Usage:
+    # ~100k projects, ~1M todos, ~10M status reports into a local SQLite file
+    python -m benchmarks.seed_data --database-url sqlite:///seed.db --create-schema \\
+        --projects 100000 --todos-per-project 10 --reports-per-todo 10 --workers 8
+
+    # SQL Server schema from scripts/create_tables.sql (uses settings.database_url)
+    python -m benchmarks.seed_data --projects 10000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, create_database_engine
+from app.models.models import Community, Project, StatusReport, Task, TeamMember, Todo
+from app.services.project_summaries import rebuild_project_summaries
+from app.services.tasks import task_values
+from app.services.team_members import member_rows
+
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Elena", "Felipe", "Grace", "Hiro", "Ines", "John",
+               "Kara", "Luis", "Maya", "Nina", "Omar", "Paula", "Quinn", "Rafael", "Sara", "Tom"]
+LAST_NAMES = ["Silva", "Smith", "Fabbri", "Tanaka", "Garcia", "Muller", "Rossi", "Kim", "Novak", "Costa"]
+TITLE_WORDS = ["Platform", "Migration", "Dashboard", "Onboarding", "Billing", "Analytics", "Mobile",
+               "Search", "Integration", "Reporting", "Automation", "Security", "Checkout", "Portal"]
+VERBS = ["Implement", "Design", "Review", "Refactor", "Test", "Document", "Deploy", "Investigate", "Optimize"]
+FILLER = ("the team aligned on scope and delivery milestones while tracking risks dependencies "
+          "and stakeholder feedback across the current sprint with focus on quality").split()
+
+PROJECT_STATUSES = (["active"] * 8) + ["archived"] * 2
+TODO_STATUSES = ["open"] * 5 + ["in_progress"] * 3 + ["done"] * 2
+TASK_STATUSES = ["open"] * 4 + ["in_progress"] * 3 + ["done"] * 3
+REPORT_STATUSES = ["draft"] * 5 + ["submitted"] * 3 + ["approved"] * 2
+PRIORITIES = ["low", "medium", "medium", "high"]
+
+CHUNK_PROJECTS = 500
+HORIZON_DAYS = 730
+
+
+# --------------------------------------------------------------------------
+# Generation
+# --------------------------------------------------------------------------
+
+def skewed_count(rng: random.Random, mean: float, alpha: float, cap: int) -> int:
+    """
+    Pareto-distributed count with the requested mean: most parents get a
+    few children, a long tail gets many.
+    """
+    if mean <= 0:
+        return 0
+    scale = mean * (alpha - 1) / alpha
+    return min(int(scale * rng.paretovariate(alpha)), cap)
+
+
+def project_rng(seed: int, project_id: int) -> random.Random:
+    return random.Random(seed * 1_000_003 + project_id)
+
+
+def plan_project(rng: random.Random, args) -> Tuple[int, List[int]]:
+    """
+    Draw the fan-out for one project. Must be the first use of the project's
+    RNG so the parent process and workers agree on counts.
+    """
+    todos = skewed_count(rng, args.todos_per_project, args.skew, int(args.todos_per_project * 50) + 1)
+    reports = [
+        skewed_count(rng, args.reports_per_todo, args.skew, int(args.reports_per_todo * 50) + 1)
+        for _ in range(todos)
+    ]
+    return todos, reports
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(FILLER) for _ in range(words)).capitalize() + "."
+
+
+def _person(rng: random.Random) -> Dict[str, str]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {"name": f"{first} {last}", "email": f"{first}.{last}{rng.randint(1, 999)}@example.com".lower()}
+
+
+def _timestamp(rng: random.Random, now: datetime, after: Optional[datetime] = None) -> datetime:
+    if after is None:
+        return now - timedelta(seconds=rng.randint(0, HORIZON_DAYS * 86400))
+    span = max(int((now - after).total_seconds()), 1)
+    return after + timedelta(seconds=rng.randint(0, span))
+
+
+def generate_chunk(args, first_project: int, last_project: int, todo_id: int, report_id: int,
+                   now: datetime) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (table, row) pairs for a range of projects, parents before children.
+    """
+    for project_id in range(first_project, last_project):
+        rng = project_rng(args.seed, project_id)
+        todo_count, report_counts = plan_project(rng, args)
+
+        title = f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {project_id}"
+        created = _timestamp(rng, now)
+        yield "projects", {
+            "id": project_id,
+            "scope": {
+                "project_title": title,
+                "project_description": _sentence(rng, rng.randint(8, 60)),
+            },
+            "status": rng.choice(PROJECT_STATUSES),
+            "created_at": created,
+            "updated_at": _timestamp(rng, now, created),
+        }
+
+        team = [_person(rng) for _ in range(max(1, skewed_count(rng, 5, args.skew, 100)))]
+        role = rng.choice(["Development Team", "Stakeholders", "Operations"])
+        yield "community", {
+            "id": project_id,
+            "project_id": project_id,
+            "team": team,
+            "role": role,
+            "created_at": created,
+            "updated_at": created,
+        }
+        for member in member_rows(project_id, project_id, team, role):
+            yield "team_members", member
+
+        for reports in report_counts:
+            todo_id += 1
+            todo_created = _timestamp(rng, now, created)
+            tasks = [
+                {
+                    "id": t + 1,
+                    "title": f"{rng.choice(VERBS)} {rng.choice(TITLE_WORDS).lower()}",
+                    "description": _sentence(rng, rng.randint(4, 20)),
+                    "status": rng.choice(TASK_STATUSES),
+                    "priority": rng.choice(PRIORITIES),
+                    "assignee": rng.choice(team)["email"],
+                }
+                for t in range(skewed_count(rng, 4, args.skew, 60))
+            ]
+            todo_updated = _timestamp(rng, now, todo_created)
+            yield "todos", {
+                "id": todo_id,
+                "project_id": project_id,
+                "scope": {
+                    "project_title": title,
+                    "project_description": _sentence(rng, rng.randint(4, 20)),
+                },
+                "status": rng.choice(TODO_STATUSES),
+                "created_at": todo_created,
+                "updated_at": todo_updated,
+            }
+            for position, item in enumerate(tasks):
+                yield "tasks", {
+                    "todo_id": todo_id,
+                    "created_at": todo_created,
+                    "updated_at": todo_updated,
+                    **task_values(item, position),
+                }
+
+            for _ in range(reports):
+                report_id += 1
+                report_created = _timestamp(rng, now, todo_created)
+                yield "status_reports", {
+                    "id": report_id,
+                    "todo_id": todo_id,
+                    "scope": {
+                        "title": f"Status report {report_id}",
+                        "description": _sentence(rng, rng.randint(10, 80)),
+                        "owners": rng.sample(team, min(len(team), rng.randint(1, 3))),
+                        "createdAt": report_created.isoformat(),
+                        "highlights": [_sentence(rng, 6) for _ in range(rng.randint(0, 4))],
+                        "blockers": [_sentence(rng, 6) for _ in range(rng.randint(0, 2))],
+                    },
+                    "status": rng.choice(REPORT_STATUSES),
+                    "created_at": report_created,
+                    "updated_at": report_created,
+                }
+
+
+# --------------------------------------------------------------------------
+# Writing
+# --------------------------------------------------------------------------
+
+TABLES = {
+    "projects": Project.__table__,
+    "community": Community.__table__,
+    "team_members": TeamMember.__table__,
+    "todos": Todo.__table__,
+    "tasks": Task.__table__,
+    "status_reports": StatusReport.__table__,
+}
+FLUSH_ORDER = ("projects", "community", "team_members", "todos", "tasks", "status_reports")
+
+
+def create_seed_engine(database_url: str) -> Engine:
+    engine = create_database_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        # Bulk load: skip fsyncs entirely (rerun the seed if the machine
+        # crashes) and let worker processes queue for the write lock.
+        @event.listens_for(engine, "connect")
+        def _pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA busy_timeout=120000")
+            cursor.close()
+
+    return engine
+
+
+def _insert(connection, table_name: str, rows: List[dict]) -> None:
+    table = TABLES[table_name]
+    # Task and team member ids are not pre-computed; let the database assign them.
+    identity_insert = connection.dialect.name == "mssql" and "id" in rows[0]
+    if identity_insert:
+        connection.execute(text(f"SET IDENTITY_INSERT {table_name} ON"))
+    connection.execute(table.insert(), rows)
+    if identity_insert:
+        connection.execute(text(f"SET IDENTITY_INSERT {table_name} OFF"))
+
+
+def write_chunk(task) -> Dict[str, int]:
+    """
+    Worker entry point: generate one chunk and insert it in batches.
+    """
+    args, first_project, last_project, todo_id, report_id, now = task
+    engine = _worker_engine(args.database_url)
+    counts = {name: 0 for name in FLUSH_ORDER}
+    buffers: Dict[str, List[dict]] = {name: [] for name in FLUSH_ORDER}
+
+    def flush(connection):
+        # Flush every table in FK order so children never precede parents.
+        for name in FLUSH_ORDER:
+            if buffers[name]:
+                _insert(connection, name, buffers[name])
+                counts[name] += len(buffers[name])
+                buffers[name] = []
+
+    with engine.connect() as connection:
+        pending = 0
+        for table_name, row in generate_chunk(args, first_project, last_project, todo_id, report_id, now):
+            buffers[table_name].append(row)
+            pending += 1
+            if pending >= args.batch_size:
+                flush(connection)
+                connection.commit()
+                pending = 0
+        flush(connection)
+        connection.commit()
+    return counts
+
+
+_engines: Dict[str, Engine] = {}
+
+
+def _worker_engine(database_url: str) -> Engine:
+    # One engine per worker process, reused across chunks.
+    engine = _engines.get(database_url)
+    if engine is None:
+        engine = _engines[database_url] = create_seed_engine(database_url)
+    return engine
+
+
+def reset_sequences(engine: Engine) -> None:
+    """
+    PostgreSQL sequences do not advance on explicit-id inserts; move them
+    past the seeded ids so later inserts through the API don't collide.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for table_name in ("projects", "community", "todos", "status_reports"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table_name}), 0) + 1, false)"
+            ))
+
+
+def plan_chunks(args, start_project: int, start_todo: int, start_report: int) -> Iterator[tuple]:
+    """
+    Walk the per-project plans once (counts only) to assign each chunk its
+    starting todo and report ids.
+    """
+    now = datetime.utcnow()
+    todo_id, report_id = start_todo, start_report
+    last = start_project + args.projects
+    for first in range(start_project, last, CHUNK_PROJECTS):
+        end = min(first + CHUNK_PROJECTS, last)
+        yield (args, first, end, todo_id, report_id, now)
+        for project_id in range(first, end):
+            todos, reports = plan_project(project_rng(args.seed, project_id), args)
+            todo_id += todos
+            report_id += sum(reports)
+
+
+def main():
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Defaults to the configured database")
+    parser.add_argument("--create-schema", action="store_true", help="Create missing tables from the models")
+    parser.add_argument("--projects", type=int, default=1000)
+    parser.add_argument("--todos-per-project", type=float, default=10, help="Mean todos per project")
+    parser.add_argument("--reports-per-todo", type=float, default=10, help="Mean status reports per todo")
+    parser.add_argument("--skew", type=float, default=1.6, help="Pareto alpha (> 1); lower is more skewed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT batch")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.skew <= 1:
+        parser.error("--skew must be greater than 1")
+    args.database_url = args.database_url or settings.database_url
+
+    engine = create_seed_engine(args.database_url)
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        start_project = (connection.execute(select(func.max(Project.id))).scalar() or 0) + 1
+        start_todo = connection.execute(select(func.max(Todo.id))).scalar() or 0
+        start_report = connection.execute(select(func.max(StatusReport.id))).scalar() or 0
+    engine.dispose()
+
+    totals = {name: 0 for name in FLUSH_ORDER}
+    started = time.perf_counter()
+    chunks = plan_chunks(args, start_project, start_todo, start_report)
+    with multiprocessing.Pool(args.workers) as pool:
+        for counts in pool.imap_unordered(write_chunk, chunks):
+            for name, count in counts.items():
+                totals[name] += count
+            rows = sum(totals.values())
+            elapsed = time.perf_counter() - started
+            print(
+                f"\r{totals['projects']:>9} projects {totals['todos']:>10} todos "
+                f"{totals['status_reports']:>11} reports  {rows / elapsed:>10,.0f} rows/s",
+                end="",
+                file=sys.stderr,
+            )
+    print(file=sys.stderr)
+    engine = create_seed_engine(args.database_url)
+    reset_sequences(engine)
+    with Session(engine) as db:
+        rebuild_project_summaries(db)
+    engine.dispose()
+    print(json.dumps({"rows": totals, "seconds": round(time.perf_counter() - started, 1)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Snapshot benchmark: export/restore vs paging the REST API.
+
+Seeds a temporary SQLite database, then copies its projects, todos,
+status reports and community entries out three ways:
+
+- rest: GET every page of the four list endpoints (?skip=&limit=), the way
+  an environment is cloned without snapshots
+- export: app.services.snapshots.export_snapshot in each available format
+- restore: restore_snapshot of that export into an empty database
+
+Reports rows, seconds, rows/s and bytes (JSON transferred, or snapshot
+size on disk) per method as JSON.
+
+Usage:
+    python -m benchmarks.snapshot --projects 2000 --todos-per-project 10 --reports-per-todo 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+# One client pages everything; measure the copy, not the rate limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+from app.core.database import get_db
+from app.main import app
+from app.services.snapshots import available_formats, export_snapshot, restore_snapshot
+from benchmarks.load_test import create_sqlite_engine, seed
+
+
+LIST_ENDPOINTS = ("/api/v1/projects", "/api/v1/todos", "/api/v1/status-reports", "/api/v1/community")
+
+
+async def page_rest_api(page_size: int) -> Dict[str, Any]:
+    rows = 0
+    transferred = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        for endpoint in LIST_ENDPOINTS:
+            skip = 0
+            while True:
+                response = await client.get(endpoint, params={"skip": skip, "limit": page_size})
+                response.raise_for_status()
+                page = response.json()
+                transferred += len(response.content)
+                rows += len(page)
+                if len(page) < page_size:
+                    break
+                skip += page_size
+        seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds), "bytes": transferred}
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--reports-per-todo", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=100, help="REST page size (limit)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="flowpilot-snapshot-")
+    engine = create_sqlite_engine(os.path.join(workdir, "source.db"))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counts = seed(engine, args.projects, args.todos_per_project, args.reports_per_todo, random.Random(args.seed))
+
+    def get_bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+
+    results: Dict[str, Any] = {"rest": asyncio.run(page_rest_api(args.page_size))}
+    print(f"rest          {results['rest']['rows_per_second']:>10,} rows/s  {results['rest']['bytes']:>12,} bytes", file=sys.stderr)
+
+    for snapshot_format in available_formats():
+        path = os.path.join(workdir, f"snapshot-{snapshot_format}")
+        started = time.perf_counter()
+        manifest = export_snapshot(engine, path, snapshot_format, workers=args.workers)
+        exported = time.perf_counter() - started
+        rows = sum(table["rows"] for table in manifest["tables"].values())
+
+        target = create_sqlite_engine(os.path.join(workdir, f"restore-{snapshot_format}.db"))
+        started = time.perf_counter()
+        restore_snapshot(target, path, workers=args.workers)
+        restored = time.perf_counter() - started
+        target.dispose()
+
+        results[snapshot_format] = {
+            "rows": rows,
+            "bytes": directory_size(path),
+            "export_seconds": round(exported, 3),
+            "export_rows_per_second": round(rows / exported),
+            "restore_seconds": round(restored, 3),
+            "restore_rows_per_second": round(rows / restored),
+        }
+        print(
+            f"{snapshot_format:<13} {results[snapshot_format]['export_rows_per_second']:>10,} rows/s export  "
+            f"{results[snapshot_format]['restore_rows_per_second']:>10,} rows/s restore  "
+            f"{results[snapshot_format]['bytes']:>12,} bytes",
+            file=sys.stderr,
+        )
+
+    output = json.dumps({"parameters": vars(args), "dataset": counts, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Startup benchmark: import time, lifespan time and first-request latency.
+
+Each mode runs in a fresh interpreter against the same seeded SQLite
+database, so nothing is cached between them:
+
+- cold: STARTUP_WARMUP_ENABLED=False
+- warm: the lifespan opens pooled connections and fills the statement cache
+
+For every read endpoint the first request is compared with the median of
+the following ones.
+
+Usage:
+    python -m benchmarks.startup --projects 200 --repeat 20 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+
+ENDPOINTS = (
+    "/api/v1/projects",
+    "/api/v1/projects/1",
+    "/api/v1/projects/1/todos",
+    "/api/v1/projects/1/community",
+    "/api/v1/todos/1",
+    "/api/v1/todos/1/tasks",
+    "/api/v1/todos/1/status-reports",
+    "/api/v1/status-reports/1",
+    "/api/v1/community/1",
+    "/api/v1/tasks?todo_id=1",
+)
+
+
+async def _measure(repeat: int) -> Dict[str, Any]:
+    import httpx
+
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        lifespan_ms = (time.perf_counter() - started) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            endpoints = {}
+            for path in ENDPOINTS:
+                timings = []
+                for _ in range(repeat + 1):
+                    request_started = time.perf_counter()
+                    response = await client.get(path)
+                    timings.append((time.perf_counter() - request_started) * 1000)
+                    response.raise_for_status()
+                endpoints[path] = {
+                    "first_ms": round(timings[0], 3),
+                    "steady_ms": round(statistics.median(timings[1:]), 3),
+                }
+    return {
+        "import_ms": round(import_ms, 1),
+        "lifespan_ms": round(lifespan_ms, 1),
+        "first_request_total_ms": round(sum(e["first_ms"] for e in endpoints.values()), 2),
+        "endpoints": endpoints,
+    }
+
+
+def run_child(database_url: str, warm: bool, repeat: int) -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "STARTUP_WARMUP_ENABLED": str(warm),
+        "HEALTH_FOUNDRY_REQUIRED": "False",
+        "RATE_LIMIT_ENABLED": "False",
+        "FOUNDRY_BASE_URL": "http://127.0.0.1:9",
+    }
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", "--repeat", str(repeat)],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--reports-per-todo", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20, help="Requests after the first, per endpoint")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_measure(args.repeat))))
+        return
+
+    from benchmarks.load_test import create_sqlite_engine, seed
+
+    path = os.path.join(tempfile.mkdtemp(prefix="flowpilot-startup-"), "bench.db")
+    engine = create_sqlite_engine(path)
+    counts = seed(engine, args.projects, args.todos_per_project, args.reports_per_todo, random.Random(args.seed))
+    engine.dispose()
+
+    report = {"dataset": counts}
+    for mode, warm in (("cold", False), ("warm", True)):
+        report[mode] = run_child(f"sqlite:///{path}", warm, args.repeat)
+        print(
+            f"{mode}: import {report[mode]['import_ms']:.0f} ms, lifespan {report[mode]['lifespan_ms']:.0f} ms, "
+            f"first requests {report[mode]['first_request_total_ms']:.1f} ms total",
+            file=sys.stderr,
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Local stub of the Foundry Agent API.
+
+Answers `POST /api/agents/{agent_id}/chat` with a canned response after a
+configurable delay, so benchmarks and background jobs can run without a
+real Foundry instance.
+
+Usage:
+    python -m benchmarks.stub_foundry --port 8765 --latency-ms 50
+    FOUNDRY_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_stub_app(latency_ms: float = 0.0, failure_rate: float = 0.0) -> FastAPI:
+    stub = FastAPI(title="Foundry stub")
+    state = {"calls": 0}
+
+    @stub.get("/")
+    def root():
+        return {"status": "ok"}
+
+    @stub.post("/api/agents/{agent_id}/chat")
+    async def chat(agent_id: str, request: Request):
+        payload: Dict[str, Any] = await request.json()
+        state["calls"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if failure_rate and (state["calls"] % max(int(1 / failure_rate), 1)) == 0:
+            return JSONResponse({"error": "stub failure"}, status_code=503)
+        message = payload.get("message", "")
+        context = payload.get("context") or {}
+        return {
+            "agent_id": agent_id,
+            "message": f"Stub reply to: {message[:200]}",
+            "reports": [
+                {
+                    "title": f"Automated report for todo {todo.get('id')}",
+                    "description": f"Status summary for {todo.get('status', 'open')} todo.",
+                    "owners": [],
+                }
+                for todo in context.get("todos", [])
+            ],
+            "usage": {
+                "prompt_tokens": len(message.split()),
+                "completion_tokens": 32,
+                "total_tokens": len(message.split()) + 32,
+            },
+        }
+
+    return stub
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubFoundryServer:
+    """
+    Run the stub with uvicorn in a background thread.
+    """
+
+    def __init__(self, port: Optional[int] = None, latency_ms: float = 0.0, failure_rate: float = 0.0):
+        self.port = port or _free_port()
+        config = uvicorn.Config(
+            create_stub_app(latency_ms, failure_rate),
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "StubFoundryServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Foundry stub did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial delay per chat call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls answered with 503")
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.latency_ms, args.failure_rate), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Multi-worker scaling benchmark for the production launcher.
+
+Seeds a temporary SQLite database, then for each worker count starts
+`python -m app.server --workers N` on a local port and drives the read
+endpoints over real HTTP from several client processes for a fixed
+duration. Reports throughput, p50/p99 latency and scaling efficiency
+relative to the first worker count as JSON.
+
+Usage:
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 --duration 15 \\
+        --client-processes 4 --concurrency 32
+
+Client processes compete with the server for CPU; on small machines keep
+--client-processes low and read the relative numbers rather than the
+absolute ones.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.load_test import build_scenarios, create_sqlite_engine, percentile, seed
+
+
+READ_SCENARIOS = (
+    "GET /api/v1/projects/{id}",
+    "GET /api/v1/projects/{id}/todos",
+    "GET /api/v1/todos/{id}",
+    "GET /api/v1/todos/{id}/status-reports",
+    "GET /api/v1/community/{id}",
+)
+
+
+async def _drive(base_url: str, counts: Dict[str, int], duration: float, concurrency: int, seed_value: int):
+    scenarios = build_scenarios(counts)
+    makers = [scenarios[name] for name in READ_SCENARIOS]
+    rng = random.Random(seed_value)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, url, body = rng.choice(makers)(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(args) -> Dict[str, Any]:
+    latencies, errors = asyncio.run(_drive(*args))
+    return {"latencies": latencies, "errors": errors}
+
+
+def wait_until_live(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health/live", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become live in time")
+
+
+def run_workers(workers: int, port: int, database_url: str, counts: Dict[str, int], args) -> Dict[str, Any]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "HEALTH_FOUNDRY_REQUIRED": "False",
+        "RATE_LIMIT_ENABLED": "False",
+    }
+    command = [
+        sys.executable, "-m", "app.server",
+        "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port), "--no-access-log",
+    ]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_live(base_url, process)
+        # Warm-up so every worker has opened connections and compiled queries
+        _client_process((base_url, counts, min(args.duration, 2.0), args.concurrency, args.seed))
+
+        jobs = [
+            (base_url, counts, args.duration, max(args.concurrency // args.client_processes, 1), args.seed + index)
+            for index in range(args.client_processes)
+        ]
+        started = time.perf_counter()
+        with multiprocessing.Pool(args.client_processes) as pool:
+            results = pool.map(_client_process, jobs)
+        wall = time.perf_counter() - started
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--todos-per-project", type=int, default=10)
+    parser.add_argument("--reports-per-todo", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests across all clients")
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="flowpilot-scaling-")
+    path = os.path.join(workdir, "bench.db")
+    engine = create_sqlite_engine(path)
+    counts = seed(engine, args.projects, args.todos_per_project, args.reports_per_todo, random.Random(args.seed))
+    engine.dispose()
+
+    runs = []
+    for workers in args.workers:
+        result = run_workers(workers, args.port, f"sqlite:///{path}", counts, args)
+        result["efficiency"] = round(
+            result["throughput_rps"] / (runs[0]["throughput_rps"] / runs[0]["workers"] * workers), 3
+        ) if runs and runs[0]["throughput_rps"] else 1.0
+        runs.append(result)
+        print(
+            f"{workers:>3} worker(s) {result['throughput_rps']:>9.1f} rps  p50 {result['p50_ms']:>8.2f}  "
+            f"p99 {result['p99_ms']:>8.2f} ms  efficiency {result['efficiency']:.2f}  errors {result['errors']}",
+            file=sys.stderr,
+        )
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": vars(args),
+        "dataset": counts,
+        "results": runs,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
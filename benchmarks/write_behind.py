@@ -0,0 +1,146 @@
+"""
+Todo status update benchmark: full PUT vs status PUT vs write-behind.
+
+Seeds a temporary SQLite database and sends the same stream of status
+updates (a hot set of todos updated over and over, like an automation
+flipping statuses) in three modes:
+
+- put: PUT /api/v1/todos/{id} (SELECT, UPDATE, commit, refresh, tasks)
+- status: PUT /api/v1/todos/{id}/status (one UPDATE)
+- write-behind: the same endpoint with TODO_STATUS_WRITE_BEHIND_ENABLED,
+  flushed every --flush-interval seconds
+
+Reports throughput, latency, SQL statements executed and, for
+write-behind, rows written and the coalescing ratio, as JSON.
+
+Usage:
+    python -m benchmarks.write_behind --updates 5000 --hot-todos 50 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+# One client sends everything; measure the updates, not the rate limiter
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.services.write_behind import todo_status_buffer
+from benchmarks.load_test import create_sqlite_engine, percentile, seed
+
+
+STATUSES = ("open", "in_progress", "blocked", "review", "done")
+
+
+async def drive(updates: List[tuple], mode: str, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    queue = list(updates)
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        while queue:
+            todo_id, new_status = queue.pop()
+            started = time.perf_counter()
+            if mode == "put":
+                response = await client.put(f"/api/v1/todos/{todo_id}", json={"status": new_status})
+            else:
+                response = await client.put(f"/api/v1/todos/{todo_id}/status", json={"status": new_status})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        if mode == "write-behind":
+            todo_status_buffer.start()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        if mode == "write-behind":
+            await todo_status_buffer.stop()
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--hot-todos", type=int, default=50, help="Distinct todos receiving the updates")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--flush-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    engine = create_sqlite_engine(os.path.join(tempfile.mkdtemp(prefix="flowpilot-wb-"), "bench.db"))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rng = random.Random(args.seed)
+    counts = seed(engine, max(args.hot_todos // 10, 1), 10, 0, rng)
+
+    def get_bench_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_bench_db
+    todo_status_buffer.session_factory = session_factory
+    todo_status_buffer.interval = args.flush_interval
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        statements["count"] += 1
+
+    hot = list(range(1, min(args.hot_todos, counts["todos"]) + 1))
+    updates = [(rng.choice(hot), rng.choice(STATUSES)) for _ in range(args.updates)]
+
+    results = {}
+    for mode in ("put", "status", "write-behind"):
+        settings.TODO_STATUS_WRITE_BEHIND_ENABLED = mode == "write-behind"
+        statements["count"] = 0
+        writes_before = todo_status_buffer._writes
+        superseded_before = todo_status_buffer._superseded
+        results[mode] = asyncio.run(drive(updates, mode, args.concurrency))
+        results[mode]["sql_statements"] = statements["count"]
+        if mode == "write-behind":
+            writes = todo_status_buffer._writes - writes_before
+            superseded = todo_status_buffer._superseded - superseded_before
+            results[mode]["coalescing_ratio"] = round(superseded / writes, 3) if writes else 0.0
+        print(
+            f"{mode:<13} {results[mode]['throughput_rps']:>8.0f} req/s  p50 {results[mode]['p50_ms']:>7.2f} ms  "
+            f"p99 {results[mode]['p99_ms']:>7.2f} ms  {results[mode]['sql_statements']:>6} SQL statements  "
+            f"errors {results[mode]['errors']}",
+            file=sys.stderr,
+        )
+
+    output = json.dumps({"parameters": vars(args), "dataset": counts, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Alembic environment wired to the application's models and settings.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models.models  # noqa: F401  (registers every table on Base.metadata)
+
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    return context.get_x_argument(as_dictionary=True).get("url") or settings.database_url
+
+
+def configure(**kwargs) -> None:
+    url = kwargs.get("url") or kwargs["connection"].engine.url
+    context.configure(
+        target_metadata=target_metadata,
+        compare_type=True,
+        # SQLite can only ALTER a table by copying it; batch mode does that.
+        render_as_batch=str(url).startswith("sqlite"),
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL instead of running it (alembic upgrade --sql).
+    """
+    configure(url=database_url(), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,92 @@
+"""Initial schema (projects, todos, status_reports, community)
+
+Matches scripts/create_tables.sql before the tasks and team_members tables.
+Databases created with that script should be stamped at this revision
+(`alembic stamp 0001`) and upgraded from there.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def timestamps():
+    return [
+        sa.Column("created_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("updated_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("deleted_at", Timestamp, nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("scope", sa.UnicodeText(), nullable=False),
+        sa.Column("status", sa.Unicode(50), nullable=False, server_default="active"),
+        *timestamps(),
+    )
+    op.create_table(
+        "todos",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.UnicodeText(), nullable=False),
+        sa.Column("status", sa.Unicode(50), nullable=False, server_default="open"),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], name="FK_todos_project", ondelete="CASCADE"),
+    )
+    op.create_table(
+        "status_reports",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("todo_id", sa.Integer(), nullable=False),
+        sa.Column("scope", sa.UnicodeText(), nullable=False),
+        sa.Column("status", sa.Unicode(50), nullable=False, server_default="draft"),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["todo_id"], ["todos.id"], name="FK_status_reports_todo", ondelete="CASCADE"),
+    )
+    op.create_table(
+        "community",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("team", sa.UnicodeText(), nullable=False),
+        sa.Column("role", sa.Unicode(100), nullable=True),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], name="FK_community_project", ondelete="CASCADE"),
+    )
+
+    op.create_index("IX_todos_project_id", "todos", ["project_id"])
+    op.create_index("IX_status_reports_todo_id", "status_reports", ["todo_id"])
+    op.create_index("IX_community_project_id", "community", ["project_id"])
+    op.create_index("IX_projects_deleted_at", "projects", ["deleted_at"])
+    op.create_index("IX_todos_deleted_at", "todos", ["deleted_at"])
+    op.create_index("IX_status_reports_deleted_at", "status_reports", ["deleted_at"])
+    op.create_index("IX_community_deleted_at", "community", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("community")
+    op.drop_table("status_reports")
+    op.drop_table("todos")
+    op.drop_table("projects")
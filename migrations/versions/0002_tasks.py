@@ -0,0 +1,58 @@
+"""Add the tasks table
+
+Tasks embedded in todos.scope are moved into this table by
+`python -m app.cli backfill-tasks`, which can run after this revision while
+the application is serving traffic.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("todo_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("title", sa.Unicode(500), nullable=True),
+        sa.Column("description", sa.UnicodeText(), nullable=True),
+        sa.Column("status", sa.Unicode(50), nullable=False, server_default="open"),
+        sa.Column("priority", sa.Unicode(50), nullable=True),
+        sa.Column("assignee", sa.Unicode(255), nullable=True),
+        sa.Column("attributes", sa.UnicodeText(), nullable=True),
+        sa.Column("created_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("updated_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("deleted_at", Timestamp, nullable=True),
+        sa.ForeignKeyConstraint(["todo_id"], ["todos.id"], name="FK_tasks_todo", ondelete="CASCADE"),
+    )
+    op.create_index("IX_tasks_todo_id_status_assignee", "tasks", ["todo_id", "status", "assignee"])
+    op.create_index("IX_tasks_assignee_status", "tasks", ["assignee", "status"])
+    op.create_index("IX_tasks_deleted_at", "tasks", ["deleted_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("tasks")
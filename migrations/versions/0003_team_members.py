@@ -0,0 +1,47 @@
+"""Add the team_members table
+
+Populate it with `python -m app.cli backfill-members` after upgrading.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "team_members",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("community_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.Unicode(320), nullable=False),
+        sa.Column("name", sa.Unicode(255), nullable=True),
+        sa.Column("role", sa.Unicode(100), nullable=True),
+        sa.ForeignKeyConstraint(["community_id"], ["community.id"], name="FK_team_members_community", ondelete="CASCADE"),
+        # No cascade: SQL Server allows only one cascade path from projects.
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], name="FK_team_members_project"),
+    )
+    op.create_index(
+        "IX_team_members_email",
+        "team_members",
+        ["email"],
+        mssql_include=["project_id", "community_id", "name", "role"],
+    )
+    op.create_index("IX_team_members_project_id", "team_members", ["project_id"])
+    op.create_index("IX_team_members_community_id", "team_members", ["community_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("team_members")
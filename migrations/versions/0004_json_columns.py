@@ -0,0 +1,65 @@
+"""Store JSON documents in native JSON columns
+
+scope, community.team and tasks.attributes become JSONB on PostgreSQL and
+JSON on SQLite. SQL Server keeps NVARCHAR(MAX), which is how SQLAlchemy
+stores JSON there, so nothing changes on that backend.
+
+On PostgreSQL the type change rewrites each table; run it in a maintenance
+window on large databases.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONDocument = sa.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+JSON_COLUMNS = (
+    ("projects", "scope", False),
+    ("todos", "scope", False),
+    ("status_reports", "scope", False),
+    ("community", "team", False),
+    ("tasks", "attributes", True),
+)
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "mssql":
+        return
+    for table_name, column_name, nullable in JSON_COLUMNS:
+        with op.batch_alter_table(table_name) as batch:
+            batch.alter_column(
+                column_name,
+                existing_type=sa.UnicodeText(),
+                existing_nullable=nullable,
+                type_=JSONDocument,
+                postgresql_using=f"{column_name}::jsonb",
+            )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "mssql":
+        return
+    for table_name, column_name, nullable in JSON_COLUMNS:
+        with op.batch_alter_table(table_name) as batch:
+            batch.alter_column(
+                column_name,
+                existing_type=JSONDocument,
+                existing_nullable=nullable,
+                type_=sa.UnicodeText(),
+                postgresql_using=f"{column_name}::text",
+            )
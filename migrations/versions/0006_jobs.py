@@ -0,0 +1,54 @@
+"""Add the jobs table
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+JSONDocument = sa.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("type", sa.Unicode(50), nullable=False),
+        sa.Column("status", sa.Unicode(20), nullable=False, server_default="queued"),
+        sa.Column("payload", JSONDocument, nullable=False),
+        sa.Column("result", JSONDocument, nullable=True),
+        sa.Column("error", sa.UnicodeText(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="3"),
+        sa.Column("run_after", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("locked_at", Timestamp, nullable=True),
+        sa.Column("created_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("updated_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.Column("finished_at", Timestamp, nullable=True),
+    )
+    op.create_index("IX_jobs_status_run_after", "jobs", ["status", "run_after"])
+
+
+def downgrade() -> None:
+    op.drop_table("jobs")
@@ -0,0 +1,54 @@
+"""Add the project_summaries read model
+
+Populate it with `python -m app.cli rebuild-project-summaries` after
+upgrading.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_summaries",
+        sa.Column("project_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("title", sa.Unicode(500), nullable=True),
+        sa.Column("status", sa.Unicode(50), nullable=False),
+        sa.Column("todo_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("open_todo_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("member_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latest_report_id", sa.Integer(), nullable=True),
+        sa.Column("latest_report_status", sa.Unicode(50), nullable=True),
+        sa.Column("latest_report_at", Timestamp, nullable=True),
+        sa.Column("refreshed_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], name="FK_project_summaries_project", ondelete="CASCADE"),
+    )
+    op.create_index("IX_project_summaries_status", "project_summaries", ["status", "project_id"])
+    op.create_index("IX_project_summaries_open_todo_count", "project_summaries", ["open_todo_count", "project_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("project_summaries")
@@ -0,0 +1,70 @@
+"""Add the status_events history
+
+Existing todos and status reports get one event each: their current
+status, at their updated_at.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "status_events",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("entity_type", sa.Unicode(20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Unicode(50), nullable=False),
+        sa.Column("occurred_at", Timestamp, nullable=False, server_default=utcnow()),
+        sa.PrimaryKeyConstraint("id", name="PK_status_events", mssql_clustered=False),
+    )
+    op.create_index(
+        "IX_status_events_entity",
+        "status_events",
+        ["entity_type", "entity_id", "occurred_at"],
+        mssql_clustered=True,
+    )
+    op.create_index(
+        "IX_status_events_project",
+        "status_events",
+        ["project_id", "entity_type", "occurred_at"],
+        mssql_include=["entity_id", "status"],
+    )
+
+    op.execute(
+        "INSERT INTO status_events (entity_type, entity_id, project_id, status, occurred_at) "
+        "SELECT 'todo', id, project_id, status, updated_at FROM todos"
+    )
+    op.execute(
+        "INSERT INTO status_events (entity_type, entity_id, project_id, status, occurred_at) "
+        "SELECT 'status_report', r.id, t.project_id, r.status, r.updated_at "
+        "FROM status_reports r JOIN todos t ON t.id = r.todo_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("status_events")
@@ -0,0 +1,52 @@
+"""Add the foundry_usage table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mssql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+Timestamp = sa.DateTime().with_variant(mssql.DATETIME2(), "mssql")
+
+
+def utcnow():
+    if op.get_context().dialect.name == "mssql":
+        return sa.text("GETUTCDATE()")
+    return sa.text("CURRENT_TIMESTAMP")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "foundry_usage",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("project_id", sa.Integer(), nullable=True),
+        sa.Column("source", sa.Unicode(20), nullable=False),
+        sa.Column("outcome", sa.Unicode(20), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("latency_ms", sa.Integer(), nullable=False),
+        sa.Column("request_bytes", sa.Integer(), nullable=False),
+        sa.Column("response_bytes", sa.Integer(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+        sa.Column("completion_tokens", sa.Integer(), nullable=True),
+        sa.Column("total_tokens", sa.Integer(), nullable=True),
+        sa.Column("created_at", Timestamp, nullable=False, server_default=utcnow()),
+    )
+    op.create_index("IX_foundry_usage_created_at", "foundry_usage", ["created_at"])
+    op.create_index("IX_foundry_usage_project_created_at", "foundry_usage", ["project_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("foundry_usage")
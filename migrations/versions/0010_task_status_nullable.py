@@ -0,0 +1,52 @@
+"""Allow tasks without a status
+
+Tasks saved through `scope.tasks` without a `status` key now keep a NULL
+status instead of an injected "open", so they round-trip unchanged.
+Downgrading sets NULL statuses back to "open".
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQL Server can't alter a column used by an index
+STATUS_INDEXES = (
+    ("IX_tasks_todo_id_status_assignee", ["todo_id", "status", "assignee"]),
+    ("IX_tasks_assignee_status", ["assignee", "status"]),
+)
+
+
+def _alter_status(nullable: bool) -> None:
+    for name, _ in STATUS_INDEXES:
+        op.drop_index(name, table_name="tasks")
+    with op.batch_alter_table("tasks") as batch:
+        batch.alter_column(
+            "status",
+            existing_type=sa.Unicode(50),
+            existing_server_default="open",
+            nullable=nullable,
+        )
+    for name, columns in STATUS_INDEXES:
+        op.create_index(name, "tasks", columns)
+
+
+def upgrade() -> None:
+    _alter_status(nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE tasks SET status = 'open' WHERE status IS NULL")
+    _alter_status(nullable=False)
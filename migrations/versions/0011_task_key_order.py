@@ -0,0 +1,101 @@
+"""Store task key order; keep the `owner` key in the assignee column
+
+`tasks.key_order` records a task's keys in the order they were sent, when
+that isn't attributes-then-columns, so `scope.tasks` round-trips exactly.
+
+The original task shape names the assignee `owner`. Tasks backfilled so
+far kept it in `attributes`, out of reach of the assignee index and the
+`?assignee=` filter; the upgrade moves it into the `assignee` column
+(recording the key order the API returned so far) and the downgrade moves
+it back.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONDocument = sa.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+# As in app.services.tasks when this revision was written
+TASK_COLUMNS = ("title", "description", "status", "priority", "assignee")
+ASSIGNEE_MAX_LENGTH = 255
+BATCH_SIZE = 1000
+
+tasks = sa.table(
+    "tasks",
+    sa.column("id", sa.Integer()),
+    sa.column("attributes", JSONDocument),
+    sa.column("key_order", JSONDocument),
+    *(sa.column(column, sa.Unicode()) for column in TASK_COLUMNS),
+)
+
+
+def _rewrite(where, change) -> None:
+    """
+    Apply `change(row) -> values or None` to the rows matching `where`,
+    BATCH_SIZE rows at a time in id order.
+    """
+    if op.get_context().as_sql:
+        # The JSON has to be read to be rewritten; nothing to emit offline.
+        return
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(tasks).where(tasks.c.id > last_id, where).order_by(tasks.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        for row in rows:
+            values = change(row)
+            if values is not None:
+                bind.execute(sa.update(tasks).where(tasks.c.id == row.id).values(**values))
+
+
+def _owner_to_assignee(row):
+    attributes = row.attributes
+    if not isinstance(attributes, dict):
+        return None
+    owner = attributes.get("owner")
+    if not isinstance(owner, str) or len(owner) > ASSIGNEE_MAX_LENGTH:
+        return None
+    # The order the API returned the task in so far: attributes, then columns
+    key_order = list(attributes) + [
+        column for column in TASK_COLUMNS if getattr(row, column) is not None and column not in attributes
+    ]
+    remaining = {key: value for key, value in attributes.items() if key != "owner"}
+    return {"assignee": owner, "attributes": remaining or None, "key_order": key_order}
+
+
+def _assignee_to_owner(row):
+    key_order = row.key_order or []
+    attributes = row.attributes if isinstance(row.attributes, dict) else {}
+    if "owner" not in key_order or "owner" in attributes or row.assignee is None:
+        return None
+    return {"attributes": {**attributes, "owner": row.assignee}, "assignee": None}
+
+
+def upgrade() -> None:
+    op.add_column("tasks", sa.Column("key_order", JSONDocument, nullable=True))
+    _rewrite(tasks.c.assignee.is_(None) & tasks.c.attributes.isnot(None), _owner_to_assignee)
+
+
+def downgrade() -> None:
+    _rewrite(tasks.c.key_order.isnot(None), _assignee_to_owner)
+    with op.batch_alter_table("tasks") as batch:
+        batch.drop_column("key_order")
@@ -16,7 +16,7 @@ CREATE TABLE projects (
 CREATE TABLE todos (
     id INT IDENTITY(1,1) PRIMARY KEY,
     project_id INT NOT NULL,
-    scope NVARCHAR(MAX) NOT NULL,  -- JSON: {"project_title": "", "project_description": "", "tasks": [...]}
+    scope NVARCHAR(MAX) NOT NULL,  -- JSON: {"project_title": "", "project_description": ""}; tasks are in the tasks table
     status NVARCHAR(50) NOT NULL DEFAULT 'open',  -- e.g., "open", "in_progress", "done"
     created_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
     updated_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
@@ -24,6 +24,24 @@ CREATE TABLE todos (
     CONSTRAINT FK_todos_project FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
 );
 
+-- Create tasks table (tasks used to live in todos.scope.tasks)
+CREATE TABLE tasks (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    todo_id INT NOT NULL,
+    position INT NOT NULL DEFAULT 0,  -- order within the todo's task list
+    title NVARCHAR(500) NULL,
+    description NVARCHAR(MAX) NULL,
+    status NVARCHAR(50) NULL,  -- e.g., "open", "in_progress", "done"; NULL if the task has none
+    priority NVARCHAR(50) NULL,  -- e.g., "low", "medium", "high"
+    assignee NVARCHAR(255) NULL,  -- e.g., team member email (the task's `assignee` or `owner` key)
+    attributes NVARCHAR(MAX) NULL,  -- JSON: any other task keys
+    key_order NVARCHAR(MAX) NULL,  -- JSON: the task's keys in the order sent, if not attributes-then-columns
+    created_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    updated_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    deleted_at DATETIME2 NULL,
+    CONSTRAINT FK_tasks_todo FOREIGN KEY (todo_id) REFERENCES todos(id) ON DELETE CASCADE
+);
+
 -- Create status_reports table
 CREATE TABLE status_reports (
     id INT IDENTITY(1,1) PRIMARY KEY,
@@ -48,6 +66,90 @@ CREATE TABLE community (
     CONSTRAINT FK_community_project FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
 );
 
+-- Create team_members table (one row per member of a community team, derived from community.team)
+CREATE TABLE team_members (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    community_id INT NOT NULL,
+    project_id INT NOT NULL,
+    email NVARCHAR(320) NOT NULL,  -- lower-cased
+    name NVARCHAR(255) NULL,
+    role NVARCHAR(100) NULL,  -- role of the community entry
+    CONSTRAINT FK_team_members_community FOREIGN KEY (community_id) REFERENCES community(id) ON DELETE CASCADE,
+    CONSTRAINT FK_team_members_project FOREIGN KEY (project_id) REFERENCES projects(id)
+);
+
+-- Create idempotency_keys table (stored responses for retried POSTs with an Idempotency-Key header)
+CREATE TABLE idempotency_keys (
+    [key] NVARCHAR(255) PRIMARY KEY,
+    fingerprint VARCHAR(64) NOT NULL,  -- SHA-256 of method, path and body
+    locked_at DATETIME2 NULL,  -- set while the first request is in flight
+    response_status INT NULL,
+    response_headers NVARCHAR(MAX) NULL,  -- JSON array: [["content-type", "application/json"], ...]
+    response_body VARBINARY(MAX) NULL,
+    created_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    expires_at DATETIME2 NOT NULL
+);
+
+-- Create jobs table (background jobs; the rows are the queue)
+CREATE TABLE jobs (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    type NVARCHAR(50) NOT NULL,  -- e.g., "status_reports"
+    status NVARCHAR(20) NOT NULL DEFAULT 'queued',  -- queued, running, succeeded, failed
+    payload NVARCHAR(MAX) NOT NULL,  -- JSON
+    result NVARCHAR(MAX) NULL,  -- JSON
+    error NVARCHAR(MAX) NULL,
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after DATETIME2 NOT NULL DEFAULT GETUTCDATE(),  -- not picked up before this (retry backoff)
+    locked_at DATETIME2 NULL,  -- when the running attempt started
+    created_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    updated_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    finished_at DATETIME2 NULL
+);
+
+-- Create project_summaries table (read model for project listings, one row per live project)
+CREATE TABLE project_summaries (
+    project_id INT PRIMARY KEY,
+    title NVARCHAR(500) NULL,  -- scope.project_title
+    status NVARCHAR(50) NOT NULL,
+    todo_count INT NOT NULL DEFAULT 0,
+    open_todo_count INT NOT NULL DEFAULT 0,
+    member_count INT NOT NULL DEFAULT 0,
+    latest_report_id INT NULL,
+    latest_report_status NVARCHAR(50) NULL,
+    latest_report_at DATETIME2 NULL,
+    refreshed_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    CONSTRAINT FK_project_summaries_project FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+);
+
+-- Create status_events table (append-only status history of todos and status reports)
+CREATE TABLE status_events (
+    id INT IDENTITY(1,1) NOT NULL,
+    entity_type NVARCHAR(20) NOT NULL,  -- todo, status_report
+    entity_id INT NOT NULL,
+    project_id INT NOT NULL,
+    status NVARCHAR(50) NOT NULL,  -- The status entered
+    occurred_at DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    CONSTRAINT PK_status_events PRIMARY KEY NONCLUSTERED (id)
+);
+CREATE CLUSTERED INDEX IX_status_events_entity ON status_events(entity_type, entity_id, occurred_at);
+
+-- Create foundry_usage table (one row per Foundry agent call, written in batches)
+CREATE TABLE foundry_usage (
+    id INT IDENTITY(1,1) PRIMARY KEY,
+    project_id INT NULL,
+    source NVARCHAR(20) NOT NULL,  -- chat, job
+    outcome NVARCHAR(20) NOT NULL,  -- ok, http_error, timeout, connect_error, error, over_budget
+    status_code INT NULL,
+    latency_ms INT NOT NULL,
+    request_bytes INT NOT NULL,
+    response_bytes INT NOT NULL,
+    prompt_tokens INT NULL,
+    completion_tokens INT NULL,
+    total_tokens INT NULL,
+    created_at DATETIME2 NOT NULL DEFAULT GETUTCDATE()
+);
+
 -- Create indexes for better query performance
 CREATE INDEX IX_todos_project_id ON todos(project_id);
 CREATE INDEX IX_status_reports_todo_id ON status_reports(todo_id);
@@ -56,3 +158,16 @@ CREATE INDEX IX_projects_deleted_at ON projects(deleted_at);
 CREATE INDEX IX_todos_deleted_at ON todos(deleted_at);
 CREATE INDEX IX_status_reports_deleted_at ON status_reports(deleted_at);
 CREATE INDEX IX_community_deleted_at ON community(deleted_at);
+CREATE INDEX IX_tasks_todo_id_status_assignee ON tasks(todo_id, status, assignee);
+CREATE INDEX IX_tasks_assignee_status ON tasks(assignee, status);
+CREATE INDEX IX_tasks_deleted_at ON tasks(deleted_at);
+CREATE INDEX IX_team_members_email ON team_members(email) INCLUDE (project_id, community_id, name, role);
+CREATE INDEX IX_team_members_project_id ON team_members(project_id);
+CREATE INDEX IX_team_members_community_id ON team_members(community_id);
+CREATE INDEX IX_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+CREATE INDEX IX_jobs_status_run_after ON jobs(status, run_after);
+CREATE INDEX IX_project_summaries_status ON project_summaries(status, project_id);
+CREATE INDEX IX_project_summaries_open_todo_count ON project_summaries(open_todo_count, project_id);
+CREATE INDEX IX_status_events_project ON status_events(project_id, entity_type, occurred_at) INCLUDE (entity_id, status);
+CREATE INDEX IX_foundry_usage_created_at ON foundry_usage(created_at);
+CREATE INDEX IX_foundry_usage_project_created_at ON foundry_usage(project_id, created_at);
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read on import: point the app at a throwaway SQLite file
+# and keep background machinery off unless a test starts it itself.
+_TEST_DIR = tempfile.mkdtemp(prefix="flowpilot-tests-")
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(_TEST_DIR, "app.db"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+os.environ.setdefault("JOBS_ENABLED", "False")
+os.environ.setdefault("STARTUP_WARMUP_ENABLED", "False")
+
+
+@pytest.fixture
+def db_engine():
+    """
+    The application's engine with an empty schema.
+    """
+    from app.core.database import Base, engine
+    import app.models.models  # noqa: F401
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine):
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(db_engine):
+    """
+    TestClient for the full application, without running its lifespan.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app as fastapi_app
+
+    return TestClient(fastapi_app)
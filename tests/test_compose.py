@@ -0,0 +1,74 @@
+"""
+POST /api/v1/projects/compose and the UnitOfWork behind it: the whole
+graph is created in one transaction, or nothing is.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from app.core.database import open_unit_of_work
+from app.models.models import Community, Project, Task, TeamMember, Todo
+
+GRAPH = {
+    "scope": {"project_title": "Website relaunch"},
+    "community": [{"team": [{"name": "Ana", "email": "ana@example.com"}], "role": "Development Team"}],
+    "todos": [
+        {"scope": {"title": "Design", "tasks": [{"id": 1, "title": "Wireframes"}, {"id": 2, "title": "Mockups"}]}},
+        {"scope": {"title": "Build"}, "status": "in_progress"},
+    ],
+}
+
+
+def counts(db):
+    db.expire_all()
+    return {
+        model.__tablename__: db.scalar(select(func.count()).select_from(model))
+        for model in (Project, Community, TeamMember, Todo, Task)
+    }
+
+
+def test_compose_creates_the_whole_graph(client, db):
+    response = client.post("/api/v1/projects/compose", json=GRAPH)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["project"]["scope"] == GRAPH["scope"]
+    assert [todo["scope"] for todo in body["todos"]] == [todo["scope"] for todo in GRAPH["todos"]]
+    assert [todo["status"] for todo in body["todos"]] == ["open", "in_progress"]
+    assert counts(db) == {"projects": 1, "community": 1, "team_members": 1, "todos": 2, "tasks": 2}
+    summary = client.get("/api/v1/projects/summaries").json()["items"][0]
+    assert (summary["todo_count"], summary["member_count"]) == (2, 1)
+
+
+def test_compose_creates_nothing_when_a_step_fails(db_engine, db, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app.api.v1.projects as projects_api
+    from app.main import app as fastapi_app
+
+    def broken_refresh(*args, **kwargs):
+        raise RuntimeError("summary refresh failed")
+
+    monkeypatch.setattr(projects_api, "refresh_project_summaries", broken_refresh)
+
+    response = TestClient(fastapi_app, raise_server_exceptions=False).post("/api/v1/projects/compose", json=GRAPH)
+
+    assert response.status_code == 500
+    assert counts(db) == {"projects": 0, "community": 0, "team_members": 0, "todos": 0, "tasks": 0}
+
+
+def test_transactions_commit_roll_back_and_do_not_nest(db_engine, db):
+    with open_unit_of_work() as uow:
+        with uow.transaction() as session:
+            session.add(Project(scope={}, status="active"))
+
+        with pytest.raises(ValueError):
+            with uow.transaction() as session:
+                session.add(Project(scope={}, status="active"))
+                session.flush()
+                raise ValueError("step failed")
+
+        with uow.transaction():
+            with pytest.raises(RuntimeError):
+                with uow.transaction():
+                    pass
+
+    assert counts(db)["projects"] == 1
@@ -0,0 +1,126 @@
+"""
+CompressionMiddleware: size threshold, content-type allowlist, encoding
+negotiation, Vary and streaming.
+"""
+import asyncio
+import gzip
+import zlib
+
+import pytest
+
+from app.middleware.compression import CompressionMiddleware, brotli
+
+
+needs_brotli = pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+
+
+def make_app(chunks, content_type="application/json", extra_headers=()):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode()), *extra_headers]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+def call(app, accept_encoding=None, **options):
+    middleware = CompressionMiddleware(app, **options)
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    start, *bodies = messages
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    return headers, [message["body"] for message in bodies]
+
+
+BIG = b'{"items": "' + b"x" * 4000 + b'"}'
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip", "gzip"),
+    pytest.param("br", "br", marks=needs_brotli),
+    pytest.param("gzip, br", "br", marks=needs_brotli),
+    ("br;q=0.5, gzip", "gzip"),
+    pytest.param("*", "br", marks=needs_brotli),
+    ("br;q=0, *;q=0.1", "gzip"),
+])
+def test_negotiates_encoding(accept_encoding, expected):
+    headers, bodies = call(make_app([BIG]), accept_encoding)
+    assert headers["content-encoding"] == expected
+    assert headers["vary"] == "Accept-Encoding"
+    body = b"".join(bodies)
+    assert headers["content-length"] == str(len(body))
+    decompress = brotli.decompress if expected == "br" else gzip.decompress
+    assert decompress(body) == BIG
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "identity", "gzip;q=0"])
+def test_uncompressed_when_nothing_acceptable_but_varies(accept_encoding):
+    headers, bodies = call(make_app([BIG]), accept_encoding)
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert b"".join(bodies) == BIG
+
+
+def test_small_responses_are_sent_as_is_with_vary():
+    small = b'{"ok": true}'
+    headers, bodies = call(make_app([small]), "gzip", minimum_size=100)
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert bodies == [small]
+
+
+def test_minimum_size_is_inclusive():
+    body = b"a" * 100
+    headers, _ = call(make_app([body], "text/plain"), "gzip", minimum_size=100)
+    assert headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.parametrize("content_type, compressed", [
+    ("application/json", True),
+    ("application/json; charset=utf-8", True),
+    ("text/csv", True),
+    ("image/png", False),
+    ("application/octet-stream", False),
+])
+def test_content_type_allowlist(content_type, compressed):
+    headers, _ = call(make_app([BIG], content_type), "gzip")
+    assert ("content-encoding" in headers) is compressed
+    assert ("vary" in headers) is compressed
+
+
+def test_already_encoded_responses_pass_through():
+    app = make_app([BIG], extra_headers=[(b"content-encoding", b"identity")])
+    headers, bodies = call(app, "gzip")
+    assert headers["content-encoding"] == "identity"
+    assert "vary" not in headers
+    assert bodies == [BIG]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", pytest.param("br", marks=needs_brotli)])
+def test_streaming_chunks_are_flushed(encoding):
+    chunks = [b'{"row": %d, "pad": "%s"}\n' % (i, b"y" * 50) for i in range(5)]
+    headers, bodies = call(make_app(chunks), encoding)
+    assert headers["content-encoding"] == encoding
+    assert "content-length" not in headers
+    assert len(bodies) == len(chunks)
+
+    # Every chunk can be decoded as soon as it arrives.
+    if encoding == "gzip":
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        decode = decoder.decompress
+    else:
+        decoder = brotli.Decompressor()
+        decode = decoder.process
+    for chunk, body in zip(chunks, bodies):
+        assert decode(body) == chunk
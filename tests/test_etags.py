@@ -0,0 +1,45 @@
+"""
+Every read and write of a scoped resource returns the ETag that
+If-Match on PATCH .../scope expects.
+"""
+import pytest
+
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+
+
+@pytest.fixture
+def resources(client):
+    project = client.post("/api/v1/projects", json={"scope": {"title": "P"}}).json()
+    todo = client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"title": "T"}}).json()
+    report = client.post("/api/v1/status-reports", json={"todo_id": todo["id"], "scope": {"summary": "S"}}).json()
+    return {
+        "projects": project["id"],
+        "todos": todo["id"],
+        "status-reports": report["id"],
+    }
+
+
+@pytest.mark.parametrize("collection", ["projects", "todos", "status-reports"])
+def test_get_and_put_return_an_etag_usable_with_if_match(client, resources, collection):
+    url = f"/api/v1/{collection}/{resources[collection]}"
+
+    etag = client.get(url).headers["ETag"]
+    response = client.patch(f"{url}/scope", json={"a": 1}, headers={**MERGE_PATCH, "If-Match": etag})
+    assert response.status_code == 200
+
+    # The GET's tag is now stale
+    response = client.patch(f"{url}/scope", json={"a": 2}, headers={**MERGE_PATCH, "If-Match": etag})
+    assert response.status_code == 412
+
+    put = client.put(url, json={"status": "done"})
+    assert put.status_code == 200
+    assert put.headers["ETag"] == f'"{put.json()["updated_at"]}"'
+    response = client.patch(f"{url}/scope", json={"a": 3}, headers={**MERGE_PATCH, "If-Match": put.headers["ETag"]})
+    assert response.status_code == 200
+    assert client.get(url).headers["ETag"] == response.headers["ETag"]
+
+
+def test_create_returns_an_etag(client):
+    response = client.post("/api/v1/projects", json={"scope": {"title": "P"}})
+    assert response.status_code == 201
+    assert response.headers["ETag"] == f'"{response.json()["updated_at"]}"'
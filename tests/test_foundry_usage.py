@@ -0,0 +1,113 @@
+"""
+Foundry usage accounting and per-project token budgets, against the local
+Foundry stub.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models.models import FoundryUsage
+from app.services import foundry_chat_service
+from app.services.foundry_usage import OK, OVER_BUDGET, FoundryBudgetExceeded, FoundryUsageRecorder
+from benchmarks.stub_foundry import StubFoundryServer
+from integrations.foundry_config import FoundryConfig
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with StubFoundryServer() as server:
+        yield server
+
+
+@pytest.fixture
+def recorder(db_engine, stub, monkeypatch):
+    """
+    A recorder with a 40-token budget per project (the stub's replies cost
+    about 36), used by the chat endpoint.
+    """
+    from app.core.database import SessionLocal
+
+    recorder = FoundryUsageRecorder(SessionLocal, budget_tokens=40)
+    monkeypatch.setattr(foundry_chat_service, "usage_recorder", recorder)
+    monkeypatch.setattr(FoundryConfig, "BASE_URL", stub.base_url)
+    monkeypatch.setattr(foundry_chat_service, "_client", None)
+    return recorder
+
+
+def chat(client, **body):
+    response = client.post("/api/v1/foundry/chat", json={"message": "Summarize the project", **body})
+    # The shared Foundry client belongs to the request's event loop
+    foundry_chat_service._client = None
+    return response
+
+
+@pytest.fixture
+def project_id(client):
+    return client.post("/api/v1/projects", json={"scope": {}}).json()["id"]
+
+
+def test_chat_is_refused_once_the_project_budget_is_used(client, recorder, project_id):
+    first = chat(client, project_id=project_id)
+    assert first.status_code == 200
+    assert recorder.used_tokens(project_id) == first.json()["response"]["usage"]["total_tokens"] < 40
+
+    assert chat(client, project_id=project_id).status_code == 200
+    refused = chat(client, project_id=project_id)
+    assert refused.status_code == 429
+    assert int(refused.headers["Retry-After"]) > 0
+    assert "budget" in refused.json()["detail"]
+
+    # Other projects have their own budget
+    other = client.post("/api/v1/projects", json={"scope": {}}).json()["id"]
+    assert chat(client, project_id=other).status_code == 200
+
+
+def test_usage_is_recorded_per_call(client, db, recorder, project_id):
+    for _ in range(3):
+        chat(client, project_id=project_id)
+
+    assert recorder.flush() == 3
+    rows = db.scalars(select(FoundryUsage).order_by(FoundryUsage.id)).all()
+    assert [row.outcome for row in rows] == [OK, OK, OVER_BUDGET]
+    assert {row.project_id for row in rows} == {project_id}
+    assert {row.source for row in rows} == {"chat"}
+    assert rows[0].total_tokens > 0 and rows[0].request_bytes > 0 and rows[0].status_code == 200
+    # Refusals never reach Foundry
+    assert rows[2].total_tokens is None and rows[2].status_code is None
+
+    # A new process loads the period's usage from the table
+    from app.core.database import SessionLocal
+
+    restarted = FoundryUsageRecorder(SessionLocal, budget_tokens=40)
+    restarted.sync_budgets()
+    assert restarted.used_tokens(project_id) == recorder.used_tokens(project_id)
+    with pytest.raises(FoundryBudgetExceeded):
+        restarted.check_budget(project_id, "chat")
+
+
+def test_chat_requires_an_existing_project(client, recorder, project_id):
+    assert chat(client).status_code == 422
+    assert chat(client, project_id=project_id + 1).status_code == 404
+
+    client.delete(f"/api/v1/projects/{project_id}")
+    assert chat(client, project_id=project_id).status_code == 404
+    assert len(recorder) == 0
+
+
+def test_overrides_and_periods(db_engine):
+    from app.core.database import SessionLocal
+
+    recorder = FoundryUsageRecorder(SessionLocal, budget_tokens=10, budget_overrides={2: 0, 3: 100}, enabled=False)
+    for project_id in (1, 2, 3):
+        recorder.record(project_id, "chat", OK, latency=0.1, request_bytes=10, body={"usage": {"total_tokens": 50}})
+
+    with pytest.raises(FoundryBudgetExceeded):
+        recorder.check_budget(1, "job")
+    recorder.check_budget(2, "chat")  # 0: no budget
+    recorder.check_budget(3, "chat")  # Its own, larger budget
+
+    # A new period starts from zero
+    recorder._period_start = datetime(2000, 1, 1)
+    assert recorder.used_tokens(1) == 0
+    recorder.check_budget(1, "chat")
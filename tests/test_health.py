@@ -0,0 +1,37 @@
+"""
+Readiness: which failed checks take the service out of rotation.
+"""
+import asyncio
+
+import pytest
+
+from app.services import health_service
+from app.services.health_service import HealthMonitor
+
+
+def probe(ok):
+    async def run(timeout):
+        return {"status": "ok" if ok else "fail", "latency_ms": 0.0}
+    return run
+
+
+@pytest.mark.parametrize("database_ok, foundry_ok, foundry_required, expected", [
+    (True, True, False, "ready"),
+    (True, False, False, "degraded"),
+    (True, False, True, "not_ready"),
+    (False, True, False, "not_ready"),
+])
+def test_readiness_status(monkeypatch, database_ok, foundry_ok, foundry_required, expected):
+    monkeypatch.setattr(health_service, "probe_database", probe(database_ok))
+    monkeypatch.setattr(health_service, "probe_foundry", probe(foundry_ok))
+    monitor = HealthMonitor(foundry_required=foundry_required)
+
+    report = asyncio.run(monitor.refresh())
+    assert report["status"] == expected
+    assert report["checks"]["foundry"]["required"] is foundry_required
+
+
+def test_foundry_is_optional_by_default(monkeypatch):
+    monkeypatch.setattr(health_service, "probe_database", probe(True))
+    monkeypatch.setattr(health_service, "probe_foundry", probe(False))
+    assert asyncio.run(HealthMonitor().refresh())["status"] == "degraded"
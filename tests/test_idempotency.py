@@ -0,0 +1,174 @@
+"""
+Idempotency-Key handling: replay, body mismatch, per-client keys,
+concurrent duplicates and takeover of abandoned claims.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.services.idempotency import CLAIMED, IN_PROGRESS, claim_key, heartbeat_key, request_fingerprint
+
+
+def test_retry_replays_the_stored_response(client):
+    headers = {"Idempotency-Key": "create-p"}
+    first = client.post("/api/v1/projects", json={"scope": {"title": "P"}}, headers=headers)
+    retry = client.post("/api/v1/projects", json={"scope": {"title": "P"}}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(client.get("/api/v1/projects").json()) == 1
+
+
+def test_reusing_a_key_for_another_body_is_rejected(client):
+    headers = {"Idempotency-Key": "create-p"}
+    client.post("/api/v1/projects", json={"scope": {"title": "P"}}, headers=headers)
+
+    response = client.post("/api/v1/projects", json={"scope": {"title": "Q"}}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(client.get("/api/v1/projects").json()) == 1
+
+
+def test_failed_requests_release_the_key(client):
+    headers = {"Idempotency-Key": "create-p"}
+    assert client.post("/api/v1/projects", json={"scope": "P"}, headers=headers).status_code == 422
+
+    # The key is free again, even with a corrected body
+    response = client.post("/api/v1/projects", json={"scope": {"title": "P"}}, headers=headers)
+    assert response.status_code == 201
+
+
+class CountingApp:
+    """
+    Answers with how many times it ran; `release` lets a test hold requests open.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        call = self.calls
+        if self.release is not None:
+            await self.release.wait()
+        body = json.dumps({"call": call}).encode()
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def make_middleware(app, lock_timeout=5.0, **options):
+    from app.core.database import SessionLocal
+
+    return IdempotencyMiddleware(app, SessionLocal, ttl_seconds=3600, lock_timeout_seconds=lock_timeout, **options)
+
+
+async def post(middleware, key="k", body=b"{}", headers=(), client=("10.0.0.1", 1234)):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/projects",
+        "headers": [(b"idempotency-key", key.encode()), *headers],
+        "client": client,
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start, response = messages[0], messages[-1]
+    return start["status"], dict(start["headers"]), json.loads(response["body"])
+
+
+def test_keys_are_scoped_per_client(db_engine):
+    app = CountingApp()
+    middleware = make_middleware(app, client_header="X-Client-Id")
+
+    async def scenario():
+        a = await post(middleware, headers=[(b"x-client-id", b"team-a")])
+        b = await post(middleware, headers=[(b"x-client-id", b"team-b")])
+        a_again = await post(middleware, headers=[(b"x-client-id", b"team-a")])
+        by_ip = await post(middleware, client=("10.0.0.2", 1))
+        return a, b, a_again, by_ip
+
+    a, b, a_again, by_ip = asyncio.run(scenario())
+
+    assert (a[2], b[2], by_ip[2]) == ({"call": 1}, {"call": 2}, {"call": 3})
+    assert a_again[2] == {"call": 1}
+    assert a_again[1][b"idempotent-replayed"] == b"true"
+
+
+def test_duplicate_waits_for_the_original_and_gets_its_response(db_engine):
+    app = CountingApp()
+    app.release = asyncio.Event()
+    middleware = make_middleware(app)
+
+    async def scenario():
+        first = asyncio.create_task(post(middleware))
+        await asyncio.sleep(0.1)
+        duplicate = asyncio.create_task(post(middleware))
+        await asyncio.sleep(0.1)
+        app.release.set()
+        return await first, await duplicate
+
+    first, duplicate = asyncio.run(scenario())
+
+    assert app.calls == 1
+    assert first[2] == duplicate[2] == {"call": 1}
+    assert duplicate[1][b"idempotent-replayed"] == b"true"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_duplicate_gets_409_when_the_original_outlasts_the_lock_timeout(db_engine, workers):
+    app = CountingApp()
+    app.release = asyncio.Event()
+    # Two middleware instances stand for two workers sharing the table
+    middlewares = [make_middleware(app, lock_timeout=0.3) for _ in range(workers)]
+
+    async def scenario():
+        first = asyncio.create_task(post(middlewares[0]))
+        await asyncio.sleep(0.1)
+        duplicate = await post(middlewares[-1])
+        app.release.set()
+        return await first, duplicate
+
+    first, duplicate = asyncio.run(scenario())
+
+    assert app.calls == 1
+    assert first[0] == 201
+    assert duplicate[0] == 409
+    assert duplicate[1][b"retry-after"] == b"1"
+
+
+def test_abandoned_claims_are_taken_over_after_the_lock_timeout(db_engine):
+    from app.core.database import SessionLocal
+
+    def run(function, *args):
+        # A session per call, as the middleware uses
+        with SessionLocal() as db:
+            return function(db, *args)
+
+    fingerprint = request_fingerprint("POST", "/api/v1/projects", b"{}")
+    ttl, lock_timeout = timedelta(hours=1), timedelta(seconds=30)
+    start = datetime(2026, 1, 1, 12, 0, 0)
+
+    assert run(claim_key, "k", fingerprint, ttl, lock_timeout, start)[0] == CLAIMED
+    # Heartbeats keep a slow request's claim
+    later = start + timedelta(seconds=25)
+    assert run(heartbeat_key, "k", start, later)
+    assert run(claim_key, "k", fingerprint, ttl, lock_timeout, start + timedelta(seconds=40))[0] == IN_PROGRESS
+
+    # No heartbeat for longer than the timeout: the request died
+    takeover = later + timedelta(seconds=31)
+    assert run(claim_key, "k", fingerprint, ttl, lock_timeout, takeover)[0] == CLAIMED
+    # The original holder learns it lost the claim
+    assert not run(heartbeat_key, "k", later, takeover + timedelta(seconds=1))
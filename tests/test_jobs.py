@@ -0,0 +1,157 @@
+"""
+The job queue against the local Foundry stub: claiming, retries with
+backoff, max attempts, and a worker surviving a failure to record an
+outcome.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.models import Job, StatusReport
+from app.services import jobs
+from app.services.foundry_chat_service import close_foundry_client
+from app.services.jobs import FAILED, QUEUED, RUNNING, STATUS_REPORTS, SUCCEEDED, JobWorker, claim_next_job, enqueue_job
+from benchmarks.stub_foundry import StubFoundryServer
+from integrations.foundry_config import FoundryConfig
+
+LOCK_TIMEOUT = timedelta(seconds=300)
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with StubFoundryServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def failing_stub():
+    with StubFoundryServer(failure_rate=1.0) as server:
+        yield server
+
+
+def run(coroutine):
+    async def scenario():
+        try:
+            return await coroutine
+        finally:
+            # The shared client belongs to this event loop
+            await close_foundry_client()
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def project_id(client):
+    project = client.post("/api/v1/projects", json={"scope": {"title": "P"}}).json()
+    for title in ("A", "B"):
+        client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"title": title}})
+    return project["id"]
+
+
+def make_worker(**options):
+    from app.core.database import SessionLocal
+
+    return JobWorker(SessionLocal, poll_interval=0.02, **options)
+
+
+def test_each_job_is_claimed_once_and_stale_claims_are_retaken(db):
+    first = enqueue_job(db, STATUS_REPORTS, {"project_id": 1})
+    second = enqueue_job(db, STATUS_REPORTS, {"project_id": 2})
+    now = datetime.utcnow() + timedelta(seconds=1)
+
+    claimed = [claim_next_job(db, LOCK_TIMEOUT, now), claim_next_job(db, LOCK_TIMEOUT, now)]
+    assert [job.id for job in claimed] == [first.id, second.id]
+    assert all(job.status == RUNNING and job.attempts == 1 for job in claimed)
+    assert claim_next_job(db, LOCK_TIMEOUT, now) is None
+
+    # A worker that died leaves its claim; it is retried after the lock timeout
+    retaken = claim_next_job(db, LOCK_TIMEOUT, now + LOCK_TIMEOUT + timedelta(seconds=1))
+    assert retaken.id == first.id
+    assert retaken.attempts == 2
+
+
+def test_job_drafts_a_report_per_todo(db, stub, project_id, monkeypatch):
+    monkeypatch.setattr(FoundryConfig, "BASE_URL", stub.base_url)
+    enqueue_job(db, STATUS_REPORTS, {"project_id": project_id})
+    job = claim_next_job(db, LOCK_TIMEOUT)
+
+    run(make_worker().run_job(job))
+
+    db.expire_all()
+    job = db.get(Job, job.id)
+    assert job.status == SUCCEEDED
+    reports = db.scalars(select(StatusReport).order_by(StatusReport.id)).all()
+    assert job.result["status_report_ids"] == [report.id for report in reports]
+    assert len(reports) == 2
+    assert all(report.status == "draft" for report in reports)
+
+
+def test_foundry_errors_are_retried_with_backoff_until_max_attempts(db, failing_stub, project_id, monkeypatch):
+    monkeypatch.setattr(FoundryConfig, "BASE_URL", failing_stub.base_url)
+    worker = make_worker(retry_backoff=10.0)
+    job_id = enqueue_job(db, STATUS_REPORTS, {"project_id": project_id}, max_attempts=3).id
+
+    now = datetime.utcnow()
+    for attempt, backoff in [(1, 10), (2, 20)]:
+        job = claim_next_job(db, LOCK_TIMEOUT, now)
+        assert job.attempts == attempt
+        run(worker.run_job(job))
+
+        db.expire_all()
+        job = db.get(Job, job_id)
+        assert job.status == QUEUED
+        assert "503" in job.error
+        # Not runnable before the backoff, which doubles each attempt
+        retry_at = job.run_after
+        assert retry_at - datetime.utcnow() == pytest.approx(timedelta(seconds=backoff), abs=timedelta(seconds=2))
+        assert claim_next_job(db, LOCK_TIMEOUT, retry_at - timedelta(seconds=1)) is None
+        now = retry_at + timedelta(seconds=1)
+
+    job = claim_next_job(db, LOCK_TIMEOUT, now)
+    run(worker.run_job(job))
+
+    db.expire_all()
+    job = db.get(Job, job_id)
+    assert job.status == FAILED
+    assert job.attempts == 3
+    assert job.finished_at is not None
+    assert db.scalars(select(StatusReport)).first() is None
+
+
+def test_worker_keeps_running_when_recording_an_outcome_fails(db, monkeypatch):
+    async def broken_handler(session_factory, job):
+        raise ValueError("bad payload")
+
+    real_fail_job = jobs.fail_job
+    calls = []
+
+    def fail_job(db, job, error, retry_after=None):
+        calls.append(job.id)
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+        return real_fail_job(db, job, error, retry_after)
+
+    monkeypatch.setattr(jobs, "fail_job", fail_job)
+    first = enqueue_job(db, "broken", {})
+    second = enqueue_job(db, "broken", {})
+    worker = make_worker(concurrency=1, handlers={"broken": broken_handler})
+
+    async def scenario():
+        worker.start()
+        deadline = time.monotonic() + 10
+        while len(calls) < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        await worker.stop()
+
+    run(scenario())
+
+    assert calls == [first.id, second.id]
+    db.expire_all()
+    # The first stays claimed until its lock times out, then is retried
+    assert db.get(Job, first.id).status == RUNNING
+    assert db.get(Job, second.id).status == FAILED
+    assert db.get(Job, second.id).error == "bad payload"
+    assert not worker.running
@@ -0,0 +1,144 @@
+"""
+Alembic revisions and the helpers in app.core.migrations, run against a
+temporary SQLite file.
+"""
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+
+from app.core.database import Base
+from app.core.migrations import add_column_with_backfill, batched_update
+import app.models.models  # noqa: F401  (registers every table on Base.metadata)
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    # Same as `alembic -x url=...`
+    config.cmd_opts = Namespace(x=[f"url={url}"])
+    return config
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+
+@pytest.fixture
+def seeded(database_url):
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sa.text("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR(50), priority VARCHAR(20))"))
+        connection.execute(
+            sa.text("INSERT INTO items (id, name, priority) VALUES (:id, :name, :priority)"),
+            [{"id": i, "name": f"item {i}", "priority": "high" if i % 5 == 0 else None} for i in range(1, 26)],
+        )
+    yield engine
+    engine.dispose()
+
+
+def run_operations(engine, function):
+    with engine.connect() as connection:
+        # One transaction around the operations, as env.py's begin_transaction()
+        # gives a revision; the helpers commit it from their autocommit blocks.
+        context = MigrationContext.configure(
+            connection, opts={"render_as_batch": True, "transactional_ddl": True}
+        )
+        with Operations.context(context):
+            with context.begin_transaction():
+                result = function()
+    return result
+
+
+def test_upgrade_and_downgrade(database_url):
+    config = alembic_config(database_url)
+    command.upgrade(config, "head")
+    command.check(config)
+
+    engine = sa.create_engine(database_url)
+    assert set(Base.metadata.tables) <= set(sa.inspect(engine).get_table_names())
+
+    command.downgrade(config, "base")
+    assert set(sa.inspect(engine).get_table_names()) == {"alembic_version"}
+
+    # The downgrades leave nothing behind that blocks a fresh upgrade.
+    command.upgrade(config, "head")
+    engine.dispose()
+
+
+def test_batched_update(seeded):
+    updated = run_operations(
+        seeded,
+        lambda: batched_update("items", {"priority": "'medium'"}, where="priority IS NULL", batch_size=7),
+    )
+    assert updated == 20
+
+    with seeded.connect() as connection:
+        counts = dict(connection.execute(sa.text("SELECT priority, COUNT(*) FROM items GROUP BY priority")).all())
+    assert counts == {"high": 5, "medium": 20}
+
+
+def test_batched_update_empty_table(seeded):
+    with seeded.begin() as connection:
+        connection.execute(sa.text("DELETE FROM items"))
+    assert run_operations(seeded, lambda: batched_update("items", {"priority": "'low'"})) == 0
+
+
+def test_add_column_with_backfill(seeded):
+    column = sa.Column("label", sa.Unicode(60), nullable=False)
+    run_operations(
+        seeded,
+        lambda: add_column_with_backfill("items", column, "'#' || name", batch_size=4),
+    )
+
+    with seeded.connect() as connection:
+        labels = connection.execute(sa.text("SELECT id, label FROM items ORDER BY id")).all()
+    assert labels == [(i, f"#item {i}") for i in range(1, 26)]
+
+    label = next(c for c in sa.inspect(seeded).get_columns("items") if c["name"] == "label")
+    assert label["nullable"] is False
+    # The caller's column object is left as it was passed in.
+    assert column.nullable is False
+
+
+def test_owner_moves_to_the_assignee_column(database_url):
+    config = alembic_config(database_url)
+    command.upgrade(config, "0010")
+    engine = sa.create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(sa.text("INSERT INTO projects (id, scope, status) VALUES (1, '{}', 'active')"))
+        connection.execute(sa.text("INSERT INTO todos (id, project_id, scope, status) VALUES (1, 1, '{}', 'open')"))
+        connection.execute(
+            sa.text("INSERT INTO tasks (todo_id, position, title, attributes) VALUES (1, :position, 'T', :attributes)"),
+            [
+                {"position": 0, "attributes": '{"owner": "a@example.com", "duedate": "2024-12-31"}'},
+                {"position": 1, "attributes": '{"owner": 7}'},
+            ],
+        )
+
+    command.upgrade(config, "0011")
+    with engine.connect() as connection:
+        rows = connection.execute(sa.text("SELECT assignee, attributes, key_order FROM tasks ORDER BY position")).all()
+    assert rows[0].assignee == "a@example.com"
+    assert json.loads(rows[0].attributes) == {"duedate": "2024-12-31"}
+    assert json.loads(rows[0].key_order) == ["owner", "duedate", "title", "status"]
+    assert rows[1].assignee is None
+    assert rows[1].key_order is None
+
+    command.downgrade(config, "0010")
+    with engine.connect() as connection:
+        attributes = connection.execute(sa.text("SELECT attributes FROM tasks ORDER BY position")).scalars().all()
+        assignees = connection.execute(sa.text("SELECT assignee FROM tasks")).scalars().all()
+    assert json.loads(attributes[0]) == {"duedate": "2024-12-31", "owner": "a@example.com"}
+    assert assignees == [None, None]
+    engine.dispose()
@@ -0,0 +1,135 @@
+"""
+The project_summaries read model: refreshed by writes, rebuilt from the
+source tables, and listed with keyset cursors.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from app.models.models import Project, ProjectSummary
+from app.services.project_summaries import rebuild_project_summaries
+
+
+def create_project(client, title, open_todos=0, done_todos=0):
+    project = client.post("/api/v1/projects", json={"scope": {"project_title": title}}).json()
+    for index in range(open_todos + done_todos):
+        todo = client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"title": f"T{index}"}}).json()
+        if index >= open_todos:
+            client.put(f"/api/v1/todos/{todo['id']}/status", json={"status": "done"})
+    return project["id"]
+
+
+def summaries(client, **params):
+    response = client.get("/api/v1/projects/summaries", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def summary(client, project_id):
+    return next((item for item in summaries(client)["items"] if item["project_id"] == project_id), None)
+
+
+def test_writes_refresh_the_summary(client):
+    project_id = create_project(client, "Apollo", open_todos=2)
+    assert summary(client, project_id) | {"refreshed_at": None} == {
+        "project_id": project_id,
+        "title": "Apollo",
+        "status": "active",
+        "todo_count": 2,
+        "open_todo_count": 2,
+        "member_count": 0,
+        "latest_report_id": None,
+        "latest_report_status": None,
+        "latest_report_at": None,
+        "refreshed_at": None,
+    }
+
+    todo_id = client.get("/api/v1/todos", params={"project_id": project_id}).json()[0]["id"]
+    client.put(f"/api/v1/todos/{todo_id}/status", json={"status": "done"})
+    report = client.post("/api/v1/status-reports", json={"todo_id": todo_id, "scope": {"summary": "S"}}).json()
+    client.put(f"/api/v1/projects/{project_id}", json={"status": "paused"})
+
+    refreshed = summary(client, project_id)
+    assert refreshed["open_todo_count"] == 1
+    assert refreshed["todo_count"] == 2
+    assert refreshed["latest_report_id"] == report["id"]
+    assert refreshed["status"] == "paused"
+
+    client.delete(f"/api/v1/todos/{todo_id}")
+    assert summary(client, project_id)["latest_report_id"] is None
+
+    client.delete(f"/api/v1/projects/{project_id}")
+    assert summary(client, project_id) is None
+
+
+def test_rebuild_fixes_drifted_rows_and_drops_orphans(client, db):
+    kept = create_project(client, "Kept", open_todos=3)
+    removed = create_project(client, "Removed")
+    db.execute(update(ProjectSummary).where(ProjectSummary.project_id == kept).values(open_todo_count=99))
+    # A project deleted without a refresh leaves its summary behind
+    db.execute(update(Project).where(Project.id == removed).values(deleted_at=datetime.utcnow()))
+    db.commit()
+
+    assert rebuild_project_summaries(db, batch_size=1) == {"projects": 1, "removed": 1}
+
+    rows = {row.project_id: row for row in db.scalars(select(ProjectSummary))}
+    assert set(rows) == {kept}
+    assert rows[kept].open_todo_count == 3
+
+
+def walk(client, cursor=None, **params):
+    """
+    Every page of a listing from `cursor` on; returns the project ids in
+    order and the page count.
+    """
+    ids, pages = [], 0
+    while True:
+        page = summaries(client, **params, **({"cursor": cursor} if cursor else {}))
+        ids += [item["project_id"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_id_cursor_pages_through_every_project_once(client):
+    project_ids = [create_project(client, f"P{index}") for index in range(5)]
+
+    ids, pages = walk(client, limit=2)
+
+    assert ids == project_ids
+    assert pages == 3
+
+
+def test_open_todos_cursor_orders_ties_by_id(client):
+    counts = [1, 3, 0, 3, 1, 2]
+    project_ids = [create_project(client, f"P{index}", open_todos=count, done_todos=1) for index, count in enumerate(counts)]
+    expected = [project_id for _, project_id in sorted(zip(counts, project_ids), key=lambda item: (-item[0], -item[1]))]
+
+    for limit in (1, 2, 4, 10):
+        assert walk(client, sort="-open_todos", limit=limit)[0] == expected
+
+    with_open = walk(client, sort="-open_todos", has_open_todos=True, limit=2)[0]
+    assert with_open == expected[:-1]
+
+
+def test_cursor_sees_rows_changed_between_pages(client):
+    first, second, third = (create_project(client, name) for name in ("A", "B", "C"))
+
+    page = summaries(client, limit=1)
+    client.delete(f"/api/v1/projects/{second}")
+    fourth = create_project(client, "D")
+
+    rest, _ = walk(client, limit=1, cursor=page["next_cursor"])
+    # Keyset: no row repeated or skipped because of the deletion
+    assert [item["project_id"] for item in page["items"]] + rest == [first, third, fourth]
+
+
+def test_invalid_cursors_are_rejected(client):
+    create_project(client, "A")
+    create_project(client, "B")
+    id_cursor = summaries(client, limit=1)["next_cursor"]
+
+    for params in ({"cursor": "not-a-cursor"}, {"cursor": id_cursor, "sort": "-open_todos"}):
+        response = client.get("/api/v1/projects/summaries", params=params)
+        assert response.status_code == 400
@@ -0,0 +1,129 @@
+"""
+Slow-query log, N+1 detection and the admin endpoints that expose them.
+"""
+import pytest
+import sqlalchemy as sa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import admin
+from app.core import database
+from app.core.config import settings
+from app.core.query_log import QueryLog, fingerprint, normalize_statement
+from app.core.request_context import RequestContext, reset_request_context, set_request_context
+
+
+@pytest.fixture
+def log(monkeypatch):
+    log = QueryLog(slow_query_ms=1000.0, n_plus_one_threshold=3, buffer_size=5)
+    monkeypatch.setattr(database, "query_log", log)
+    return log
+
+
+@pytest.fixture
+def engine(tmp_path, log):
+    engine = database.instrument_engine(sa.create_engine(f"sqlite:///{tmp_path / 'log.db'}"))
+    with engine.begin() as connection:
+        connection.execute(sa.text("CREATE TABLE items (id INTEGER PRIMARY KEY, email VARCHAR(50))"))
+        connection.execute(sa.text("INSERT INTO items (id, email) VALUES (1, 'a@example.com'), (2, 'b@example.com')"))
+    yield engine
+    engine.dispose()
+
+
+def in_request(function, path="/api/v1/items"):
+    token = set_request_context(RequestContext({"type": "http", "method": "GET", "path": path}))
+    try:
+        return function()
+    finally:
+        reset_request_context(token)
+
+
+def test_statements_differing_by_values_share_a_fingerprint():
+    first = "SELECT * FROM todos WHERE id = 1 AND title = 'a' AND status IN (?, ?)"
+    second = "SELECT *  FROM todos WHERE id = 22 AND title = 'it''s'  AND status IN (?, ?, ?)"
+    assert normalize_statement(first) == "SELECT * FROM todos WHERE id = ? AND title = ? AND status IN (?+)"
+    assert fingerprint(first) == fingerprint(second)
+
+
+def test_n_plus_one_is_reported_once_per_request(engine, log):
+    def lookups(count):
+        with engine.connect() as connection:
+            for item_id in range(count):
+                connection.execute(sa.text("SELECT email FROM items WHERE id = :id"), {"id": item_id})
+
+    in_request(lambda: lookups(3))
+    assert log.recent_n_plus_one() == []
+
+    in_request(lambda: lookups(6))
+    [entry] = log.recent_n_plus_one()
+    assert entry["count"] == 6
+    assert entry["threshold"] == 3
+    assert entry["path"] == "/api/v1/items"
+
+    # Outside a request nothing is counted.
+    lookups(10)
+    assert len(log.recent_n_plus_one()) == 1
+
+
+def test_slow_queries_leave_parameters_out_by_default(engine, log):
+    log.slow_query_ms = 0.0
+    with engine.connect() as connection:
+        connection.execute(sa.text("SELECT id FROM items WHERE email = :email"), {"email": "a@example.com"})
+    entry = log.recent_slow_queries(1)[0]
+    assert "WHERE email = ?" in entry["statement"]
+    assert "parameters" not in entry
+
+    log.capture_parameters = True
+    with engine.connect() as connection:
+        connection.execute(sa.text("SELECT id FROM items WHERE email = :email"), {"email": "a@example.com"})
+    assert "a@example.com" in log.recent_slow_queries(1)[0]["parameters"]
+
+
+def test_recent_entries_are_newest_first_and_bounded(log):
+    for index in range(8):
+        log.slow_queries.append({"index": index})
+    assert [entry["index"] for entry in log.recent_slow_queries(2)] == [7, 6]
+    assert [entry["index"] for entry in log.recent_slow_queries(100)] == [7, 6, 5, 4, 3]
+    assert log.recent_slow_queries(0) == []
+    assert log.recent_slow_queries(-1) == []
+
+
+@pytest.fixture
+def client(monkeypatch, log):
+    monkeypatch.setattr(admin, "query_log", log)
+    app = FastAPI()
+    app.include_router(admin.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/api/v1/admin/slow-queries"),
+    ("GET", "/api/v1/admin/n-plus-one"),
+    ("DELETE", "/api/v1/admin/query-log"),
+])
+def test_admin_endpoints_need_a_configured_key(client, monkeypatch, method, path):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+    assert client.request(method, path).status_code == 404
+    assert client.request(method, path, headers={"X-Admin-Key": ""}).status_code == 404
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    assert client.request(method, path).status_code == 403
+    assert client.request(method, path, headers={"X-Admin-Key": "wrong"}).status_code == 403
+    assert client.request(method, path, headers={"X-Admin-Key": "secret"}).status_code in (200, 204)
+
+
+def test_admin_limit_is_validated(client, monkeypatch, log):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "secret")
+    headers = {"X-Admin-Key": "secret"}
+    log.slow_queries.extend({"index": index} for index in range(3))
+
+    assert client.get("/api/v1/admin/slow-queries?limit=0", headers=headers).status_code == 422
+    assert client.get("/api/v1/admin/slow-queries?limit=-1", headers=headers).status_code == 422
+    too_many = settings.DB_QUERY_LOG_BUFFER_SIZE + 1
+    assert client.get(f"/api/v1/admin/n-plus-one?limit={too_many}", headers=headers).status_code == 422
+
+    response = client.get("/api/v1/admin/slow-queries?limit=2", headers=headers)
+    assert response.json() == [{"index": 2}, {"index": 1}]
+
+    assert client.delete("/api/v1/admin/query-log", headers=headers).status_code == 204
+    assert client.get("/api/v1/admin/slow-queries", headers=headers).json() == []
@@ -0,0 +1,182 @@
+"""
+Token buckets (in memory and over a shared store), per-route-group rules,
+client multipliers and the middleware's headers and 429s.
+"""
+import asyncio
+
+import pytest
+
+from app.core.rate_limit import LocalStore, MemoryBackend, RateLimiter, Rule, SharedBackend
+from app.middleware.rate_limit import RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["memory", "shared"])
+def backend(request, clock):
+    if request.param == "memory":
+        return MemoryBackend(clock=clock)
+    return SharedBackend(LocalStore(), clock=clock)
+
+
+def acquire(backend, rule, client="10.0.0.1"):
+    return asyncio.run(backend.acquire(rule, client))
+
+
+RULE = Rule("crud", per_second=2.0, burst=3)
+
+
+def test_burst_is_spent_then_rejected_with_retry_after(backend):
+    decisions = [acquire(backend, RULE) for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions] == [2, 1, 0, 0]
+    assert decisions[-1].retry_after == pytest.approx(0.5)
+    assert decisions[-1].reset_after == pytest.approx(1.5)
+
+
+def test_tokens_refill_at_the_rate_up_to_the_burst(backend, clock):
+    for _ in range(3):
+        acquire(backend, RULE)
+    assert not acquire(backend, RULE).allowed
+
+    clock.now += 0.5
+    assert acquire(backend, RULE).allowed
+    assert not acquire(backend, RULE).allowed
+
+    clock.now += 60
+    decisions = [acquire(backend, RULE) for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+
+
+def test_buckets_are_per_client_and_group(backend):
+    foundry = Rule("foundry", per_second=1.0, burst=1)
+    assert acquire(backend, foundry, "a").allowed
+    assert not acquire(backend, foundry, "a").allowed
+
+    assert acquire(backend, foundry, "b").allowed
+    assert acquire(backend, RULE, "a").allowed
+
+
+def test_shared_backend_fails_open_when_the_store_errors(clock):
+    class BrokenStore:
+        async def get(self, key):
+            raise ConnectionError("down")
+
+    decision = acquire(SharedBackend(BrokenStore(), clock=clock), RULE)
+
+    assert decision.allowed
+    assert decision.window == pytest.approx(1.5)
+
+
+def test_rules_match_the_longest_prefix():
+    crud, foundry = Rule("crud", 10, 20), Rule("foundry", 1, 2)
+    limiter = RateLimiter(MemoryBackend(), rules=[
+        ("/api/v1/foundry/usage", crud),
+        ("/api/v1/foundry", foundry),
+        ("/api/v1/", crud),
+    ])
+
+    assert limiter.rule_for("/api/v1/foundry/chat") is foundry
+    assert limiter.rule_for("/api/v1/foundry/usage/projects") is crud
+    assert limiter.rule_for("/api/v1/projects") is crud
+    assert limiter.rule_for("/health") is None
+
+
+def test_client_multipliers_scale_rate_and_burst(clock):
+    limiter = RateLimiter(MemoryBackend(clock=clock), rules=[("/", RULE)], client_multipliers={"trusted": 2})
+
+    trusted = [asyncio.run(limiter.check(RULE, "trusted")) for _ in range(7)]
+    other = [asyncio.run(limiter.check(RULE, "other")) for _ in range(4)]
+
+    assert [d.allowed for d in trusted] == [True] * 6 + [False]
+    assert trusted[-1].retry_after == pytest.approx(0.25)
+    assert [d.allowed for d in other] == [True] * 3 + [False]
+    # Both scaled: the window a full bucket takes to refill is unchanged
+    assert trusted[0].window == other[0].window == pytest.approx(1.5)
+
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter(MemoryBackend(), rules=[("/", Rule("crud", 0, 1))])
+    with pytest.raises(ValueError):
+        RateLimiter(MemoryBackend(), rules=[("/", RULE)], client_multipliers={"x": 0})
+
+
+def call(middleware, path="/api/v1/projects", headers=(), client=("10.0.0.1", 1234)):
+    scope = {"type": "http", "method": "GET", "path": path, "headers": list(headers), "client": client}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    start = messages[0]
+    return start["status"], {key.decode(): value.decode() for key, value in start["headers"]}
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_middleware(clock, rule=Rule("crud", per_second=0.5, burst=2), **options):
+    limiter = RateLimiter(SharedBackend(LocalStore(), clock=clock), rules=[("/api/v1/", rule)], **options)
+    return RateLimitMiddleware(ok_app, limiter, key_header="X-Client-Id")
+
+
+def test_middleware_adds_headers_and_rejects_with_429(clock):
+    middleware = make_middleware(clock)
+
+    status, headers = call(middleware)
+    assert status == 200
+    assert headers["ratelimit-limit"] == "2"
+    assert headers["ratelimit-remaining"] == "1"
+    assert headers["ratelimit-policy"] == "2;w=4"
+
+    call(middleware)
+    status, headers = call(middleware)
+    assert status == 429
+    assert headers["retry-after"] == "2"
+    assert headers["ratelimit-remaining"] == "0"
+
+
+def test_middleware_skips_paths_without_a_rule(clock):
+    middleware = make_middleware(clock)
+    for _ in range(5):
+        status, headers = call(middleware, path="/health")
+        assert status == 200
+        assert "ratelimit-limit" not in headers
+
+
+def test_middleware_keys_by_header_then_client_ip(clock):
+    middleware = make_middleware(clock, rule=Rule("crud", per_second=0.5, burst=1))
+
+    assert call(middleware, client=("10.0.0.1", 1))[0] == 200
+    assert call(middleware, client=("10.0.0.1", 2))[0] == 429
+    assert call(middleware, client=("10.0.0.2", 1))[0] == 200
+    assert call(middleware, headers=[(b"x-client-id", b"team-a")])[0] == 200
+    assert call(middleware, headers=[(b"x-client-id", b"team-a")])[0] == 429
+
+
+def test_policy_window_matches_the_scaled_rule(clock):
+    middleware = make_middleware(clock, client_multipliers={"team-a": 4})
+
+    _, headers = call(middleware, headers=[(b"x-client-id", b"team-a")])
+
+    assert headers["ratelimit-limit"] == "8"
+    assert headers["ratelimit-policy"] == "8;w=4"
@@ -0,0 +1,117 @@
+"""
+Read-replica routing with a primary and a replica SQLite file: reads go to
+the replica, a client's reads stick to the primary after it writes, and an
+unhealthy replica is skipped.
+"""
+import asyncio
+
+import pytest
+import sqlalchemy as sa
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import projects
+from app.core import database
+from app.core.database import Base, create_database_engine
+from app.core.replicas import STICKY_COOKIE, Replica, ReplicaRouter
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.models.models import Project
+
+
+@pytest.fixture
+def replica_engine(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def router(monkeypatch, db_engine, replica_engine):
+    router = ReplicaRouter([Replica("replica-0", replica_engine)], sticky_seconds=30)
+    monkeypatch.setattr(database, "read_replicas", router)
+    return router
+
+
+@pytest.fixture
+def app(router):
+    app = FastAPI()
+    app.include_router(projects.router)
+    app.add_middleware(ReadYourWritesMiddleware, router=router)
+    return app
+
+
+def add_project(engine, title):
+    with sa.orm.Session(engine) as session:
+        project = Project(scope={"title": title}, status="active")
+        session.add(project)
+        session.commit()
+        return project.id
+
+
+def titles(response):
+    return [project["scope"]["title"] for project in response.json()]
+
+
+def test_reads_go_to_the_replica(app, db_engine, replica_engine):
+    add_project(db_engine, "on primary")
+    add_project(replica_engine, "on replica")
+    client = TestClient(app)
+
+    assert titles(client.get("/api/v1/projects")) == ["on replica"]
+
+
+def test_reads_stick_to_the_primary_after_a_write(app, replica_engine):
+    writer = TestClient(app)
+    response = writer.post("/api/v1/projects", json={"scope": {"title": "new"}})
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.headers["set-cookie"]
+    project_id = response.json()["id"]
+
+    # The writer sees its own write; the replica hasn't caught up yet.
+    assert writer.get(f"/api/v1/projects/{project_id}").status_code == 200
+    assert TestClient(app).get(f"/api/v1/projects/{project_id}").status_code == 404
+
+    # Failed writes don't pin the client.
+    other = TestClient(app)
+    response = other.put("/api/v1/projects/999999", json={"status": "done"})
+    assert response.status_code == 404
+    assert "set-cookie" not in response.headers
+
+
+def test_expired_stickiness_reads_the_replica_again(app, router, replica_engine):
+    router.sticky_seconds = 0
+    client = TestClient(app)
+    client.post("/api/v1/projects", json={"scope": {"title": "new"}})
+    add_project(replica_engine, "on replica")
+    client.cookies.set(STICKY_COOKIE, "0")
+    assert titles(client.get("/api/v1/projects")) == ["on replica"]
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(app, router, db_engine, replica_engine, tmp_path):
+    add_project(db_engine, "on primary")
+    add_project(replica_engine, "on replica")
+    client = TestClient(app, raise_server_exceptions=False)
+
+    # A failing health check takes the replica out of rotation...
+    replica = router.replicas[0]
+    healthy_engine = replica.engine
+    replica.engine = sa.create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    asyncio.run(router.check_all(timeout=2.0))
+    assert not replica.healthy
+    assert router.status()["status"] == "fail"
+    assert titles(client.get("/api/v1/projects")) == ["on primary"]
+
+    # ...and a passing one brings it back.
+    replica.engine = healthy_engine
+    asyncio.run(router.check_all(timeout=2.0))
+    assert replica.healthy
+    assert titles(client.get("/api/v1/projects")) == ["on replica"]
+
+    # A database error during a read marks it failed right away.
+    with replica_engine.begin() as connection:
+        connection.execute(sa.text("ALTER TABLE projects RENAME TO projects_gone"))
+    assert client.get("/api/v1/projects").status_code == 500
+    assert not replica.healthy
+    assert titles(client.get("/api/v1/projects")) == ["on primary"]
+    assert replica.in_use == 0
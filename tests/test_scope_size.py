@@ -0,0 +1,97 @@
+"""
+SCOPE_MAX_BYTES on create, replace and patch (including merge patches
+applied in the database), and 422s that don't echo the scope back.
+"""
+import pytest
+
+from app.core.config import settings
+
+MERGE_PATCH = {"Content-Type": "application/merge-patch+json"}
+JSON_PATCH = {"Content-Type": "application/json-patch+json"}
+LIMIT = 200
+
+
+@pytest.fixture(autouse=True)
+def small_limit(monkeypatch):
+    monkeypatch.setattr(settings, "SCOPE_MAX_BYTES", LIMIT)
+
+
+@pytest.fixture
+def project(client):
+    return client.post("/api/v1/projects", json={"scope": {"notes": "a" * 100}}).json()
+
+
+def assert_too_large(response, loc):
+    assert response.status_code == 422
+    (error,) = response.json()["detail"]
+    assert error["loc"] == loc
+    assert "the limit is 200" in error["msg"]
+    assert set(error) == {"loc", "msg", "type"}
+    assert "x" * 50 not in response.text
+
+
+@pytest.mark.parametrize("collection, body", [
+    ("projects", {}),
+    ("todos", {"project_id": 1}),
+])
+def test_create_rejects_a_large_scope_without_echoing_it(client, collection, body):
+    response = client.post(f"/api/v1/{collection}", json={**body, "scope": {"notes": "x" * 300}})
+
+    assert_too_large(response, ["body", "scope"])
+
+
+def test_replace_rejects_a_large_scope_without_echoing_it(client, project):
+    response = client.put(f"/api/v1/projects/{project['id']}", json={"scope": {"notes": "x" * 300}})
+
+    assert_too_large(response, ["body", "scope"])
+
+
+def test_other_validation_errors_keep_their_input(client):
+    response = client.post("/api/v1/projects", json={"scope": {"project_title": 5}, "status": 3})
+
+    assert response.status_code == 422
+    scope_error, status_error = response.json()["detail"]
+    assert scope_error["loc"] == ["body", "scope", "project_title"]
+    assert "input" not in scope_error
+    assert status_error["loc"] == ["body", "status"]
+    assert status_error["input"] == 3
+
+
+def test_merge_patch_in_the_database_checks_the_merged_size(client, project):
+    url = f"/api/v1/projects/{project['id']}"
+
+    # Each patch is small, the merged document is not
+    response = client.patch(f"{url}/scope", json={"more": "x" * 90}, headers=MERGE_PATCH)
+    assert_too_large(response, ["body", "scope"])
+    assert client.get(url).json()["scope"] == {"notes": "a" * 100}
+
+    response = client.patch(f"{url}/scope", json={"more": "b" * 40}, headers=MERGE_PATCH)
+    assert response.status_code == 200
+    assert response.json()["scope"] == {"notes": "a" * 100, "more": "b" * 40}
+
+
+def test_merge_patch_that_shrinks_the_scope_still_applies(client, project):
+    url = f"/api/v1/projects/{project['id']}"
+
+    response = client.patch(f"{url}/scope", json={"notes": None, "more": "x" * 150}, headers=MERGE_PATCH)
+
+    assert response.status_code == 200
+    assert response.json()["scope"] == {"more": "x" * 150}
+
+
+def test_size_check_keeps_if_match_semantics(client, project):
+    url = f"/api/v1/projects/{project['id']}"
+    etag = client.get(url).headers["ETag"]
+    client.patch(f"{url}/scope", json={"a": 1}, headers=MERGE_PATCH)
+
+    response = client.patch(f"{url}/scope", json={"more": "x" * 90}, headers={**MERGE_PATCH, "If-Match": etag})
+
+    assert response.status_code == 412
+
+
+def test_json_patch_checks_the_patched_size(client, project):
+    url = f"/api/v1/projects/{project['id']}/scope"
+
+    response = client.patch(url, json=[{"op": "add", "path": "/more", "value": "x" * 90}], headers=JSON_PATCH)
+
+    assert_too_large(response, ["body", "scope"])
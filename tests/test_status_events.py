@@ -0,0 +1,168 @@
+"""
+status_events: recorded by the ORM listener and by record_todo_statuses()
+for Core UPDATEs, and the cycle time, throughput and burndown reports
+computed from them.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.models.models import Project, StatusEvent, Todo
+from app.services.status_events import TODO, burndown, cycle_time, record_todo_statuses, throughput
+
+
+def history(db, entity_type, entity_id):
+    db.expire_all()
+    return db.execute(
+        select(StatusEvent.status, StatusEvent.project_id)
+        .where(StatusEvent.entity_type == entity_type, StatusEvent.entity_id == entity_id)
+        .order_by(StatusEvent.id)
+    ).all()
+
+
+@pytest.fixture
+def todo(client):
+    project = client.post("/api/v1/projects", json={"scope": {}}).json()
+    return client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"title": "T"}}).json()
+
+
+def test_orm_writes_record_inserts_and_status_changes(client, db, todo):
+    project_id = todo["project_id"]
+    assert history(db, "todo", todo["id"]) == [("open", project_id)]
+
+    client.put(f"/api/v1/todos/{todo['id']}", json={"status": "in_progress"})
+    client.put(f"/api/v1/todos/{todo['id']}", json={"status": "in_progress"})
+    client.put(f"/api/v1/todos/{todo['id']}", json={"scope": {"title": "Renamed"}})
+    assert history(db, "todo", todo["id"]) == [("open", project_id), ("in_progress", project_id)]
+
+    report = client.post("/api/v1/status-reports", json={"todo_id": todo["id"], "scope": {}, "status": "draft"}).json()
+    client.put(f"/api/v1/status-reports/{report['id']}", json={"status": "approved"})
+    # Status reports are attributed to their todo's project
+    assert history(db, "status_report", report["id"]) == [("draft", project_id), ("approved", project_id)]
+
+
+def test_core_updates_record_their_own_events(client, db, todo):
+    project_id = todo["project_id"]
+
+    client.put(f"/api/v1/todos/{todo['id']}/status", json={"status": "done"})
+    client.put(f"/api/v1/todos/{todo['id']}/status", json={"status": "done"})
+    assert history(db, "todo", todo["id"]) == [("open", project_id), ("done", project_id)]
+
+    other = client.post("/api/v1/todos", json={"project_id": project_id, "scope": {"title": "U"}}).json()
+    client.delete(f"/api/v1/todos/{other['id']}")
+    at = datetime(2026, 1, 5)
+    record_todo_statuses(db, {todo["id"]: ("blocked", at), other["id"]: ("done", at), 999: ("done", at)})
+    db.commit()
+
+    assert history(db, "todo", todo["id"])[-1] == ("blocked", project_id)
+    # Deleted and unknown todos get nothing
+    assert history(db, "todo", other["id"]) == [("open", project_id)]
+    assert history(db, "todo", 999) == []
+
+
+@pytest.fixture
+def todos(db_engine, db):
+    """
+    Four todos of one project (the last one deleted), with no history yet.
+    """
+    project = Project(scope={}, status="active")
+    project.todos = [Todo(scope={}, status="open") for _ in range(4)]
+    db.add(project)
+    db.commit()
+    project.todos[3].deleted_at = datetime(2026, 1, 1)
+    db.commit()
+    db.execute(delete(StatusEvent))
+    db.commit()
+    return project.id, [t.id for t in project.todos]
+
+
+def add_events(db, project_id, events):
+    db.execute(insert(StatusEvent), [
+        {"entity_type": TODO, "entity_id": todo_id, "project_id": project_id, "status": status, "occurred_at": at}
+        for todo_id, status, at in events
+    ])
+    db.commit()
+
+
+def test_cycle_time_runs_from_first_start_to_first_finish(db, todos):
+    project_id, (a, b, c, d) = todos
+    add_events(db, project_id, [
+        (a, "in_progress", datetime(2026, 1, 5, 10)),
+        (a, "done", datetime(2026, 1, 5, 14)),
+        # Blocked in between: still counted from the first start
+        (b, "in_progress", datetime(2026, 1, 6, 0)),
+        (b, "blocked", datetime(2026, 1, 6, 2)),
+        (b, "in_progress", datetime(2026, 1, 6, 5)),
+        (b, "done", datetime(2026, 1, 6, 10)),
+        (b, "done", datetime(2026, 1, 7, 10)),
+        # Never finished / never started: no cycle
+        (c, "in_progress", datetime(2026, 1, 5, 9)),
+        (d, "done", datetime(2026, 1, 5, 9)),
+    ])
+
+    stats = cycle_time(db, TODO, "in_progress", "done", project_id)
+    assert stats == {
+        "count": 2,
+        "mean_hours": 7.0,
+        "min_hours": 4.0,
+        "max_hours": 10.0,
+        "p50_hours": 4.0,
+        "p90_hours": 10.0,
+    }
+    assert cycle_time(db, TODO, "in_progress", "done", project_id, since=datetime(2026, 1, 6))["count"] == 1
+    assert cycle_time(db, TODO, "in_progress", "done", project_id + 1)["count"] == 0
+
+
+def test_cycle_time_endpoint_uses_the_default_statuses(client, db, todos):
+    project_id, (a, *_) = todos
+    add_events(db, project_id, [(a, "in_progress", datetime(2026, 1, 5, 10)), (a, "done", datetime(2026, 1, 5, 12))])
+
+    body = client.get("/api/v1/analytics/cycle-time", params={"project_id": project_id}).json()
+
+    assert (body["start_status"], body["end_status"], body["count"], body["mean_hours"]) == ("in_progress", "done", 1, 2.0)
+
+
+def test_throughput_counts_first_completions_per_week(db, todos):
+    project_id, (a, b, c, _) = todos
+    add_events(db, project_id, [
+        (a, "done", datetime(2026, 1, 6, 9)),  # Tuesday
+        (b, "done", datetime(2026, 1, 11, 23)),  # Sunday, same week
+        (b, "done", datetime(2026, 1, 20, 9)),  # Done again: not counted
+        (c, "done", datetime(2026, 1, 14, 9)),
+        (c, "done", datetime(2025, 12, 1, 9)),  # Before `since`, and c's first
+    ])
+
+    weeks = throughput(db, TODO, "done", since=datetime(2026, 1, 1), project_id=project_id)
+
+    assert [(str(w["week_start"]), w["completed"], w["cumulative"]) for w in weeks] == [
+        ("2026-01-05", 2, 2),
+    ]
+    assert [w["completed"] for w in throughput(db, TODO, "done", since=datetime(2025, 1, 1))] == [1, 2]
+
+
+def test_burndown_tracks_open_todos_per_day(db, todos):
+    project_id, (a, b, c, d) = todos
+    add_events(db, project_id, [
+        (a, "open", datetime(2026, 1, 5, 9)),
+        (b, "open", datetime(2026, 1, 5, 9)),
+        (c, "open", datetime(2026, 1, 5, 9)),
+        (d, "open", datetime(2026, 1, 5, 9)),  # Deleted: left out
+        (a, "in_progress", datetime(2026, 1, 6, 9)),  # Still open
+        (a, "done", datetime(2026, 1, 6, 17)),
+        (a, "open", datetime(2026, 1, 8, 9)),  # Reopened
+        (b, "cancelled", datetime(2026, 1, 8, 10)),
+        (c, "done", datetime(2026, 1, 9, 10)),
+    ])
+
+    days = burndown(db, project_id)
+
+    assert [(str(day["day"]), day["opened"], day["closed"], day["open"]) for day in days] == [
+        ("2026-01-05", 3, 0, 3),
+        ("2026-01-06", 0, 1, 2),
+        ("2026-01-08", 1, 1, 2),
+        ("2026-01-09", 0, 1, 1),
+    ]
+    # The range trims the output; the counts still include earlier days
+    trimmed = burndown(db, project_id, since=datetime(2026, 1, 8), until=datetime(2026, 1, 8))
+    assert [(str(day["day"]), day["open"]) for day in trimmed] == [("2026-01-08", 2)]
@@ -0,0 +1,85 @@
+"""
+Todo `scope.tasks` stored in the tasks table: round trips and SQL filters.
+"""
+import json
+
+import pytest
+
+from app.services.tasks import task_document, task_values
+
+
+class Row:
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+def round_trip(item):
+    return task_document(Row(task_values(item, 0)))
+
+
+@pytest.mark.parametrize("item", [
+    {"title": "Task 1", "description": "First task", "owner": "user@example.com",
+     "duedate": "2024-12-31", "createdAt": "2024-01-01"},
+    {"createdAt": "2024-01-01", "status": "open", "title": "T", "extra": [1, 2]},
+    {"title": "T", "status": "s" * 60},
+    {"owner": "a@example.com", "assignee": "b@example.com"},
+    {"assignee": "b@example.com", "owner": None},
+    {"owner": 7},
+    {},
+    "legacy string task",
+])
+def test_task_documents_round_trip_in_order(item):
+    document = round_trip(item)
+    assert document == item
+    if isinstance(item, dict):
+        assert list(document) == list(item)
+
+
+def test_owner_fills_the_assignee_column():
+    values = task_values({"title": "T", "owner": "a@example.com"}, 0)
+    assert values["assignee"] == "a@example.com"
+    assert values["attributes"] is None
+    assert values["key_order"] == ["title", "owner"]
+
+    # The task's own assignee key takes the column first
+    values = task_values({"owner": "a@example.com", "assignee": "b@example.com"}, 0)
+    assert values["assignee"] == "b@example.com"
+    assert values["attributes"] == {"owner": "a@example.com"}
+
+
+def test_default_order_needs_no_key_order():
+    values = task_values({"extra": 1, "title": "T", "status": "open"}, 0)
+    assert values["key_order"] is None
+
+
+def test_todo_tasks_round_trip_through_the_api(client):
+    project = client.post("/api/v1/projects", json={"scope": {}}).json()
+    tasks = [
+        {"title": "Task 1", "description": "First task", "owner": "user@example.com",
+         "duedate": "2024-12-31", "createdAt": "2024-01-01"},
+        {"createdAt": "2024-01-02", "title": "Task 2", "status": "done", "owner": "other@example.com"},
+    ]
+    todo = client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"tasks": tasks}})
+    assert todo.status_code == 201
+    todo_id = todo.json()["id"]
+
+    raw = client.get(f"/api/v1/todos/{todo_id}").content
+    assert json.loads(raw)["scope"]["tasks"] == tasks
+    assert [list(task) for task in json.loads(raw)["scope"]["tasks"]] == [list(task) for task in tasks]
+
+    owned = client.get("/api/v1/tasks", params={"assignee": "user@example.com"}).json()
+    assert [task["title"] for task in owned] == ["Task 1"]
+    counts = client.get("/api/v1/tasks/counts", params={"assignee": "other@example.com"}).json()
+    assert counts == [{"project_id": project["id"], "status": "done", "count": 1}]
+
+
+def test_tasks_edited_through_the_tasks_api_keep_their_keys(client):
+    project = client.post("/api/v1/projects", json={"scope": {}}).json()
+    tasks = [{"createdAt": "2024-01-01", "owner": "a@example.com", "title": "T"}]
+    todo_id = client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"tasks": tasks}}).json()["id"]
+    task_id = client.get("/api/v1/tasks", params={"todo_id": todo_id}).json()[0]["id"]
+
+    client.put(f"/api/v1/tasks/{task_id}", json={"assignee": "b@example.com", "priority": "high"})
+    [task] = client.get(f"/api/v1/todos/{todo_id}").json()["scope"]["tasks"]
+    assert task == {"createdAt": "2024-01-01", "owner": "b@example.com", "title": "T", "priority": "high"}
+    assert list(task) == ["createdAt", "owner", "title", "priority"]
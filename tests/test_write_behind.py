@@ -0,0 +1,142 @@
+"""
+Todo status write-behind: coalescing, what a flush writes, retries after
+a failed flush, and which updates are lost.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.models import StatusEvent, Todo
+from app.services.write_behind import TodoStatusBuffer
+
+
+@pytest.fixture
+def todo_ids(client):
+    project = client.post("/api/v1/projects", json={"scope": {"title": "P"}}).json()
+    return [
+        client.post("/api/v1/todos", json={"project_id": project["id"], "scope": {"title": title}}).json()["id"]
+        for title in ("A", "B")
+    ]
+
+
+@pytest.fixture
+def buffer(db_engine):
+    from app.core.database import SessionLocal
+
+    return TodoStatusBuffer(SessionLocal, max_pending=100)
+
+
+def statuses(db):
+    db.expire_all()
+    return dict(db.execute(select(Todo.id, Todo.status).order_by(Todo.id)).all())
+
+
+def events(db, todo_id):
+    return db.scalars(
+        select(StatusEvent.status)
+        .where(StatusEvent.entity_type == "todo", StatusEvent.entity_id == todo_id)
+        .order_by(StatusEvent.id)
+    ).all()
+
+
+def test_flush_writes_the_last_status_per_todo(db, buffer, todo_ids):
+    first, second = todo_ids
+    for status in ("in_progress", "blocked", "done"):
+        buffer.put(first, status)
+    buffer.put(second, "in_progress")
+
+    # Nothing reaches the database before the flush
+    assert statuses(db) == {first: "open", second: "open"}
+    assert len(buffer) == 2
+
+    assert buffer.flush() == 2
+    assert statuses(db) == {first: "done", second: "in_progress"}
+    # Intermediate statuses leave no trace
+    assert events(db, first) == ["open", "done"]
+    assert len(buffer) == 0
+    assert buffer.flush() == 0
+
+
+def test_updates_for_missing_or_deleted_todos_are_dropped(client, db, buffer, todo_ids):
+    first, second = todo_ids
+    client.delete(f"/api/v1/todos/{second}")
+    buffer.put(first, "done")
+    buffer.put(second, "done")
+    buffer.put(999, "done")
+
+    assert buffer.flush() == 1
+    assert statuses(db)[first] == "done"
+    assert events(db, 999) == []
+
+
+def test_failed_flush_keeps_updates_and_newer_ones_win(db, todo_ids):
+    from app.core.database import SessionLocal
+
+    failures = [RuntimeError("database unavailable")]
+
+    def session_factory():
+        if failures:
+            raise failures.pop()
+        return SessionLocal()
+
+    buffer = TodoStatusBuffer(session_factory)
+    first, second = todo_ids
+    buffer.put(first, "in_progress")
+    buffer.put(second, "in_progress")
+
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert len(buffer) == 2
+    assert statuses(db) == {first: "open", second: "open"}
+
+    buffer.put(first, "done")
+    assert buffer.flush() == 2
+    assert statuses(db) == {first: "done", second: "in_progress"}
+
+
+def test_unflushed_updates_are_lost_without_a_graceful_shutdown(db, db_engine, todo_ids):
+    from app.core.database import SessionLocal
+
+    first, _ = todo_ids
+    crashed = TodoStatusBuffer(SessionLocal)
+    crashed.put(first, "done")
+    # The process dies here: the buffer is gone with it
+    del crashed
+    assert statuses(db)[first] == "open"
+
+    stopped = TodoStatusBuffer(SessionLocal)
+    stopped.put(first, "done")
+    asyncio.run(stopped.stop())
+    assert statuses(db)[first] == "done"
+
+
+def test_a_full_buffer_is_flushed_by_the_writer(db, todo_ids):
+    from app.core.database import SessionLocal
+
+    buffer = TodoStatusBuffer(SessionLocal, max_pending=2)
+    first, second = todo_ids
+    buffer.put(first, "done")
+    assert statuses(db)[first] == "open"
+
+    buffer.put(second, "done")
+    assert len(buffer) == 0
+    assert statuses(db) == {first: "done", second: "done"}
+
+
+def test_endpoint_buffers_the_update_when_enabled(client, db, buffer, todo_ids, monkeypatch):
+    import app.api.v1.todos as todos_api
+
+    monkeypatch.setattr(settings, "TODO_STATUS_WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(todos_api, "todo_status_buffer", buffer)
+    first, _ = todo_ids
+
+    response = client.put(f"/api/v1/todos/{first}/status", json={"status": "done"})
+    assert response.status_code == 202
+    assert response.json()["buffered"] is True
+    # Reads see the old status until the flush
+    assert client.get(f"/api/v1/todos/{first}").json()["status"] == "open"
+
+    buffer.flush()
+    assert client.get(f"/api/v1/todos/{first}").json()["status"] == "done"